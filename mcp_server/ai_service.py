@@ -1,11 +1,19 @@
+import asyncio
 import os
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Awaitable, Dict, List, Optional, Union
 
 import httpx
 from dotenv import load_dotenv
 
+from .cassette import get_cassette, request_key
+from .latency import estimate_tokens, latency_stats, work_units
+from .metrics import metrics
+from .pool import Endpoint, EndpointPool, get_pool
+from .profiles import GenerationProfile, get_profile
+
 # Load .env relative to the package root, NOT relative to the cwd. This makes
 # AIService usable from any working directory — tests, REPL sessions, scripts
 # launched from elsewhere — without requiring callers to chdir into the project
@@ -16,6 +24,26 @@ _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 load_dotenv(dotenv_path=_PROJECT_ROOT / ".env", override=False)
 
 
+# Provider name -> AIService method implementing its wire protocol.
+_PROVIDER_CALLS = {
+    "gemini": "_call_gemini",
+    "openai": "_call_openai_compatible",
+    "lmstudio": "_call_openai_compatible",
+    "openrouter": "_call_openai_compatible",
+    "ollama": "_call_ollama",
+}
+
+
+def _is_host_failure(error: Exception) -> bool:
+    """True if an exception says the endpoint itself is unhealthy."""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, httpx.TransportError)
+
+
 @dataclass
 class AIMessage:
     role: str
@@ -26,6 +54,103 @@ class AIMessage:
 class AIResponse:
     content: str
     error: Optional[str] = None
+    # Which backend actually answered (or last failed), for failover chains.
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    endpoint: Optional[str] = None
+    # Per-call timing: the timeout the attempt ran under and how long it took.
+    timeout: Optional[float] = None
+    latency: Optional[float] = None
+    # Token counts the provider reported: prompt_tokens, completion_tokens.
+    usage: Optional[Dict[str, int]] = None
+
+
+_RESPONSE_FIELDS = {f.name for f in fields(AIResponse)}
+
+
+def _usage(prompt: Any, completion: Any) -> Optional[Dict[str, int]]:
+    if prompt is None and completion is None:
+        return None
+    return {"prompt_tokens": prompt, "completion_tokens": completion}
+
+
+_TRUTHY = ("1", "true", "yes", "on")
+
+
+class _HedgeBudget:
+    """Token bucket capping hedges at a fraction of total attempts.
+
+    Every attempt earns ``ratio`` tokens and a hedge spends one, so with
+    ratio 0.05 hedging adds at most ~5% load. ``burst`` caps how many
+    tokens a quiet period can bank for a later latency spike.
+    """
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = max(1.0, burst)
+        self.tokens = 0.0
+
+    def note_request(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def available(self) -> bool:
+        return self.tokens >= 1.0
+
+    def spend(self) -> None:
+        self.tokens -= 1.0
+
+
+_hedge_budget = _HedgeBudget(
+    ratio=float(os.getenv("AI_HEDGE_BUDGET", "0.05")),
+    burst=float(os.getenv("AI_HEDGE_BURST", "3")),
+)
+
+
+def _provider_float(provider: str, name: str, default: float) -> float:
+    """Read ``{PROVIDER}_{name}`` falling back to ``AI_{name}``, then default."""
+    value = os.getenv(f"{provider.upper()}_{name}") or os.getenv(f"AI_{name}")
+    return float(value) if value else default
+
+
+def _ollama_options(profile: Optional[GenerationProfile]) -> Dict[str, Any]:
+    if profile is None:
+        return {}
+    options = {
+        "num_predict": profile.max_tokens,
+        "num_ctx": profile.num_ctx,
+        "temperature": profile.temperature,
+    }
+    options = {k: v for k, v in options.items() if v is not None}
+    return {"options": options} if options else {}
+
+
+def _openai_options(profile: Optional[GenerationProfile]) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"temperature": 0.7}
+    if profile and profile.temperature is not None:
+        options["temperature"] = profile.temperature
+    if profile and profile.max_tokens:
+        options["max_tokens"] = profile.max_tokens
+    return options
+
+
+def _gemini_config(profile: Optional[GenerationProfile]) -> Dict[str, Any]:
+    if profile is None:
+        return {}
+    config = {
+        "maxOutputTokens": profile.max_tokens,
+        "temperature": profile.temperature,
+    }
+    config = {k: v for k, v in config.items() if v is not None}
+    return {"generationConfig": config} if config else {}
+
+
+def _tool_setting(name: str, tool: Optional[str]) -> Optional[str]:
+    """Read ``{name}_{TOOL}`` falling back to the global ``{name}``."""
+    if tool:
+        value = os.getenv(f"{name}_{tool.upper()}")
+        if value:
+            return value
+    return os.getenv(name) or None
 
 
 class AIService:
@@ -66,9 +191,72 @@ class AIService:
             f"{self.provider.upper()}_BASE_URL"
         ) or default_urls.get(self.provider)
 
+        # Shared per-provider pool; a single base_url is a one-endpoint pool.
+        # Set {PROVIDER}_BASE_URLS to spread requests across several hosts.
+        self.pool: Optional[EndpointPool] = get_pool(self.provider, self.base_url)
+        if self.pool:
+            self.base_url = self.pool.endpoints[0].url
+
+        # Static per-attempt timeout, used until enough latency samples exist
+        # to derive one (see timeout_for). Local generation on commodity GPUs
+        # can be slow, hence the longer Ollama default.
+        self.timeout = float(
+            os.getenv(f"{self.provider.upper()}_TIMEOUT")
+            or (180.0 if self.provider == "ollama" else 60.0)
+        )
+        self.timeout_ceiling = _provider_float(
+            self.provider, "TIMEOUT_CEILING", max(600.0, self.timeout)
+        )
+        self.timeout_floor = min(
+            _provider_float(self.provider, "TIMEOUT_FLOOR", 10.0),
+            self.timeout_ceiling,
+        )
+
+        # Fallback providers are built lazily, one AIService per provider, so
+        # each picks up its own *_MODEL / *_API_KEY / *_BASE_URL(S).
+        self._chain_services: Dict[str, "AIService"] = {self.provider: self}
+
+        # Record/replay of whole responses; see cassette.py.
+        self.cassette = get_cassette()
+
     async def generate_response(
-        self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None
+        self,
+        messages: List[Dict[str, str]],
+        system_prompt: Optional[str] = None,
+        tool: Optional[str] = None,
+        deadline: Optional[float] = None,
+        hedge: Optional[bool] = None,
+        expected_output_tokens: Optional[int] = None,
+        profile: Union[str, GenerationProfile, None] = None,
     ) -> AIResponse:
+        """Generate a completion, failing over along the provider chain.
+
+        ``tool`` names the calling MCP tool and selects its chain
+        (``AI_FALLBACK_CHAIN_<TOOL>``, else ``AI_FALLBACK_CHAIN``, else just
+        this service's provider) and default deadline (``AI_DEADLINE_<TOOL>``
+        / ``AI_DEADLINE``). ``deadline`` is an end-to-end budget in seconds;
+        each attempt gets an even share of what remains, capped at the
+        provider's own timeout, so a dead first hop cannot eat the budget.
+
+        ``hedge`` (default ``AI_HEDGE_<TOOL>`` / ``AI_HEDGE``) opts into
+        hedged requests: an attempt still running past the provider/model's
+        observed p90 latency is duplicated to another pool member or the
+        next provider, within the ``AI_HEDGE_BUDGET`` extra-load ratio.
+
+        Each attempt's timeout is learned from that backend's latency
+        history (see timeout_for); ``expected_output_tokens`` sharpens the
+        estimate when the caller knows roughly how long the answer will be.
+        The timeout and latency of the answering attempt are reported on
+        the response.
+
+        ``profile`` (a GenerationProfile or a name for get_profile) bounds
+        output length, context window and temperature on every provider. Its
+        ``max_tokens`` is the default ``expected_output_tokens``, and its
+        ``timeout`` caps each attempt.
+
+        With ``AI_CASSETTE_MODE`` set, responses are recorded to or replayed
+        from a cassette (see cassette.py) instead of only going live.
+        """
         try:
             formatted_messages = []
             if system_prompt:
@@ -78,30 +266,382 @@ class AIService:
                 formatted_messages.append(
                     {"role": msg["role"], "content": msg["content"]}
                 )
+        except (KeyError, TypeError) as e:
+            return AIResponse(content="", error=f"Malformed messages: {e}")
+
+        if deadline is None:
+            raw_deadline = _tool_setting("AI_DEADLINE", tool)
+            deadline = float(raw_deadline) if raw_deadline else None
+        expires = time.monotonic() + deadline if deadline else None
+        if hedge is None:
+            hedge = (_tool_setting("AI_HEDGE", tool) or "").lower() in _TRUTHY
+
+        if isinstance(profile, str):
+            profile = get_profile(profile)
+        if profile and expected_output_tokens is None:
+            expected_output_tokens = profile.max_tokens
+
+        cassette_key = None
+        if self.cassette is not None:
+            cassette_key = request_key(
+                self.provider, self.model, formatted_messages, profile
+            )
+            if self.cassette.replays:
+                entry = self.cassette.lookup(cassette_key)
+                if entry is not None:
+                    recorded = await self.cassette.replay(entry)
+                    return AIResponse(
+                        **{k: v for k, v in recorded.items() if k in _RESPONSE_FIELDS}
+                    )
+                if not self.cassette.records:
+                    return AIResponse(
+                        content="",
+                        error=f"No cassette recording for request {cassette_key[:12]}",
+                    )
+
+        prompt_tokens = estimate_tokens(
+            "".join(m["content"] for m in formatted_messages)
+        )
+        chain = self._chain_for(tool)
+        errors: List[str] = []
+        response = AIResponse(content="", error="Deadline exhausted before any attempt")
+        for index, service in enumerate(chain):
+            service_timeout = service.timeout_for(prompt_tokens, expected_output_tokens)
+            timeout = service_timeout
+            if profile and profile.timeout:
+                # The profile's latency class is the caller's choice; hitting
+                # it is not evidence against the host.
+                timeout = min(timeout, profile.timeout)
+            if expires is not None:
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    errors.append(f"{service.provider}: deadline exhausted")
+                    break
+                timeout = min(timeout, remaining / (len(chain) - index))
+
+            response = await service._attempt(
+                formatted_messages,
+                timeout,
+                shortened=timeout < service_timeout,
+                hedge=hedge,
+                alternate=chain[index + 1] if index + 1 < len(chain) else None,
+                profile=profile,
+            )
+            if not response.error:
+                if cassette_key is not None and self.cassette.records:
+                    self.cassette.record(cassette_key, response)
+                return response
+            errors.append(f"{service.provider}: {response.error}")
+
+        # A single-provider chain keeps the provider's own error text, which
+        # callers such as seg_core already surface verbatim.
+        if len(chain) == 1:
+            return response
+        return AIResponse(
+            content="",
+            error=f"All providers failed ({'; '.join(errors)})",
+            provider=response.provider,
+            model=response.model,
+            endpoint=response.endpoint,
+        )
 
-            if self.provider == "gemini":
-                return await self._call_gemini(formatted_messages)
-            elif self.provider in ["openai", "lmstudio", "openrouter"]:
-                return await self._call_openai_compatible(formatted_messages)
-            elif self.provider == "ollama":
-                return await self._call_ollama(formatted_messages)
-            else:
-                return AIResponse(
-                    content="", error=f"Unsupported provider: {self.provider}"
+    def timeout_for(
+        self, prompt_tokens: int, expected_output_tokens: Optional[int] = None
+    ) -> float:
+        """Per-request timeout learned from this backend's latency history.
+
+        Until ``AI_TIMEOUT_MIN_SAMPLES`` generations have been observed the
+        static ``{PROVIDER}_TIMEOUT`` applies. After that the timeout is the
+        ``AI_TIMEOUT_QUANTILE`` seconds-per-work-unit rate times this
+        request's estimated work, times ``AI_TIMEOUT_HEADROOM``. Either way
+        it is clamped to ``{PROVIDER}_TIMEOUT_FLOOR`` / ``_CEILING`` (or the
+        ``AI_TIMEOUT_*`` globals), so a small prompt on a fast host fails
+        fast while a deep council on a slow host is allowed to finish.
+        """
+        rate = latency_stats.rate_quantile(
+            self.provider,
+            self.model,
+            float(os.getenv("AI_TIMEOUT_QUANTILE", "0.95")),
+            min_samples=int(os.getenv("AI_TIMEOUT_MIN_SAMPLES", "10")),
+        )
+        if rate is None:
+            timeout = self.timeout
+        else:
+            output_tokens = (
+                expected_output_tokens
+                or latency_stats.typical_output_tokens(self.provider, self.model)
+                or 0
+            )
+            headroom = float(os.getenv("AI_TIMEOUT_HEADROOM", "2.0"))
+            timeout = rate * work_units(prompt_tokens, output_tokens) * headroom
+        return min(max(timeout, self.timeout_floor), self.timeout_ceiling)
+
+    def _chain_for(self, tool: Optional[str]) -> List["AIService"]:
+        """Resolve the ordered provider chain for a tool.
+
+        This service's provider always leads. Providers whose entire pool
+        is currently ejected move to the back of the chain: they are still
+        tried as a last resort, but no longer cost a full timeout up front.
+        """
+        raw_chain = _tool_setting("AI_FALLBACK_CHAIN", tool) or ""
+        names = [self.provider]
+        for name in raw_chain.split(","):
+            name = name.strip().lower()
+            if name and name not in names:
+                names.append(name)
+
+        services = []
+        for name in names:
+            if name not in self._chain_services:
+                self._chain_services[name] = AIService(provider=name)
+            services.append(self._chain_services[name])
+
+        healthy = [s for s in services if not s.pool or s.pool.has_available()]
+        ejected = [s for s in services if s not in healthy]
+        return healthy + ejected
+
+    def chain_health(self, tool: Optional[str] = None) -> Dict[str, Any]:
+        """How able a tool's failover chain is to take a request now.
+
+        ``pooled`` is False if any provider in the chain has no endpoint
+        pool; nothing is known about its health then. ``available`` says
+        whether any pool still admits requests. ``admitted`` and
+        ``outstanding`` are the leading provider's available endpoints and
+        its in-flight requests.
+        """
+        chain = self._chain_for(tool)
+        pools = [service.pool for service in chain if service.pool]
+        pooled = bool(pools) and len(pools) == len(chain)
+        lead = chain[0].pool
+        return {
+            "pooled": pooled,
+            "available": any(pool.has_available() for pool in pools),
+            "admitted": (
+                sum(1 for e in lead.endpoints if e.is_available()) if lead else 0
+            ),
+            "outstanding": lead.outstanding() if lead else 0,
+        }
+
+    async def _attempt(
+        self,
+        messages: List[Dict[str, str]],
+        timeout: float,
+        shortened: bool = False,
+        hedge: bool = False,
+        alternate: Optional["AIService"] = None,
+        profile: Optional[GenerationProfile] = None,
+    ) -> AIResponse:
+        """One provider attempt that never raises; errors come back in-band."""
+        _hedge_budget.note_request()
+        trigger = self._hedge_trigger(timeout) if hedge else None
+        if trigger is None:
+            return await self._settle(
+                self._call_pooled(messages, timeout, shortened, profile=profile),
+                timeout,
+            )
+        return await self._hedged(
+            messages, timeout, shortened, trigger, alternate, profile
+        )
+
+    async def _hedged(
+        self,
+        messages: List[Dict[str, str]],
+        timeout: float,
+        shortened: bool,
+        trigger: float,
+        alternate: Optional["AIService"],
+        profile: Optional[GenerationProfile] = None,
+    ) -> AIResponse:
+        """Race a duplicate request once the primary outlives the trigger.
+
+        The duplicate goes to another endpoint in this provider's pool when
+        there is one, else to the next provider in the chain. The first
+        successful response wins and the loser is cancelled, which releases
+        its endpoint without a health verdict.
+        """
+        labels = {"provider": self.provider, "model": self.model}
+        primary_endpoint = self.pool.acquire() if self.pool else None
+        primary = asyncio.ensure_future(
+            self._settle(
+                self._call_pooled(
+                    messages, timeout, shortened, primary_endpoint, profile
+                ),
+                timeout,
+            )
+        )
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=trigger)
+            if done:
+                return primary.result()
+
+            if not _hedge_budget.available():
+                metrics.inc("ai.hedge.skipped", labels={**labels, "reason": "budget"})
+                return await primary
+
+            hedge_endpoint = None
+            if self.pool and primary_endpoint:
+                hedge_endpoint = self.pool.acquire(exclude=[primary_endpoint])
+            hedge_service = self if hedge_endpoint else alternate
+            if hedge_service is None:
+                metrics.inc(
+                    "ai.hedge.skipped", labels={**labels, "reason": "no_target"}
                 )
+                return await primary
+
+            _hedge_budget.spend()
+            metrics.inc("ai.hedge.fired", labels=labels)
+            remaining = max(0.001, timeout - trigger)
+            hedge_task = asyncio.ensure_future(
+                hedge_service._settle(
+                    hedge_service._call_pooled(
+                        messages, remaining, True, hedge_endpoint, profile
+                    ),
+                    remaining,
+                )
+            )
+            tasks.add(hedge_task)
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    response = task.result()
+                    if not response.error:
+                        outcome = "won" if task is hedge_task else "lost"
+                        metrics.inc(f"ai.hedge.{outcome}", labels=labels)
+                        return response
+            metrics.inc("ai.hedge.failed", labels=labels)
+            return primary.result()
+        finally:
+            losers = [task for task in tasks if not task.done()]
+            for task in losers:
+                task.cancel()
+            # Let cancelled losers unwind so their endpoints are released
+            # before the caller sees the result.
+            await asyncio.gather(*losers, return_exceptions=True)
+
+    def _hedge_trigger(self, timeout: float) -> Optional[float]:
+        """Observed latency quantile after which a request gets hedged.
+
+        None until enough samples exist to trust the quantile, or when the
+        trigger would not fire before the attempt times out anyway.
+        """
+        trigger = latency_stats.quantile(
+            self.provider,
+            self.model,
+            float(os.getenv("AI_HEDGE_QUANTILE", "0.9")),
+            min_samples=int(os.getenv("AI_HEDGE_MIN_SAMPLES", "20")),
+        )
+        if trigger is None or trigger >= timeout:
+            return None
+        return trigger
+
+    async def _settle(self, call: Awaitable[AIResponse], timeout: float) -> AIResponse:
+        """Await a provider call, folding exceptions into the response."""
+        response = AIResponse(content="")
+        try:
+            response = await call
+        except asyncio.TimeoutError:
+            response.error = f"Timed out after {timeout:.1f}s"
         except Exception as e:
-            return AIResponse(content="", error=str(e))
+            response.error = str(e) or type(e).__name__
+        response.provider = self.provider
+        response.model = self.model
+        response.timeout = timeout
+        return response
 
-    async def _call_gemini(self, messages: List[Dict[str, str]]) -> AIResponse:
+    async def _call_pooled(
+        self,
+        messages: List[Dict[str, str]],
+        timeout: float,
+        shortened: bool = False,
+        endpoint: Optional[Endpoint] = None,
+        profile: Optional[GenerationProfile] = None,
+    ) -> AIResponse:
+        """Dispatch to the provider through the endpoint pool.
+
+        Transport errors, timeouts and 5xx/429 responses count against the
+        endpoint and can get it ejected; anything else (bad API key, empty
+        content, safety blocks) is the request's fault, not the host's. A
+        timeout imposed by a shortened deadline share, or a cancelled hedge
+        loser, says nothing about the host either, so it is released
+        without a verdict.
+        """
+        if self.provider not in _PROVIDER_CALLS:
+            if endpoint:
+                self.pool.release(endpoint, ok=None)
+            return AIResponse(
+                content="", error=f"Unsupported provider: {self.provider}"
+            )
+
+        call = getattr(self, _PROVIDER_CALLS[self.provider])
+        if endpoint is None and self.pool:
+            endpoint = self.pool.acquire()
+        base_url = endpoint.url if endpoint else self.base_url
+        labels = {"provider": self.provider, "model": self.model}
+        started = time.monotonic()
+        latency: Optional[float] = None
+        ok: Optional[bool] = None
+        try:
+            # httpx timeouts apply per network operation; wait_for makes the
+            # budget a hard cap on the whole request.
+            response = await asyncio.wait_for(
+                call(messages, base_url=base_url, timeout=timeout, profile=profile),
+                timeout,
+            )
+            latency = time.monotonic() - started
+            ok = True
+        except Exception as e:
+            if not (shortened and isinstance(e, asyncio.TimeoutError)):
+                ok = not _is_host_failure(e)
+            metrics.inc("ai.requests", labels={**labels, "outcome": "error"})
+            raise
+        finally:
+            if endpoint:
+                self.pool.release(endpoint, latency=latency, ok=ok)
+
+        # Empty content and safety blocks come back as responses, not
+        # exceptions; they are failed requests all the same.
+        outcome = "error" if response.error else "ok"
+        metrics.inc("ai.requests", labels={**labels, "outcome": outcome})
+        metrics.observe("ai.latency", latency, labels=labels)
+        metrics.observe("ai.timeout", timeout, labels=labels)
+        if not response.error:
+            latency_stats.record(
+                self.provider,
+                self.model,
+                latency,
+                prompt_tokens=estimate_tokens("".join(m["content"] for m in messages)),
+                output_tokens=estimate_tokens(response.content),
+            )
+        response.endpoint = base_url
+        response.latency = latency
+        return response
+
+    async def _call_gemini(
+        self,
+        messages: List[Dict[str, str]],
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        profile: Optional[GenerationProfile] = None,
+    ) -> AIResponse:
         if not self.api_key:
             return AIResponse(content="", error="Gemini API key is required")
 
         prompt = self._messages_to_prompt(messages)
-        url = f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}"
+        url = f"{base_url or self.base_url}/models/{self.model}:generateContent?key={self.api_key}"
 
         async with httpx.AsyncClient() as client:
             response = await client.post(
-                url, json={"contents": [{"parts": [{"text": prompt}]}]}, timeout=60.0
+                url,
+                json={
+                    "contents": [{"parts": [{"text": prompt}]}],
+                    **_gemini_config(profile),
+                },
+                timeout=timeout or self.timeout,
             )
             response.raise_for_status()
             data = response.json()
@@ -158,13 +698,25 @@ class AIService:
                     ),
                 )
 
-            return AIResponse(content=content)
+            usage = data.get("usageMetadata", {})
+            return AIResponse(
+                content=content,
+                usage=_usage(
+                    usage.get("promptTokenCount"), usage.get("candidatesTokenCount")
+                ),
+            )
 
-    async def _call_openai(self, messages: List[Dict[str, str]]) -> AIResponse:
+    async def _call_openai(
+        self,
+        messages: List[Dict[str, str]],
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        profile: Optional[GenerationProfile] = None,
+    ) -> AIResponse:
         if not self.api_key:
             return AIResponse(content="", error="OpenAI API key is required")
 
-        url = f"{self.base_url}/chat/completions"
+        url = f"{base_url or self.base_url}/chat/completions"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -174,8 +726,12 @@ class AIService:
             response = await client.post(
                 url,
                 headers=headers,
-                json={"model": self.model, "messages": messages, "temperature": 0.7},
-                timeout=60.0,
+                json={
+                    "model": self.model,
+                    "messages": messages,
+                    **_openai_options(profile),
+                },
+                timeout=timeout or self.timeout,
             )
             response.raise_for_status()
             data = response.json()
@@ -198,9 +754,21 @@ class AIService:
                         f"finish_reason: {finish_reason}"
                     ),
                 )
-            return AIResponse(content=content)
+            usage = data.get("usage") or {}
+            return AIResponse(
+                content=content,
+                usage=_usage(
+                    usage.get("prompt_tokens"), usage.get("completion_tokens")
+                ),
+            )
 
-    async def _call_ollama(self, messages: List[Dict[str, str]]) -> AIResponse:
+    async def _call_ollama(
+        self,
+        messages: List[Dict[str, str]],
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        profile: Optional[GenerationProfile] = None,
+    ) -> AIResponse:
         """Call Ollama via /api/chat for proper system-role + chat-template handling.
 
         We deliberately use /api/chat rather than /api/generate. /api/generate
@@ -214,7 +782,7 @@ class AIService:
         turns": the model never gave the instruction full system-role weight
         in the first place.
         """
-        url = f"{self.base_url}/api/chat"
+        url = f"{base_url or self.base_url}/api/chat"
 
         async with httpx.AsyncClient() as client:
             response = await client.post(
@@ -223,11 +791,11 @@ class AIService:
                     "model": self.model,
                     "messages": messages,
                     "stream": False,
-                    # Keep options minimal so model defaults / Modelfile govern.
-                    # Callers can extend this dict later (temperature, num_ctx,
-                    # num_predict, etc.) without changing the surface.
+                    # Only what the profile sets; otherwise model defaults /
+                    # Modelfile govern.
+                    **_ollama_options(profile),
                 },
-                timeout=180.0,  # Local generation on commodity GPUs can be slow.
+                timeout=timeout or self.timeout,
             )
             response.raise_for_status()
             data = response.json()
@@ -250,10 +818,19 @@ class AIService:
                         f"done_reason: {done_reason}. Full response keys: {list(data.keys())}"
                     ),
                 )
-            return AIResponse(content=content)
+            return AIResponse(
+                content=content,
+                usage=_usage(data.get("prompt_eval_count"), data.get("eval_count")),
+            )
 
-    async def _call_openai_compatible(self, messages: List[Dict[str, str]]) -> AIResponse:
-        url = f"{self.base_url}/chat/completions"
+    async def _call_openai_compatible(
+        self,
+        messages: List[Dict[str, str]],
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        profile: Optional[GenerationProfile] = None,
+    ) -> AIResponse:
+        url = f"{base_url or self.base_url}/chat/completions"
         headers = {"Content-Type": "application/json"}
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
@@ -262,8 +839,12 @@ class AIService:
             response = await client.post(
                 url,
                 headers=headers,
-                json={"model": self.model, "messages": messages, "temperature": 0.7},
-                timeout=60.0,
+                json={
+                    "model": self.model,
+                    "messages": messages,
+                    **_openai_options(profile),
+                },
+                timeout=timeout or self.timeout,
             )
             response.raise_for_status()
             data = response.json()
@@ -286,7 +867,13 @@ class AIService:
                         f"finish_reason: {finish_reason}"
                     ),
                 )
-            return AIResponse(content=content)
+            usage = data.get("usage") or {}
+            return AIResponse(
+                content=content,
+                usage=_usage(
+                    usage.get("prompt_tokens"), usage.get("completion_tokens")
+                ),
+            )
 
     def _messages_to_prompt(self, messages: List[Dict[str, str]]) -> str:
         prompt_parts = []
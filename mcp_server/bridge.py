@@ -1,17 +1,41 @@
+import asyncio
+import json
 import logging
 import os
 from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+
+try:
+    # Optional: serves br to clients that accept it, gzip to the rest.
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
 
 os.environ["OTEL_SDK_DISABLED"] = "true"
 os.environ["CREWAI_TRACING_ENABLED"] = "false"
 os.environ["TELEMETRY_DISABLED"] = "true"
 
+from .ai_service import AIService
 from .council import CouncilManager
-from .replicants import REPLICANT_DEFINITIONS
+from .documents import configured_document_roots
+from .jobs import JobQueue, register_seg_jobs
+from .metrics import metrics, process_stats
+from .pool import all_pool_status
+from .registry_watcher import RegistryWatcher
+from .seg_core import (
+    SEGCouncilOrchestrator,
+    SEGPersonaGenerator,
+    collect_persona_specs,
+)
+from .session_store import create_session_store
+from .tool_args import validate_job_arguments
+from .warmup import ModelWarmer
+from .watchdog import LoopWatchdog
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,10 +50,59 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
+)
+
+# Session lists and replicant definitions are verbose JSON; compress them.
+_COMPRESS_MIN_BYTES = int(os.getenv("BRIDGE_COMPRESS_MIN_BYTES", "500"))
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=_COMPRESS_MIN_BYTES)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=_COMPRESS_MIN_BYTES)
+
+# Upper bound for ``limit`` on paginated listings.
+_MAX_PAGE = 200
+
+# Initialize core SEG components and the Council Manager
+persona_generator = SEGPersonaGenerator()
+council_orchestrator = SEGCouncilOrchestrator(
+    ai_service=persona_generator.ai_service, registry=persona_generator.registry
+)
+# Session state lives in a shared store (SQLite by default) so any worker
+# of a multi-process deployment can serve status for any session.
+council_manager = CouncilManager(
+    persistence=persona_generator.persistence,
+    store=create_session_store(persona_generator.persistence),
+    registry=persona_generator.registry,
 )
+job_queue = JobQueue(persona_generator.persistence, owner="bridge")
+register_seg_jobs(job_queue, persona_generator, council_orchestrator)
+loop_watchdog = LoopWatchdog()
+model_warmer = ModelWarmer(persona_generator.ai_service)
+registry_watcher = RegistryWatcher(persona_generator.registry)
 
-# Initialize Council Manager
-council_manager = CouncilManager()
+
+@app.on_event("startup")
+async def start_background_services():
+    """Start health checks, job workers, watchdog, warm-up and registry watch."""
+    ai_service = AIService()
+    if ai_service.pool:
+        ai_service.pool.start_health_checks(api_key=ai_service.api_key)
+    await job_queue.start()
+    loop_watchdog.start()
+    model_warmer.start()
+    registry_watcher.start()
+
+
+@app.on_event("shutdown")
+async def flush_registry_writes():
+    """Stop background services, then write any buffered registry saves."""
+    registry_watcher.stop()
+    await model_warmer.stop()
+    await loop_watchdog.stop()
+    # Interrupted jobs stay "running" on disk and are re-queued on restart.
+    await job_queue.shutdown()
+    persona_generator.persistence.close()
 
 
 class StartCouncilRequest(BaseModel):
@@ -37,6 +110,17 @@ class StartCouncilRequest(BaseModel):
     agent_ids: List[str]
 
 
+class SubmitJobRequest(BaseModel):
+    kind: str
+    arguments: Dict[str, Any] = {}
+
+
+class BulkPersonaRequest(BaseModel):
+    specs: Optional[List[Dict[str, Any]]] = None
+    data: Optional[str] = None
+    format: str = "jsonl"
+
+
 class CouncilStatusResponse(BaseModel):
     session_id: str
     status: str
@@ -46,18 +130,83 @@ class CouncilStatusResponse(BaseModel):
     error: Optional[str] = None
 
 
+def _replicant_summary(r_id: str, r_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": r_id,
+        "name": r_id,
+        "archetype": r_data.get("subtitle")
+        or r_data.get("core_function")
+        or "Replicant",
+        "description": r_data.get("emotional_core", "No description available"),
+        "custom": r_id not in persona_generator.registry.static_replicants,
+    }
+
+
 @app.get("/replicants")
-async def get_replicants():
-    """List all available replicant archetypes."""
-    return [
-        {
-            "id": r_id,
-            "name": r_id,
-            "archetype": r_data.get("subtitle", "Replicant"),
-            "description": r_data.get("emotional_core", "No description available"),
-        }
-        for r_id, r_data in REPLICANT_DEFINITIONS.items()
-    ]
+async def get_replicants(
+    response: Response,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=_MAX_PAGE),
+):
+    """List replicant archetypes, static and custom.
+
+    ``fields`` is a comma-separated projection (e.g. ``id,name``). With
+    ``limit`` the list is paginated by name; the next page's cursor is
+    returned in the ``X-Next-Cursor`` header so the body stays a list.
+    """
+    definitions = persona_generator.registry.get_all_definitions()
+    names = sorted(definitions)
+    if cursor:
+        names = [name for name in names if name > cursor]
+    if limit is not None and len(names) > limit:
+        names = names[:limit]
+        response.headers["X-Next-Cursor"] = names[-1]
+
+    summaries = [_replicant_summary(name, definitions[name]) for name in names]
+    if fields:
+        wanted = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = set(wanted) - set(_replicant_summary("", {}))
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown fields: {sorted(unknown)}"
+            )
+        summaries = [{f: s[f] for f in wanted} for s in summaries]
+    return summaries
+
+
+@app.post("/personas/bulk")
+async def generate_personas_bulk(request: BulkPersonaRequest):
+    """Generate many personas; streams NDJSON results, then a summary line.
+
+    Personas are committed in one write after the last item, so the final
+    ``{"summary": ...}`` line is what confirms they were saved.
+    """
+    try:
+        specs = collect_persona_specs(request.specs, request.data, request.format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def run() -> Dict[str, Any]:
+        try:
+            return await persona_generator.generate_personas_bulk(
+                specs, results.put_nowait
+            )
+        finally:
+            results.put_nowait(None)
+
+    task = asyncio.create_task(run())
+
+    async def stream():
+        while (result := await results.get()) is not None:
+            yield json.dumps(result) + "\n"
+        summary = await task
+        summary.pop("results")
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @app.post("/council/start")
@@ -73,6 +222,42 @@ async def start_council(request: StartCouncilRequest):
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@app.get("/council")
+async def list_councils(
+    ids: Optional[str] = None,
+    status: Optional[str] = None,
+    premise: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=_MAX_PAGE),
+):
+    """Bulk status (``ids=a,b,c``) or a filtered, cursor-paginated listing.
+
+    Listings are newest first and filter on status (running/complete), a
+    case-insensitive premise substring and a created_at range given as ISO
+    timestamps. Pass the returned ``next_cursor`` to fetch the next page.
+    """
+    if ids is not None:
+        session_ids = [sid.strip() for sid in ids.split(",") if sid.strip()]
+        if len(session_ids) > _MAX_PAGE:
+            raise HTTPException(
+                status_code=400, detail=f"At most {_MAX_PAGE} ids per request"
+            )
+        return council_manager.get_statuses(session_ids)
+    try:
+        return council_manager.list_sessions(
+            status=status,
+            premise=premise,
+            since=since,
+            until=until,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
 @app.get("/council/{session_id}")
 async def get_council_status(session_id: str):
     """Get the status of an active council session."""
@@ -82,12 +267,95 @@ async def get_council_status(session_id: str):
     return status
 
 
+@app.post("/council/{session_id}/resume")
+async def resume_council(session_id: str):
+    """Resume a checkpointed council session from its last completed step."""
+    status = await council_manager.resume_session(session_id)
+    if "error" in status:
+        raise HTTPException(status_code=404, detail=status["error"])
+    return status
+
+
+@app.post("/jobs")
+async def submit_job(request: SubmitJobRequest):
+    """Queue a long-running council or batch call; returns a job ID.
+
+    Arguments are checked against the tool's schema, as the MCP server's
+    submit_job does, so invalid ones get a 422 instead of failing in a worker.
+    """
+    try:
+        arguments = validate_job_arguments(request.kind, request.arguments)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=422, detail=e.errors(include_url=False, include_context=False)
+        ) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    # The bridge listens on the network: only read files from roots the
+    # operator chose, never from the built-in default.
+    if arguments.get("source") and not configured_document_roots():
+        raise HTTPException(
+            status_code=403,
+            detail="Reading source documents over HTTP requires SEG_DOCUMENT_ROOTS",
+        )
+    job_id = await job_queue.submit(request.kind, arguments)
+    return {"job_id": job_id}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Status and progress of a background job."""
+    status = job_queue.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Output of a finished job; 409 while it is still queued or running."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job.get("error"))
+    if job["status"] != "complete":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return {"job_id": job_id, "result": job["result"]}
+
+
+@app.get("/models/residency")
+async def model_residency(warm: bool = False):
+    """Models loaded on each Ollama endpoint; ``warm=true`` loads them first."""
+    if warm:
+        await model_warmer.warm()
+    return await model_warmer.residency()
+
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Server metrics plus pool health, process memory, loop lag and registry."""
+    return {
+        **metrics.snapshot(),
+        "pools": all_pool_status(),
+        "process": process_stats(),
+        "event_loop": loop_watchdog.status(),
+        "registry": registry_watcher.status(),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Worker processes need an import string rather than the app object.
+    uvicorn.run(
+        "mcp_server.bridge:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("BRIDGE_WORKERS", "1")),
+    )
@@ -0,0 +1,166 @@
+"""Record/replay cassettes for AIService.
+
+A cassette maps a request hash to the full recorded response: content,
+provider, model, endpoint, latency and token usage. With a cassette, the
+council and lens paths can be regression-tested and benchmarked offline,
+with real model output and real timing.
+
+``AI_CASSETTE_MODE`` selects the behaviour:
+
+- ``record``: every successful live response is appended to the cassette.
+- ``replay``: responses come only from the cassette. A request that was
+  never recorded returns an error response instead of reaching a model.
+- ``auto``: replay what was recorded, go live and record the rest.
+
+``AI_CASSETTE_PATH`` (default ``data/cassettes/ai.jsonl``) is a JSON Lines
+file, one ``{"key": ..., "response": {...}}`` record per line. Recording
+only appends, so a crash loses at most the line being written. A key
+recorded twice is served from its latest line.
+
+The key hashes the provider, the model, the formatted messages (system
+prompt included) and the generation profile's limits. A cassette therefore
+replays only under the provider and model it was recorded with; another
+backend's answers are never passed off as this one's.
+
+Replays return immediately. ``AI_CASSETTE_LATENCY_SCALE`` (default 0)
+makes each replay sleep for its recorded latency times the scale: 1.0
+replays at recorded speed, 0.1 ten times faster.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODES = ("off", "record", "replay", "auto")
+
+_DEFAULT_PATH = (
+    Path(__file__).resolve().parent.parent / "data" / "cassettes" / "ai.jsonl"
+)
+
+# One Cassette per file, shared by every AIService in the process.
+_cassettes: Dict[Path, "Cassette"] = {}
+_cassettes_guard = threading.Lock()
+
+
+def request_key(
+    provider: str,
+    model: str,
+    messages: List[Dict[str, str]],
+    profile: Any = None,
+) -> str:
+    """Stable hash of what determines a response."""
+    limits = asdict(profile) if profile is not None else None
+    if limits:
+        # The name only selects the limits; renaming a profile keeps its key.
+        limits.pop("name", None)
+    payload = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "messages": messages,
+            "profile": limits,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """An append-only store of recorded AI responses keyed by request."""
+
+    def __init__(self, path: Path, mode: str, latency_scale: float = 0.0):
+        self.path = Path(path)
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+
+    @property
+    def replays(self) -> bool:
+        return self.mode in ("replay", "auto")
+
+    @property
+    def records(self) -> bool:
+        return self.mode in ("record", "auto")
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        entries: Dict[str, Dict[str, Any]] = {}
+        if not self.path.exists():
+            return entries
+        with open(self.path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    entries[record["key"]] = record["response"]
+                except (json.JSONDecodeError, KeyError, TypeError) as e:
+                    # A torn last line from a crash mid-append is expected.
+                    logger.warning(
+                        "Skipping cassette line %s:%d: %s", self.path, number, e
+                    )
+        return entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        metrics.inc("ai.cassette", labels={"result": "hit" if entry else "miss"})
+        return entry
+
+    async def replay(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """The recorded response, after its scaled recorded latency."""
+        latency = entry.get("latency") or 0
+        if self.latency_scale > 0 and latency > 0:
+            await asyncio.sleep(latency * self.latency_scale)
+        return entry
+
+    def record(self, key: str, response: Any) -> None:
+        entry = {
+            f.name: getattr(response, f.name)
+            for f in fields(response)
+            if getattr(response, f.name) is not None
+        }
+        line = json.dumps(
+            {"key": key, "response": entry}, ensure_ascii=False, separators=(",", ":")
+        )
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self._entries[key] = entry
+        metrics.inc("ai.cassette", labels={"result": "recorded"})
+
+
+def get_cassette() -> Optional[Cassette]:
+    """The cassette configured by the environment, or None when off."""
+    mode = os.getenv("AI_CASSETTE_MODE", "off").lower()
+    if mode == "off":
+        return None
+    if mode not in CASSETTE_MODES:
+        logger.error("Ignoring unknown AI_CASSETTE_MODE=%s", mode)
+        return None
+    path = Path(os.getenv("AI_CASSETTE_PATH") or _DEFAULT_PATH).resolve()
+    scale = float(os.getenv("AI_CASSETTE_LATENCY_SCALE", "0"))
+    with _cassettes_guard:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = Cassette(path, mode, scale)
+            _cassettes[path] = cassette
+        else:
+            cassette.mode = mode
+            cassette.latency_scale = scale
+        return cassette
@@ -4,9 +4,12 @@ This module defines the SEGCouncilFlow for multi-agent deliberation.
 """
 
 import asyncio
+import logging
 import os
 import sys
-from typing import Any, Dict, List
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 _orig_stdout = sys.stdout
 from crewai import Agent, Flow
@@ -16,7 +19,93 @@ sys.stdout = _orig_stdout
 from pydantic import BaseModel
 
 from .ai_service import AIService
+from .metrics import metrics
+from .persistence import SEGPersistenceManager
+from .registry import RegistrySnapshot, ReplicantRegistry
 from .replicants import REPLICANT_DEFINITIONS
+from .session_store import WORKER_ID, FileSessionStore, SessionStore, owner_is_alive
+
+logger = logging.getLogger(__name__)
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in ("1", "true", "yes", "on")
+
+
+class AgentPool:
+    """Process-wide cache of CrewAI Agents, one per replicant definition.
+
+    Building an Agent with ``memory=True`` sets up CrewAI's memory storage
+    (about two seconds each), and ``verbose=True`` floods stderr. Flows
+    therefore share Agents, keyed by replicant name and that name's
+    definition version. The version is bumped, and the stale Agent dropped,
+    when an attached registry reports the replicant added, updated or
+    removed. ``SEG_AGENT_MEMORY=1`` and ``SEG_AGENT_VERBOSE=1`` turn the two
+    options back on.
+    """
+
+    def __init__(self):
+        self.memory = _env_flag("SEG_AGENT_MEMORY")
+        self.verbose = _env_flag("SEG_AGENT_VERBOSE")
+        self._agents: Dict[Tuple[str, int], Agent] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._registries: List[ReplicantRegistry] = []
+
+    def attach(self, registry: ReplicantRegistry) -> None:
+        """Invalidate Agents whenever ``registry`` changes; idempotent."""
+        with self._lock:
+            if any(r is registry for r in self._registries):
+                return
+            self._registries.append(registry)
+        registry.add_listener(self._on_registry_change)
+
+    def _on_registry_change(
+        self, snapshot: RegistrySnapshot, diff: Dict[str, List[str]]
+    ) -> None:
+        self.invalidate([name for names in diff.values() for name in names])
+
+    def invalidate(self, names: Optional[List[str]] = None) -> None:
+        """Drop the Agents for ``names``, or every Agent if None."""
+        with self._lock:
+            if names is None:
+                names = list(self._versions)
+                self._agents.clear()
+            for name in names:
+                version = self._versions.get(name, 0)
+                self._agents.pop((name, version), None)
+                self._versions[name] = version + 1
+
+    def get(self, agent_id: str, definition: Mapping[str, Any]) -> Agent:
+        with self._lock:
+            key = (agent_id, self._versions.get(agent_id, 0))
+            agent = self._agents.get(key)
+        if agent is not None:
+            metrics.inc("council.agent_pool", labels={"result": "hit"})
+            return agent
+        metrics.inc("council.agent_pool", labels={"result": "miss"})
+        # Built outside the lock; two flows racing on a miss both build and
+        # the later one wins, which only wastes one construction.
+        agent = Agent(
+            role=agent_id,
+            goal=definition["directive"],
+            backstory=(
+                f"{definition['anchor_identity']}. "
+                f"{definition['emotional_core']}. "
+                f"{definition['philosophy']}."
+            ),
+            verbose=self.verbose,
+            memory=self.memory,
+            allow_delegation=False,
+        )
+        with self._lock:
+            # Keep it only if no invalidation happened while building.
+            if key[1] == self._versions.get(agent_id, 0):
+                self._agents[key] = agent
+        return agent
+
+
+agent_pool = AgentPool()
 
 
 class CouncilState(BaseModel):
@@ -28,6 +117,9 @@ class CouncilState(BaseModel):
     synthesis: str = ""
     current_step: str = "seeding"
     is_complete: bool = False
+    session_id: str = ""
+    completed_steps: List[str] = []
+    created_at: str = ""
 
 
 class SEGCouncilFlow(Flow[CouncilState]):
@@ -36,110 +128,250 @@ class SEGCouncilFlow(Flow[CouncilState]):
     Coordinates multiple replicants through grounding, divergence, friction, and synthesis.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        checkpoint: Optional[Callable[[CouncilState], None]] = None,
+        registry: Optional[ReplicantRegistry] = None,
+    ):
         super().__init__()
         self.ai_service = AIService()  # Uses default provider/model from env
+        # Called with the state after every completed protocol step.
+        self.checkpoint = checkpoint
+        self.registry = registry
+        self.agents: Dict[str, Agent] = {}
 
-    def _get_agent(self, agent_id: str) -> Agent:
-        """Helper to create a CrewAI Agent from replicant definitions."""
-        if agent_id not in REPLICANT_DEFINITIONS:
-            raise ValueError(f"Unknown replicant: {agent_id}")
+    def _begin_step(self, step: str) -> bool:
+        """Enter a protocol step; False if a resumed session already did it."""
+        if step in self.state.completed_steps:
+            return False
+        self.state.current_step = step
+        return True
 
-        definition = REPLICANT_DEFINITIONS[agent_id]
-        return Agent(
-            role=agent_id,
-            goal=definition["directive"],
-            backstory=(
-                f"{definition['anchor_identity']}. "
-                f"{definition['emotional_core']}. "
-                f"{definition['philosophy']}."
-            ),
-            verbose=True,
-            memory=True,
-            allow_delegation=False,
+    def _complete_step(self, step: str) -> None:
+        self.state.completed_steps.append(step)
+        if self.checkpoint:
+            self.checkpoint(self.state)
+
+    def _get_agent(self, agent_id: str) -> Agent:
+        """The pooled CrewAI Agent for a replicant definition."""
+        definitions = (
+            self.registry.get_all_definitions()
+            if self.registry
+            else REPLICANT_DEFINITIONS
         )
+        if agent_id not in definitions:
+            raise ValueError(f"Unknown replicant: {agent_id}")
+        if agent_id not in self.agents:
+            self.agents[agent_id] = agent_pool.get(agent_id, definitions[agent_id])
+        return self.agents[agent_id]
 
     @start()
     def seeding(self):
         """Step 1: Seed the council with a premise."""
-        self.state.current_step = "seeding"
-        print(f"Council Seeded with premise: {self.state.premise}")
+        if self._begin_step("seeding"):
+            print(f"Council Seeded with premise: {self.state.premise}")
+            # Resolve every participant's Agent up front; after the first
+            # session these come from the pool.
+            for agent_id in self.state.agent_ids:
+                try:
+                    self._get_agent(agent_id)
+                except (ValueError, KeyError) as e:
+                    logger.warning(
+                        "Council participant %s has no Agent: %s", agent_id, e
+                    )
+            self._complete_step("seeding")
         return self.state.premise
 
     @listen(seeding)
     def grounding(self):
         """Step 2: Ground participants in their core identities."""
-        self.state.current_step = "grounding"
-        print("Protocol Step: Grounding")
-        # Each agent restates their anchor/pump context
-        for _ in self.state.agent_ids:
-            # In a real flow, we would trigger a task for the agent here
-            # agent = self._get_agent(agent_id)
-            pass
+        if self._begin_step("grounding"):
+            print("Protocol Step: Grounding")
+            # Each agent restates their anchor/pump context
+            for _ in self.state.agent_ids:
+                # In a real flow, we would trigger a task for the agent here
+                # agent = self._get_agent(agent_id)
+                pass
+            self._complete_step("grounding")
         return "grounding_complete"
 
     @listen(grounding)
     def divergence(self):
         """Step 3: Explore diverse perspectives."""
-        self.state.current_step = "divergence"
-        print("Protocol Step: Divergence")
-        # Parallel responses from participants
+        if self._begin_step("divergence"):
+            print("Protocol Step: Divergence")
+            # Parallel responses from participants
+            self._complete_step("divergence")
         return "divergence_complete"
 
     @listen(divergence)
     def friction(self):
         """Step 4: Engage in cross-agent critique/friction."""
-        self.state.current_step = "friction"
-        print("Protocol Step: Friction")
-        # Directed cross-responses
+        if self._begin_step("friction"):
+            print("Protocol Step: Friction")
+            # Directed cross-responses
+            self._complete_step("friction")
         return "friction_complete"
 
     @listen(friction)
     def synthesis_step(self):
         """Step 5: Synthesize the deliberation into a final output."""
-        self.state.current_step = "synthesis"
-        print("Protocol Step: Synthesis")
-        # Final summary by the distiller
-        self.state.synthesis = (
-            "The council has reached a tentative synthesis based on the premise..."
-        )
-        self.state.is_complete = True
+        if self._begin_step("synthesis"):
+            print("Protocol Step: Synthesis")
+            # Final summary by the distiller
+            self.state.synthesis = (
+                "The council has reached a tentative synthesis based on the premise..."
+            )
+            self.state.is_complete = True
+            self._complete_step("synthesis")
         return "synthesis_complete"
 
 
 class CouncilManager:
-    """Manages multiple active Council Flow sessions."""
+    """Manages multiple active Council Flow sessions.
 
-    def __init__(self):
+    Flows run in this process, but every checkpoint goes to ``store`` so
+    that other processes sharing it can report status and take over
+    sessions whose worker has died.
+    """
+
+    def __init__(
+        self,
+        persistence: Optional[SEGPersistenceManager] = None,
+        store: Optional[SessionStore] = None,
+        registry: Optional[ReplicantRegistry] = None,
+    ):
         self.active_flows: Dict[str, SEGCouncilFlow] = {}
+        self.persistence = persistence or SEGPersistenceManager()
+        self.store = store or FileSessionStore(self.persistence)
+        self.registry = registry
+        if registry is not None:
+            agent_pool.attach(registry)
 
     async def start_session(self, premise: str, agent_ids: List[str]) -> str:
         """Starts a new council deliberation session."""
         session_id = f"session_{os.urandom(4).hex()}"
-        council_flow = SEGCouncilFlow()
+        council_flow = self._build_flow()
         council_flow.state.premise = premise
         council_flow.state.agent_ids = agent_ids
+        council_flow.state.session_id = session_id
+        council_flow.state.created_at = datetime.now(timezone.utc).isoformat()
         self.active_flows[session_id] = council_flow
+        self._checkpoint(council_flow.state)
 
         # Run in background
         asyncio.create_task(council_flow.kickoff_async())
         return session_id
 
+    async def resume_session(self, session_id: str) -> Dict[str, Any]:
+        """Restart a checkpointed flow; completed steps are skipped."""
+        if session_id in self.active_flows:
+            return self.get_status(session_id)
+
+        checkpoint = self.store.load(session_id)
+        if not checkpoint or checkpoint.get("kind") != "flow":
+            return {"error": "Session not found"}
+        if checkpoint["status"] != "complete" and owner_is_alive(
+            checkpoint.get("owner")
+        ):
+            # Still executing in a sibling worker; report instead of forking it.
+            return self._status_from_state(session_id, checkpoint["state"])
+
+        council_flow = self._build_flow()
+        for field, value in checkpoint["state"].items():
+            setattr(council_flow.state, field, value)
+        self.active_flows[session_id] = council_flow
+
+        if not council_flow.state.is_complete:
+            self._checkpoint(council_flow.state)  # claim it for this worker
+            asyncio.create_task(council_flow.kickoff_async())
+        return {
+            **self.get_status(session_id),
+            "resumed_after": council_flow.state.completed_steps[-1:] or None,
+        }
+
     def get_status(self, session_id: str) -> Dict[str, Any]:
         """Retrieves the status of a specific council session."""
         council_flow = self.active_flows.get(session_id)
-        if not council_flow:
+        if council_flow:
+            return self._status_from_state(session_id, council_flow.state.model_dump())
+        # Started by another worker (or before a restart): last checkpoint.
+        checkpoint = self.store.load(session_id)
+        if not checkpoint or checkpoint.get("kind") != "flow":
             return {"error": "Session not found"}
+        return self._status_from_state(session_id, checkpoint["state"])
+
+    def get_statuses(self, session_ids: List[str]) -> Dict[str, Any]:
+        """Status for many sessions with one store read for the non-local ones."""
+        local = {sid for sid in session_ids if sid in self.active_flows}
+        stored = self.store.load_many(sid for sid in session_ids if sid not in local)
+        sessions, missing = [], []
+        for session_id in session_ids:
+            if session_id in local:
+                sessions.append(self.get_status(session_id))
+            elif stored.get(session_id, {}).get("kind") == "flow":
+                state = stored[session_id]["state"]
+                sessions.append(self._status_from_state(session_id, state))
+            else:
+                missing.append(session_id)
+        return {"sessions": sessions, "missing": missing}
+
+    def list_sessions(
+        self,
+        status: Optional[str] = None,
+        premise: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """Newest-first page of flow sessions matching the filters."""
+        records, next_cursor = self.store.query(
+            kind="flow",
+            status=status,
+            premise=premise,
+            since=since,
+            until=until,
+            cursor=cursor,
+            limit=limit,
+        )
+        sessions = []
+        for record in records:
+            if record["id"] in self.active_flows:
+                sessions.append(self.get_status(record["id"]))
+            else:
+                sessions.append(self._status_from_state(record["id"], record["state"]))
+        return {"sessions": sessions, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _status_from_state(session_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
         return {
             "session_id": session_id,
-            "current_step": council_flow.state.current_step,
-            "premise": council_flow.state.premise,
-            "agent_ids": council_flow.state.agent_ids,
-            "responses_count": len(council_flow.state.responses),
-            "is_complete": council_flow.state.is_complete,
-            "results": {"synthesis": council_flow.state.synthesis},
+            "current_step": state["current_step"],
+            "premise": state["premise"],
+            "agent_ids": state["agent_ids"],
+            "responses_count": len(state["responses"]),
+            "is_complete": state["is_complete"],
+            "created_at": state.get("created_at", ""),
+            "results": {"synthesis": state["synthesis"]},
         }
 
+    def _build_flow(self) -> SEGCouncilFlow:
+        return SEGCouncilFlow(checkpoint=self._checkpoint, registry=self.registry)
+
+    def _checkpoint(self, state: CouncilState) -> None:
+        fields = set(CouncilState.model_fields)
+        self.store.save(
+            {
+                "id": state.session_id,
+                "kind": "flow",
+                "status": "complete" if state.is_complete else "running",
+                "owner": WORKER_ID,
+                "created_at": state.created_at,
+                "state": state.model_dump(include=fields),
+            }
+        )
+
 
 if __name__ == "__main__":
     # Test execution
@@ -0,0 +1,123 @@
+"""Long source documents for lens analysis.
+
+``read_document`` loads a document named by a path or ``file://`` URI, so a
+long source does not travel as one giant JSON tool argument. The file is
+memory-mapped and decoded in a single pass, with no buffered reads.
+Only files under ``SEG_DOCUMENT_ROOTS`` (os.pathsep-separated) can be
+read, or under data/documents/ when it is unset. Sources are resolved,
+symlinks and ``..`` included, before they are checked against the roots.
+``SEG_DOCUMENT_MAX_BYTES`` (default 20 MB) caps the size.
+
+``split_document`` cuts a document into chunks of at most ``max_tokens``
+along its own structure. Each Markdown section starts a new chunk, unless
+several whole sections fit in one. A section too long for one chunk is cut
+into blank-line paragraphs, then sentences, and only a single sentence that
+is still too long is hard-cut. Neighbouring pieces are packed together up
+to the limit, so chunks stay as large, and as few, as the budget allows.
+"""
+
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import List
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+
+from .latency import estimate_tokens
+
+_HEADING = re.compile(r"^(?=#{1,6}\s)", re.MULTILINE)
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+_DEFAULT_ROOT = Path(__file__).resolve().parent.parent / "data" / "documents"
+
+
+def resolve_source(source: str) -> Path:
+    """The local path named by a plain path or a ``file://`` URI."""
+    parsed = urlparse(source)
+    if parsed.scheme == "file":
+        if parsed.netloc not in ("", "localhost"):
+            raise ValueError(f"Remote file URIs are not supported: {source}")
+        return Path(url2pathname(unquote(parsed.path))).resolve()
+    # A single letter is a Windows drive, not a scheme.
+    if parsed.scheme and len(parsed.scheme) > 1:
+        raise ValueError(f"Unsupported source scheme: {parsed.scheme}")
+    return Path(source).expanduser().resolve()
+
+
+def configured_document_roots() -> List[Path]:
+    """Roots set explicitly through SEG_DOCUMENT_ROOTS; empty when unset."""
+    raw = os.getenv("SEG_DOCUMENT_ROOTS", "")
+    return [Path(r).expanduser().resolve() for r in raw.split(os.pathsep) if r]
+
+
+def document_roots() -> List[Path]:
+    """Directories documents may be read from."""
+    return configured_document_roots() or [_DEFAULT_ROOT]
+
+
+def read_document(source: str) -> str:
+    """Read a UTF-8 document by path or URI; raises ValueError or OSError."""
+    # Fully resolved, so a symlink or ".." cannot lead out of a root.
+    path = resolve_source(source)
+    if not any(path.is_relative_to(root) for root in document_roots()):
+        raise ValueError(f"{source} is outside the document roots")
+    max_bytes = int(os.getenv("SEG_DOCUMENT_MAX_BYTES", str(20 * 1024 * 1024)))
+    # O_NOFOLLOW: a file swapped for a symlink after the check is refused.
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    with open(fd, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size > max_bytes:
+            raise ValueError(f"{path} is {size} bytes; the limit is {max_bytes}")
+        if size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return str(mapped[:], "utf-8", errors="replace")
+
+
+def _pieces(text: str, max_tokens: int) -> List[str]:
+    """Structural pieces of ``text``, each within ``max_tokens``."""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    for split in (_PARAGRAPH.split, _SENTENCE.split):
+        parts = [p.strip() for p in split(text) if p.strip()]
+        if len(parts) > 1:
+            return [piece for part in parts for piece in _pieces(part, max_tokens)]
+    # No structure left: cut at the token budget (~4 characters per token).
+    width = max_tokens * 4
+    return [text[i : i + width] for i in range(0, len(text), width)]
+
+
+def pack(pieces: List[str], max_tokens: int, separator: str = "\n\n") -> List[str]:
+    """Join consecutive pieces into as few groups as fit ``max_tokens``."""
+    groups: List[str] = []
+    current: List[str] = []
+    size = 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if current and size + tokens > max_tokens:
+            groups.append(separator.join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += tokens
+    if current:
+        groups.append(separator.join(current))
+    return groups
+
+
+def split_document(text: str, max_tokens: int) -> List[str]:
+    """Chunks of at most ``max_tokens``, cut along the document's structure."""
+    chunks: List[str] = []
+    whole: List[str] = []  # consecutive sections that each fit in one chunk
+    for section in (s.strip() for s in _HEADING.split(text)):
+        if not section:
+            continue
+        if estimate_tokens(section) <= max_tokens:
+            whole.append(section)
+            continue
+        chunks.extend(pack(whole, max_tokens))
+        whole = []
+        chunks.extend(pack(_pieces(section, max_tokens), max_tokens))
+    chunks.extend(pack(whole, max_tokens))
+    return chunks
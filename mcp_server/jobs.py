@@ -0,0 +1,269 @@
+"""Background job queue for long-running council and batch work.
+
+Tools such as run_council_session can hold an MCP call open for minutes
+while a local model generates. ``submit_job`` instead records the request
+under data/jobs/, returns a job ID immediately and lets a small pool of
+async workers drain the queue; callers poll ``get_job_status`` and fetch
+the output with ``get_job_result``.
+
+Every state change is written to the job's record, so queued or
+interrupted jobs are picked up again when the owning process restarts.
+A council job records its session ID, so a re-run resumes the session
+from its last checkpoint instead of generating every turn again.
+Each kind of process owns its own jobs (``owner``), which keeps the MCP
+server and the bridge from running the same job twice when they share a
+data dir; jobs still held by a live sibling worker are left alone.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional
+
+from .persistence import SEGPersistenceManager
+from .seg_core import collect_persona_specs
+from .session_store import WORKER_ID, owner_is_alive
+
+if TYPE_CHECKING:
+    from .seg_core import SEGCouncilOrchestrator, SEGPersonaGenerator
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any], "JobProgress"], Awaitable[Any]]
+
+_TERMINAL = ("complete", "failed")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobProgress:
+    """The ``progress`` argument of a handler; call it to report progress.
+
+    ``state`` is stored in the job record. A handler notes there what it
+    needs to carry on, rather than start over, if the job is re-run after
+    a restart.
+    """
+
+    def __init__(self, queue: "JobQueue", job: Dict[str, Any]):
+        self._queue = queue
+        self._job = job
+
+    def __call__(self, fraction: float, message: str) -> None:
+        """Report progress: a fraction from 0 to 1 and a short message."""
+        self._job["progress"] = max(0.0, min(1.0, fraction))
+        self._job["message"] = message
+        self._queue._save(self._job)
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        return self._job.setdefault("state", {})
+
+    def save_state(self, **values: Any) -> None:
+        self.state.update(values)
+        self._queue._save(self._job)
+
+
+class JobQueue:
+    """Persistent FIFO of jobs drained by a pool of asyncio workers."""
+
+    def __init__(
+        self,
+        persistence: SEGPersistenceManager,
+        owner: str,
+        workers: Optional[int] = None,
+    ):
+        self.persistence = persistence
+        self.owner = owner
+        self.worker_count = max(1, workers or int(os.getenv("SEG_JOB_WORKERS", "2")))
+        self.handlers: Dict[str, JobHandler] = {}
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Make ``kind`` submittable; the handler gets (arguments, progress)."""
+        self.handlers[kind] = handler
+
+    async def start(self) -> None:
+        """Start the workers and re-queue this owner's unfinished jobs."""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+        ]
+        for job_id in self.persistence.list_jobs():
+            # Check and take over under the record's lock: sibling workers
+            # starting together must not both re-queue the same orphan.
+            job = self.persistence.claim_job(job_id, self._claim_orphan)
+            if job is not None:
+                self.jobs[job_id] = job
+                self._queue.put_nowait(job_id)
+
+    def _claim_orphan(self, job: Dict[str, Any]) -> bool:
+        if job.get("owner") != self.owner or job["status"] in _TERMINAL:
+            return False
+        if owner_is_alive(job.get("worker")):
+            return False
+        job.update(status="queued", message="Re-queued after restart", worker=WORKER_ID)
+        return True
+
+    async def submit(self, kind: str, arguments: Dict[str, Any]) -> str:
+        """Queue a job and return its ID without waiting for it to run."""
+        if kind not in self.handlers:
+            raise ValueError(
+                f"Unknown job kind: {kind}. Available: {sorted(self.handlers)}"
+            )
+        await self.start()
+        job_id = f"job_{os.urandom(6).hex()}"
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "arguments": arguments,
+            "owner": self.owner,
+            "worker": WORKER_ID,
+            "status": "queued",
+            "progress": 0.0,
+            "message": "Queued",
+            "created_at": _now(),
+        }
+        self._save(job)
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Full job record, from memory or disk (jobs of other processes too)."""
+        return self.jobs.get(job_id) or self.persistence.load_job(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job record without arguments or result, for cheap polling."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        return {k: v for k, v in job.items() if k not in ("arguments", "result")}
+
+    def pending(self) -> int:
+        """Jobs waiting for a worker."""
+        return self._queue.qsize() if self._queue else 0
+
+    async def shutdown(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = self.get(job_id)
+        if job is None or job["status"] in _TERMINAL:
+            return
+        job.update(
+            status="running", started_at=_now(), message="Running", worker=WORKER_ID
+        )
+        self._save(job)
+
+        try:
+            result = await self.handlers[job["kind"]](
+                job["arguments"], JobProgress(self, job)
+            )
+        except asyncio.CancelledError:
+            # Shutdown mid-job: leave it "running" so start() re-queues it.
+            raise
+        except Exception as e:
+            logger.error("Job %s (%s) failed: %s", job_id, job["kind"], e)
+            job.update(status="failed", error=str(e), message="Failed")
+        else:
+            job.update(status="complete", result=result, progress=1.0, message="Done")
+        job["finished_at"] = _now()
+        self._save(job)
+        # Finished jobs are served from disk; keep memory bounded.
+        self.jobs.pop(job_id, None)
+
+    def _save(self, job: Dict[str, Any]) -> None:
+        if job["status"] not in _TERMINAL:
+            self.jobs[job["id"]] = job
+        self.persistence.save_job(job)
+
+
+def register_seg_jobs(
+    queue: JobQueue,
+    persona_generator: "SEGPersonaGenerator",
+    orchestrator: "SEGCouncilOrchestrator",
+) -> None:
+    """Register the SEG tools that are worth running in the background.
+
+    The tools answer failures with a message; a job must end "failed"
+    instead, so the handlers raise them.
+    """
+
+    def council_output(session_id: Optional[str], output: str) -> str:
+        """``output`` if the session completed; raises otherwise."""
+        session = orchestrator.active_sessions.get(session_id) if session_id else None
+        if session is None:
+            # Rejected before a session started, e.g. an unknown replicant.
+            raise ValueError(output)
+        if session["status"] != "complete":
+            raise RuntimeError(output)
+        return output
+
+    async def run_council(arguments: Dict[str, Any], progress: JobProgress):
+        # Re-run after a restart: continue the checkpointed session instead
+        # of generating its finished turns again.
+        session_id = progress.state.get("session_id")
+        if session_id:
+            progress(0.05, "Council session resuming")
+            output = await orchestrator.resume_session(session_id)
+        else:
+            progress(0.05, "Council session generating")
+            output = await orchestrator.run_session(
+                **arguments,
+                on_start=lambda session_id: progress.save_state(session_id=session_id),
+            )
+        return council_output(progress.state.get("session_id"), output)
+
+    async def resume_council(arguments: Dict[str, Any], progress: JobProgress):
+        progress(0.05, "Council session resuming")
+        session_id = arguments["session_id"]
+        return council_output(session_id, await orchestrator.resume_session(session_id))
+
+    async def analyze(arguments: Dict[str, Any], progress: JobProgress):
+        progress(0.05, "Analysis generating")
+        return await persona_generator.analyze_through_lens(
+            **arguments, progress=progress, raise_errors=True
+        )
+
+    async def generate(arguments: Dict[str, Any], progress: JobProgress):
+        return await persona_generator.generate_persona(**arguments)
+
+    async def generate_bulk(arguments: Dict[str, Any], progress: JobProgress):
+        specs = collect_persona_specs(
+            arguments.get("specs"),
+            arguments.get("data"),
+            arguments.get("format", "jsonl"),
+        )
+
+        # Each progress update rewrites the job record; report every ~5%.
+        step = max(1, len(specs) // 20)
+
+        def on_result(result: Dict[str, Any]) -> None:
+            done = result["index"] + 1
+            if done % step == 0 or done == len(specs):
+                progress(done / len(specs), f"{done}/{len(specs)} personas built")
+
+        return await persona_generator.generate_personas_bulk(specs, on_result)
+
+    queue.register("run_council_session", run_council)
+    queue.register("resume_council_session", resume_council)
+    queue.register("analyze_through_seg_lens", analyze)
+    queue.register("generate_persona", generate)
+    queue.register("generate_personas_bulk", generate_bulk)
@@ -0,0 +1,117 @@
+"""Rolling latency statistics per provider and model.
+
+AIService records every successful generation here. The rolling window
+feeds decisions that need to know what "normal" looks like for a given
+backend: when a request has run long enough to be worth hedging, and how
+long a new request should be allowed to run before it is presumed dead.
+
+Raw latency is dominated by how much text goes in and comes out, so each
+sample also keeps rough token counts. ``rate`` normalizes a sample to
+seconds per unit of work, where prompt tokens are weighted well below
+output tokens (prefill is batched, decode is sequential); a timeout for
+a new request is then a high quantile of that rate times its own work.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional, Tuple
+
+# Recent-sample window per (provider, model). Large enough for a stable
+# p90, small enough to follow a host being swapped or a model reloaded.
+_WINDOW = 200
+
+# Relative cost of one prompt token versus one generated token.
+PROMPT_TOKEN_WEIGHT = 0.1
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap provider-agnostic token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def work_units(prompt_tokens: int, output_tokens: int) -> float:
+    return 1.0 + output_tokens + PROMPT_TOKEN_WEIGHT * prompt_tokens
+
+
+class LatencySample(NamedTuple):
+    seconds: float
+    prompt_tokens: int
+    output_tokens: int
+
+    @property
+    def rate(self) -> float:
+        return self.seconds / work_units(self.prompt_tokens, self.output_tokens)
+
+
+def _nearest_rank(values, q: float) -> float:
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class LatencyTracker:
+    """Keeps the last few hundred samples for each (provider, model)."""
+
+    def __init__(self, window: int = _WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, str], Deque[LatencySample]] = {}
+
+    def record(
+        self,
+        provider: str,
+        model: Optional[str],
+        seconds: float,
+        prompt_tokens: int = 0,
+        output_tokens: int = 0,
+    ) -> None:
+        key = (provider, model or "")
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(LatencySample(seconds, prompt_tokens, output_tokens))
+
+    def quantile(
+        self, provider: str, model: Optional[str], q: float, min_samples: int = 1
+    ) -> Optional[float]:
+        """Nearest-rank latency quantile, or None below ``min_samples``."""
+        samples = self._snapshot(provider, model)
+        if len(samples) < max(1, min_samples):
+            return None
+        return _nearest_rank([s.seconds for s in samples], q)
+
+    def rate_quantile(
+        self, provider: str, model: Optional[str], q: float, min_samples: int = 1
+    ) -> Optional[float]:
+        """Quantile of seconds-per-work-unit, or None below ``min_samples``."""
+        samples = self._snapshot(provider, model)
+        if len(samples) < max(1, min_samples):
+            return None
+        return _nearest_rank([s.rate for s in samples], q)
+
+    def typical_output_tokens(
+        self, provider: str, model: Optional[str]
+    ) -> Optional[int]:
+        """Median output length seen for this backend, if any samples exist."""
+        samples = self._snapshot(provider, model)
+        if not samples:
+            return None
+        return int(_nearest_rank([s.output_tokens for s in samples], 0.5))
+
+    def count(self, provider: str, model: Optional[str]) -> int:
+        return len(self._snapshot(provider, model))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+    def _snapshot(
+        self, provider: str, model: Optional[str]
+    ) -> Tuple[LatencySample, ...]:
+        with self._lock:
+            return tuple(self._samples.get((provider, model or ""), ()))
+
+
+latency_stats = LatencyTracker()
@@ -0,0 +1,427 @@
+"""Load generator and soak harness for the SEG MCP server and bridge.
+
+Spawns ``mcp_server.server`` over stdio (and optionally the bridge under
+uvicorn) in a scratch working directory, points both at an in-process
+stub LLM (see stub_llm.py), and replays a weighted mix of tool calls at a
+target arrival rate for a fixed duration. Arrivals are open-loop: when
+``--max-inflight`` calls are already outstanding, new arrivals are counted
+as dropped instead of queued, so saturation shows up in the numbers
+rather than stretching the schedule.
+
+While the load runs, a monitor samples each target every few seconds:
+
+- **Loop lag:** round-trip of a trivial call (``list_tools`` or
+  ``GET /health``). Once the transport's own latency is taken out, this is
+  how long the event loop takes to get to new work.
+- **RSS:** the process's resident memory, from ``get_server_metrics`` or
+  ``GET /metrics``. Growth across a soak points at leaks such as session
+  dicts that never shrink.
+
+    python -m mcp_server.loadtest --duration 600 --rate 5 \\
+        --mix generate_persona=4,analyze_through_seg_lens=4,run_council_session=1,start_seg_council=1 \\
+        --bridge --output soak.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from mcp import ClientSession
+from mcp.client.stdio import StdioServerParameters, stdio_client
+
+from .stub_llm import StubLLMServer
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MCP_MIX = (
+    "generate_persona=4,analyze_through_seg_lens=4,"
+    "run_council_session=1,start_seg_council=1"
+)
+DEFAULT_BRIDGE_MIX = "council_start=2,council_status=4,replicants=4,persona_bulk=1"
+
+_SAMPLE_TEXT = (
+    "Every measurement disturbs the thing measured, and every memory rewrites "
+    "the moment it recalls. What, then, is the stable self we keep referring to?"
+)
+_COUNCIL = ["Bayesian Sage", "Comedic Trickster", "Essentia Distiller"]
+
+Call = Callable[[str, int], Awaitable[Any]]
+
+
+def _mcp_arguments(op: str, n: int) -> Dict[str, Any]:
+    if op == "generate_persona":
+        return {
+            "name": f"Load Persona {n}",
+            "profession": "Systems Tester",
+            "defining_experience": "Watching a queue grow without bound",
+        }
+    if op == "analyze_through_seg_lens":
+        return {"text": _SAMPLE_TEXT, "persona_or_replicant": "Bayesian Sage"}
+    if op == "run_council_session":
+        return {"premise": _SAMPLE_TEXT, "replicants": _COUNCIL, "cycles": 1}
+    if op == "start_seg_council":
+        return {"premise": _SAMPLE_TEXT, "agent_ids": _COUNCIL}
+    raise ValueError(f"No argument template for tool: {op}")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """``"a=3,b=1"`` -> ``{"a": 3.0, "b": 1.0}``."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name:
+            mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return round(ordered[rank], 4)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Recorder:
+    """Latencies and outcomes per operation for one target."""
+
+    def __init__(self, target: str):
+        self.target = target
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.dropped = 0
+        self.lag: List[float] = []
+        self.rss: List[int] = []
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    def ok(self, op: str, seconds: float) -> None:
+        self.latencies.setdefault(op, []).append(seconds)
+
+    def error(self, op: str) -> None:
+        self.errors[op] = self.errors.get(op, 0) + 1
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        completed = sum(len(v) for v in self.latencies.values())
+        ops = {}
+        for op in sorted(set(self.latencies) | set(self.errors)):
+            values = self.latencies.get(op, [])
+            ops[op] = {
+                "ok": len(values),
+                "errors": self.errors.get(op, 0),
+                "p50": percentile(values, 0.5),
+                "p90": percentile(values, 0.9),
+                "p99": percentile(values, 0.99),
+                "max": round(max(values), 4) if values else None,
+            }
+        report: Dict[str, Any] = {
+            "target": self.target,
+            "duration_seconds": round(elapsed, 1),
+            "completed": completed,
+            "errors": sum(self.errors.values()),
+            "dropped": self.dropped,
+            "throughput_per_second": round(completed / elapsed, 2) if elapsed else 0,
+            "operations": ops,
+            "loop_lag_seconds": {
+                "p50": percentile(self.lag, 0.5),
+                "p99": percentile(self.lag, 0.99),
+                "max": round(max(self.lag), 4) if self.lag else None,
+            },
+        }
+        if self.rss:
+            report["rss_bytes"] = {
+                "first": self.rss[0],
+                "last": self.rss[-1],
+                "max": max(self.rss),
+                "growth": self.rss[-1] - self.rss[0],
+            }
+        return report
+
+
+async def drive(
+    call: Call,
+    mix: Dict[str, float],
+    rate: float,
+    duration: float,
+    max_inflight: int,
+    recorder: Recorder,
+) -> None:
+    """Issue ``rate`` calls per second drawn from ``mix`` for ``duration``."""
+    loop = asyncio.get_running_loop()
+    names, weights = list(mix), list(mix.values())
+    counter = itertools.count()
+    inflight: set = set()
+
+    async def one(op: str, n: int) -> None:
+        started = time.perf_counter()
+        try:
+            await call(op, n)
+        except Exception:
+            recorder.error(op)
+        else:
+            recorder.ok(op, time.perf_counter() - started)
+
+    deadline = loop.time() + duration
+    next_at = loop.time()
+    while loop.time() < deadline:
+        op = random.choices(names, weights)[0]
+        if len(inflight) >= max_inflight:
+            recorder.dropped += 1
+        else:
+            task = asyncio.create_task(one(op, next(counter)))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+        next_at += 1.0 / rate
+        await asyncio.sleep(max(0.0, next_at - loop.time()))
+    if inflight:
+        await asyncio.gather(*inflight)
+    recorder.finished = time.monotonic()
+
+
+async def monitor(
+    probe: Callable[[], Awaitable[None]],
+    rss: Callable[[], Awaitable[Optional[int]]],
+    recorder: Recorder,
+    interval: float,
+    stop: asyncio.Event,
+) -> None:
+    """Sample loop lag and RSS every ``interval`` seconds until ``stop``."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            await probe()
+            recorder.lag.append(time.perf_counter() - started)
+            value = await rss()
+            if value:
+                recorder.rss.append(value)
+        except Exception:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _target_env(llm_url: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        {
+            "AI_PROVIDER": "ollama",
+            "OLLAMA_BASE_URL": llm_url,
+            "OLLAMA_BASE_URLS": llm_url,
+            "OLLAMA_MODEL": "stub",
+            "PYTHONPATH": os.pathsep.join(
+                filter(None, [str(_PROJECT_ROOT), env.get("PYTHONPATH")])
+            ),
+        }
+    )
+    return env
+
+
+async def run_mcp(args, llm_url: str, workdir: Path, stop: asyncio.Event) -> Recorder:
+    recorder = Recorder("mcp")
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=["-m", "mcp_server.server"],
+        env=_target_env(llm_url),
+        cwd=str(workdir),
+    )
+    with open(workdir / "mcp_server.log", "w", encoding="utf-8") as errlog:
+        async with stdio_client(params, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+
+                async def call(op: str, n: int) -> None:
+                    result = await session.call_tool(op, _mcp_arguments(op, n))
+                    if result.isError:
+                        raise RuntimeError(result.content)
+
+                async def rss() -> Optional[int]:
+                    result = await session.call_tool("get_server_metrics", {})
+                    return json.loads(result.content[0].text)["process"]["rss_bytes"]
+
+                watcher = asyncio.create_task(
+                    monitor(
+                        session.list_tools, rss, recorder, args.sample_interval, stop
+                    )
+                )
+                await drive(
+                    call,
+                    parse_mix(args.mix),
+                    args.rate,
+                    args.duration,
+                    args.max_inflight,
+                    recorder,
+                )
+                stop.set()
+                await watcher
+    return recorder
+
+
+async def run_bridge(
+    args, llm_url: str, workdir: Path, stop: asyncio.Event
+) -> Recorder:
+    recorder = Recorder("bridge")
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    log = open(workdir / "bridge.log", "w", encoding="utf-8")
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "mcp_server.bridge:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(args.bridge_workers),
+        ],
+        cwd=str(workdir),
+        env=_target_env(llm_url),
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    session_ids: List[str] = []
+    try:
+        async with httpx.AsyncClient(base_url=base, timeout=args.timeout) as client:
+            for _ in range(100):
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.2)
+            else:
+                raise RuntimeError("Bridge did not become healthy; see bridge.log")
+
+            async def call(op: str, n: int) -> None:
+                if op == "council_start":
+                    response = await client.post(
+                        "/council/start",
+                        json={"premise": _SAMPLE_TEXT, "agent_ids": _COUNCIL},
+                    )
+                    response.raise_for_status()
+                    session_ids.append(response.json()["session_id"])
+                    return
+                if op == "council_status":
+                    ids = ",".join(session_ids[-20:])
+                    response = await client.get("/council", params={"ids": ids})
+                elif op == "replicants":
+                    response = await client.get("/replicants")
+                elif op == "persona_bulk":
+                    spec = _mcp_arguments("generate_persona", n)
+                    response = await client.post(
+                        "/personas/bulk", json={"specs": [spec]}
+                    )
+                else:
+                    raise ValueError(f"Unknown bridge operation: {op}")
+                response.raise_for_status()
+
+            async def probe() -> None:
+                (await client.get("/health")).raise_for_status()
+
+            async def rss() -> Optional[int]:
+                response = await client.get("/metrics")
+                return response.json()["process"]["rss_bytes"]
+
+            watcher = asyncio.create_task(
+                monitor(probe, rss, recorder, args.sample_interval, stop)
+            )
+            await drive(
+                call,
+                parse_mix(args.bridge_mix),
+                args.bridge_rate or args.rate,
+                args.duration,
+                args.max_inflight,
+                recorder,
+            )
+            stop.set()
+            await watcher
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+    return recorder
+
+
+async def run(args) -> Dict[str, Any]:
+    stub = StubLLMServer(
+        latency=args.llm_latency, per_token=args.llm_per_token, jitter=args.llm_jitter
+    )
+    llm_url = stub.start()
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="seg-load-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    try:
+        runs = [run_mcp(args, llm_url, workdir, asyncio.Event())]
+        if args.bridge:
+            runs.append(run_bridge(args, llm_url, workdir, asyncio.Event()))
+        recorders = await asyncio.gather(*runs)
+    finally:
+        stub.stop()
+        if not args.workdir and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "config": {
+            "duration": args.duration,
+            "rate": args.rate,
+            "mix": parse_mix(args.mix),
+            "llm_latency": args.llm_latency,
+        },
+        "stub_llm_requests": stub.requests,
+        "targets": [r.report() for r in recorders],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="SEG MCP/bridge load generator")
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--rate", type=float, default=2, help="calls per second")
+    parser.add_argument("--mix", default=DEFAULT_MCP_MIX, help="tool=weight,...")
+    parser.add_argument("--max-inflight", type=int, default=32)
+    parser.add_argument("--sample-interval", type=float, default=5, help="seconds")
+    parser.add_argument("--timeout", type=float, default=120, help="HTTP timeout")
+    parser.add_argument("--bridge", action="store_true", help="also load the bridge")
+    parser.add_argument("--bridge-mix", default=DEFAULT_BRIDGE_MIX)
+    parser.add_argument("--bridge-rate", type=float, default=None)
+    parser.add_argument("--bridge-workers", type=int, default=1)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--llm-per-token", type=float, default=0.0)
+    parser.add_argument("--llm-jitter", type=float, default=0.0)
+    parser.add_argument("--workdir", help="run targets here instead of a temp dir")
+    parser.add_argument("--keep", action="store_true", help="keep the temp workdir")
+    parser.add_argument("--output", help="also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
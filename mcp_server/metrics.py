@@ -0,0 +1,120 @@
+"""Process-wide metrics for the SEG MCP server and bridge.
+
+Counters and histograms live in one module-level ``metrics`` registry so
+any component can record without threading a handle through constructors.
+The registry is exposed by the ``get_server_metrics`` MCP tool and the
+bridge's ``GET /metrics`` endpoint; stdout stays reserved for MCP traffic.
+"""
+
+import bisect
+import os
+import sys
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+# Default latency buckets in seconds, spanning a fast hosted call up to a
+# deep local council generation.
+DEFAULT_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 90, 120, 180, 300, 600)
+
+
+def _key(name: str, labels: Optional[Dict[str, Any]]) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+    return f"{name}{{{rendered}}}"
+
+
+class Histogram:
+    """Cumulative bucketed histogram with running count and sum."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        bounds = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "buckets": dict(zip(bounds, self.counts)),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by name plus labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def inc(
+        self, name: str, amount: float = 1, labels: Optional[Dict[str, Any]] = None
+    ) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: Optional[Dict[str, Any]] = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def counter(self, name: str, labels: Optional[Dict[str, Any]] = None) -> float:
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(sorted(self._counters.items())),
+                "histograms": {
+                    k: h.snapshot() for k, h in sorted(self._histograms.items())
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def process_stats() -> Dict[str, Any]:
+    """Current and peak resident set size of this process, in bytes.
+
+    Current RSS comes from /proc on Linux and is None elsewhere; the peak
+    comes from getrusage where available.
+    """
+    stats: Dict[str, Any] = {"pid": os.getpid(), "rss_bytes": None}
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            stats["rss_bytes"] = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return stats
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    stats["max_rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+    return stats
+
+
+metrics = MetricsRegistry()
@@ -1,11 +1,48 @@
 """Persistence management for SEG framework data."""
+import atexit
 import json
 import logging
+import os
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+from .snapshot import (
+    LazyRecords,
+    SnapshotReader,
+    open_snapshot,
+    snapshot_path,
+    write_snapshot,
+)
 
 logger = logging.getLogger(__name__)
 
+# In-process locks per registry file. fcntl.flock on a sidecar .lock file
+# extends the exclusion to other processes (server, bridge, bootstrap.py).
+_file_locks: Dict[Path, threading.Lock] = {}
+_file_locks_guard = threading.Lock()
+
+# Marks a queued deletion in the write-behind buffer.
+_DELETED = object()
+
 
 class SEGPersistenceManager:
     """Manages persistent storage for SEG framework components."""
@@ -17,61 +54,349 @@ class SEGPersistenceManager:
         self.custom_replicants_file = self.data_dir / "custom_replicants.json"
         self.generated_personas_file = self.data_dir / "generated_personas.json"
         self.sessions_file = self.data_dir / "sessions.json"
+        # One file per council session / job so a per-turn checkpoint or a
+        # progress update rewrites only that record, not every one ever made.
+        self.councils_dir = self.data_dir / "councils"
+        self.jobs_dir = self.data_dir / "jobs"
+        # Snapshot-backed files (see snapshot.py) load as lazy mappings that
+        # decode records on first access. Generated personas grow without
+        # bound and are always indexed; custom replicants are opt-in.
+        flag = os.getenv("SEG_REGISTRY_SNAPSHOTS", "").lower()
+        self.use_snapshots = flag in ("1", "true", "yes", "on")
+        self._snapshot_sources = {self.generated_personas_file}
+        if self.use_snapshots:
+            self._snapshot_sources.add(self.custom_replicants_file)
+        # Decoded generated personas kept in memory; the rest stay on disk.
+        self.persona_cache_size = int(os.getenv("SEG_PERSONA_CACHE_SIZE", "128"))
+        # Lazy views handed out by load_generated_personas. New personas sit
+        # in a view's overlay until written; each write rebases the views
+        # onto the new snapshot, so memory stays bounded by the cache.
+        # Weak references: mappings are unhashable, so no WeakSet.
+        self._persona_views: List["weakref.ref[LazyRecords]"] = []
+        # Write-behind for the registry files: saves land in a per-file
+        # buffer and a background thread rewrites each file at most once per
+        # interval, so a burst of creates costs one JSON dump and tool
+        # latency does not depend on the disk. SEG_WRITE_BEHIND=0 restores
+        # synchronous writes. Records and job files are always synchronous.
+        self.write_behind = os.getenv("SEG_WRITE_BEHIND", "1").lower() not in (
+            "0",
+            "false",
+            "no",
+            "off",
+        )
+        self.write_behind_interval = (
+            float(os.getenv("SEG_WRITE_BEHIND_INTERVAL_MS", "500")) / 1000
+        )
+        self._pending: Dict[Path, Dict[str, Any]] = {}
+        self._inflight: Dict[Path, Dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_stop = threading.Event()
 
     def save_custom_replicant(self, replicant: Dict[str, Any]):
         """Save a custom replicant to disk."""
-        data = self._load_file(self.custom_replicants_file)
         name = replicant.get("archetype_name")
         if not name:
             logger.error("Replicant missing archetype_name")
             return
+        self.update_custom_replicants({name: replicant})
 
-        data[name] = replicant
-        self._save_file(self.custom_replicants_file, data)
+    def update_custom_replicants(self, replicants: Dict[str, Dict[str, Any]]):
+        """Upsert several custom replicants (written behind, in one write)."""
+        self._queue_changes(self.custom_replicants_file, replicants)
 
     def load_custom_replicants(self) -> Dict[str, Any]:
-        """Load all custom replicants from disk."""
-        return self._load_file(self.custom_replicants_file)
+        """Load all custom replicants, including saves not yet on disk."""
+        return self._with_pending(
+            self.custom_replicants_file,
+            self._load_records(self.custom_replicants_file, cache_size=None),
+        )
 
     def delete_custom_replicant(self, name: str) -> bool:
         """Delete a custom replicant from disk. Returns True if removed."""
-        data = self._load_file(self.custom_replicants_file)
-        if name not in data:
+        if name not in self.load_custom_replicants():
             return False
-        del data[name]
-        self._save_file(self.custom_replicants_file, data)
+        self._queue_changes(self.custom_replicants_file, {name: _DELETED})
         return True
 
     def save_generated_persona(self, persona: Dict[str, Any]):
         """Save a generated persona to disk."""
-        data = self._load_file(self.generated_personas_file)
         name = persona.get("name")
         if not name:
             logger.error("Persona missing name")
             return
+        self.save_generated_personas({name: persona})
 
-        data[name] = persona
-        self._save_file(self.generated_personas_file, data)
+    def save_generated_personas(self, personas: Dict[str, Dict[str, Any]]):
+        """Upsert many generated personas (written behind, in one write)."""
+        self._queue_changes(self.generated_personas_file, personas)
 
     def load_generated_personas(self) -> Dict[str, Any]:
-        """Load all generated personas from disk."""
-        return self._load_file(self.generated_personas_file)
+        """Generated personas as a lazy mapping: names now, records on access."""
+        records = self._load_records(
+            self.generated_personas_file, cache_size=self.persona_cache_size
+        )
+        if isinstance(records, LazyRecords):
+            with self._pending_lock:
+                self._persona_views.append(weakref.ref(records))
+        return self._with_pending(self.generated_personas_file, records)
+
+    def flush(self):
+        """Write every buffered registry change to disk before returning.
+
+        The durability barrier for write-behind: call it when another
+        process must see a save, or before exiting. Raises OSError if a
+        file cannot be written; its changes stay buffered for the next flush.
+        """
+        with self._flush_lock:
+            with self._pending_lock:
+                self._inflight, self._pending = self._pending, {}
+            try:
+                for file_path, changes in self._inflight.items():
+                    self._apply_changes(file_path, changes)
+            except BaseException:
+                with self._pending_lock:
+                    # Re-buffer the batch; saves made since take precedence.
+                    for file_path, changes in self._inflight.items():
+                        merged = dict(changes)
+                        merged.update(self._pending.get(file_path, {}))
+                        self._pending[file_path] = merged
+                    self._inflight = {}
+                raise
+            with self._pending_lock:
+                self._inflight = {}
+
+    def close(self):
+        """Stop the background writer and flush what it had buffered.
+
+        Raises if the final flush fails, so a lost save is not silent.
+        """
+        self._writer_stop.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        self.flush()
+
+    def save_council_checkpoint(self, session: Dict[str, Any]):
+        """Checkpoint a council session (config, completed turns, status)."""
+        self._save_record(self.councils_dir, session)
+
+    def load_council_checkpoint(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Load a council checkpoint, or None if the session is unknown."""
+        return self._load_record(self.councils_dir, session_id)
+
+    def list_council_checkpoints(self) -> List[str]:
+        """IDs of every checkpointed council session."""
+        return self._list_records(self.councils_dir)
+
+    def save_job(self, job: Dict[str, Any]):
+        """Persist a background job record (arguments, status, result)."""
+        self._save_record(self.jobs_dir, job)
+
+    def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Load a job record, or None if the job is unknown."""
+        return self._load_record(self.jobs_dir, job_id)
+
+    def claim_job(
+        self, job_id: str, claim: Callable[[Dict[str, Any]], bool]
+    ) -> Optional[Dict[str, Any]]:
+        """Compare-and-set a job record under its file lock.
+
+        ``claim`` inspects the current record and updates it in place,
+        returning False to leave it alone. Returns the saved record, or None
+        if the job is unknown or was not claimed, so only one of several
+        processes sharing the data dir wins a given job.
+        """
+        path = self._record_path(self.jobs_dir, job_id)
+        with self._locked(path):
+            job = self._load_record(self.jobs_dir, job_id)
+            if job is None or not claim(job):
+                return None
+            job["updated_at"] = datetime.now(timezone.utc).isoformat()
+            self._save_file(path, job)
+        return job
+
+    def list_jobs(self) -> List[str]:
+        """IDs of every persisted job."""
+        return self._list_records(self.jobs_dir)
+
+    def _save_record(self, directory: Path, record: Dict[str, Any]):
+        """Write one ``{directory}/{id}.json`` record, stamping updated_at."""
+        record_id = record.get("id")
+        if not record_id:
+            logger.error("Record for %s missing id", directory.name)
+            return
+        directory.mkdir(exist_ok=True)
+        record["updated_at"] = datetime.now(timezone.utc).isoformat()
+        path = self._record_path(directory, record_id)
+        try:
+            self._save_file(path, record)
+        except OSError as e:
+            # Checkpoints and job records are rewritten on the next change.
+            logger.error("Error saving %s: %s", path, e)
+
+    def _load_record(self, directory: Path, record_id: str) -> Optional[Dict[str, Any]]:
+        path = self._record_path(directory, record_id)
+        if not path.exists():
+            return None
+        return self._load_file(path) or None
+
+    def _list_records(self, directory: Path) -> List[str]:
+        if not directory.exists():
+            return []
+        return sorted(p.stem for p in directory.glob("*.json"))
+
+    def _record_path(self, directory: Path, record_id: str) -> Path:
+        # IDs come from tool arguments; keep them inside the record directory.
+        return directory / f"{Path(record_id).name}.json"
+
+    def _queue_changes(self, file_path: Path, changes: Mapping[str, Any]):
+        """Buffer upserts (or ``_DELETED`` markers) for one registry file.
+
+        Later changes to the same name replace earlier ones, so a burst
+        coalesces into a single rewrite of the file.
+        """
+        if not self.write_behind:
+            self._apply_changes(file_path, changes)
+            return
+        with self._pending_lock:
+            self._pending.setdefault(file_path, {}).update(changes)
+            if self._writer is None:
+                self._writer_stop.clear()
+                self._writer = threading.Thread(
+                    target=self._write_behind_loop,
+                    name="seg-write-behind",
+                    daemon=True,
+                )
+                self._writer.start()
+                atexit.register(self.close)
+
+    def _write_behind_loop(self):
+        while not self._writer_stop.wait(self.write_behind_interval):
+            try:
+                self.flush()
+            except Exception as e:  # changes stay buffered; retry next tick
+                logger.error("Write-behind flush failed: %s", e)
+
+    def _apply_changes(self, file_path: Path, changes: Mapping[str, Any]):
+        """Merge ``changes`` into ``file_path`` in one locked, atomic write."""
+        with self._locked(file_path):
+            data = self._load_file(file_path)
+            for name, record in changes.items():
+                if record is _DELETED:
+                    data.pop(name, None)
+                else:
+                    data[name] = record
+            self._save_file(file_path, data)
+            if file_path == self.generated_personas_file:
+                self._rebase_persona_views(changes)
+
+    def _rebase_persona_views(self, written: Mapping[str, Any]):
+        """Point the persona views at the snapshot just written."""
+        with self._pending_lock:
+            views = [ref() for ref in self._persona_views]
+            views = [view for view in views if view is not None]
+            self._persona_views = [weakref.ref(view) for view in views]
+        if not views:
+            return
+        path = snapshot_path(self.generated_personas_file)
+        try:
+            reader = SnapshotReader(path, self.persona_cache_size)
+        except (OSError, ValueError) as e:
+            # The views keep their overlay; nothing is lost, only not freed.
+            logger.warning("Could not reopen snapshot %s: %s", path, e)
+            return
+        for view in views:
+            view.rebase(reader, written)
+
+    def _with_pending(
+        self, file_path: Path, records: MutableMapping[str, Any]
+    ) -> MutableMapping[str, Any]:
+        """Layer changes that are buffered or mid-write over ``records``."""
+        with self._pending_lock:
+            layers = [
+                dict(self._inflight.get(file_path, {})),
+                dict(self._pending.get(file_path, {})),
+            ]
+        for changes in layers:
+            for name, record in changes.items():
+                if record is _DELETED:
+                    records.pop(name, None)
+                else:
+                    records[name] = record
+        return records
+
+    def _load_records(
+        self, file_path: Path, cache_size: Optional[int]
+    ) -> MutableMapping[str, Any]:
+        """Records of a registry file: lazy via its snapshot when indexed."""
+        if file_path in self._snapshot_sources:
+            reader = open_snapshot(
+                file_path, lambda: self._read_json(file_path), cache_size
+            )
+            if reader is not None:
+                return LazyRecords(reader)
+            if not file_path.exists():
+                # Nothing written yet; the first flush provides the snapshot.
+                return LazyRecords({})
+        return self._load_file(file_path)
+
+    def _read_json(self, file_path: Path) -> Dict[str, Any]:
+        """Parse a JSON file; raises OSError or ValueError."""
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
 
     def _load_file(self, file_path: Path) -> Dict[str, Any]:
         """Load JSON file or return empty dict if not exists."""
         if not file_path.exists():
             return {}
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return self._read_json(file_path)
         except (OSError, json.JSONDecodeError) as e:
             logger.error("Error loading %s: %s", file_path, e)
             return {}
 
     def _save_file(self, file_path: Path, data: Dict[str, Any]):
-        """Save dictionary to JSON file."""
+        """Save dictionary to JSON file atomically.
+
+        Written to a temp file in the same directory and renamed over the
+        target, so readers never see a half-written file. Raises OSError if
+        the write fails, after removing the temp file.
+        """
+        tmp_path = None
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp"
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
                 json.dump(data, f, indent=2)
-        except OSError as e:
-            logger.error("Error saving %s: %s", file_path, e)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+            if file_path in self._snapshot_sources:
+                write_snapshot(snapshot_path(file_path), data, file_path.stat())
+        except OSError:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    @contextmanager
+    def _locked(self, file_path: Path) -> Iterator[None]:
+        """Exclusive lock for a read-modify-write cycle on ``file_path``.
+
+        Not reentrant: hold it around one load/save pair only.
+        """
+        key = file_path.resolve()
+        with _file_locks_guard:
+            lock = _file_locks.setdefault(key, threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{file_path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,278 @@
+"""Endpoint pools for spreading AI requests across several backend hosts.
+
+A provider (ollama, lmstudio, openai, ...) normally talks to exactly one
+base URL. Shops running several inference hosts can list them all in
+``{PROVIDER}_BASE_URLS`` (comma-separated); every AIService for that
+provider then routes through one shared EndpointPool, so concurrent calls
+— including a council fanning out per participant — spread across hosts
+instead of piling onto the first one.
+
+Failing hosts are ejected after a run of consecutive failures and
+re-admitted once their cooldown expires (the next request acts as the
+probe) or as soon as an active health check sees them answer again.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Lightweight read-only paths used for active health checks. Gemini is a
+# hosted API keyed per request, so it has no cheap unauthenticated probe and
+# is treated as always healthy.
+_HEALTH_PATHS = {
+    "ollama": "/api/tags",
+    "openai": "/models",
+    "lmstudio": "/models",
+    "openrouter": "/models",
+}
+
+_STRATEGIES = ("least_outstanding", "latency_weighted")
+
+# Smoothing factor for the per-endpoint latency EWMA used by the
+# latency_weighted strategy. 0.3 follows load shifts within a handful of
+# requests without flapping on a single slow generation.
+_EWMA_ALPHA = 0.3
+
+
+@dataclass
+class Endpoint:
+    """One backend host in a pool, with its live routing state."""
+
+    url: str
+    outstanding: int = 0
+    ewma_latency: Optional[float] = None
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    total_requests: int = 0
+    total_failures: int = 0
+
+    def is_available(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.monotonic()) >= self.ejected_until
+
+
+class EndpointPool:
+    """Routes requests for one provider across a set of endpoints."""
+
+    def __init__(
+        self,
+        provider: str,
+        urls: List[str],
+        strategy: str = "least_outstanding",
+        max_failures: int = 3,
+        eject_seconds: float = 30.0,
+        health_interval: float = 0.0,
+    ):
+        if not urls:
+            raise ValueError(f"Endpoint pool for {provider} needs at least one URL")
+        if strategy not in _STRATEGIES:
+            raise ValueError(f"Pool strategy must be one of {list(_STRATEGIES)}")
+        self.provider = provider
+        self.endpoints = [Endpoint(url=url.rstrip("/")) for url in urls]
+        self.strategy = strategy
+        self.max_failures = max(1, max_failures)
+        self.eject_seconds = eject_seconds
+        self.health_interval = health_interval
+        self._health_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, provider: str, default_url: Optional[str]) -> "EndpointPool":
+        """Build a pool from ``{PROVIDER}_BASE_URLS`` and ``{PROVIDER}_POOL_*``."""
+        prefix = provider.upper()
+        raw_urls = os.getenv(f"{prefix}_BASE_URLS", "")
+        urls = [u.strip() for u in raw_urls.split(",") if u.strip()]
+        if not urls and default_url:
+            urls = [default_url]
+        return cls(
+            provider,
+            urls,
+            strategy=os.getenv(f"{prefix}_POOL_STRATEGY", "least_outstanding"),
+            max_failures=int(os.getenv(f"{prefix}_POOL_MAX_FAILURES", "3")),
+            eject_seconds=float(os.getenv(f"{prefix}_POOL_EJECT_SECONDS", "30")),
+            health_interval=float(os.getenv(f"{prefix}_POOL_HEALTH_INTERVAL", "0")),
+        )
+
+    def acquire(self, exclude: Optional[List[Endpoint]] = None) -> Optional[Endpoint]:
+        """Pick an endpoint for a new request and mark it outstanding.
+
+        Ejected endpoints are skipped while healthy ones remain. If every
+        endpoint is ejected the one closest to re-admission is returned, so
+        a single-host pool still behaves exactly like the old single
+        base_url. Returns None only when ``exclude`` rules out every host.
+        """
+        excluded = {id(e) for e in exclude or []}
+        candidates = [e for e in self.endpoints if id(e) not in excluded]
+        if not candidates:
+            return None
+
+        now = time.monotonic()
+        healthy = [e for e in candidates if e.is_available(now)]
+        if healthy:
+            endpoint = min(healthy, key=self._cost)
+        else:
+            endpoint = min(candidates, key=lambda e: e.ejected_until)
+
+        endpoint.outstanding += 1
+        endpoint.total_requests += 1
+        return endpoint
+
+    def release(
+        self,
+        endpoint: Endpoint,
+        latency: Optional[float] = None,
+        ok: Optional[bool] = True,
+    ) -> None:
+        """Return an endpoint after a request, recording its outcome.
+
+        ``ok=None`` releases without a verdict, for requests abandoned for
+        reasons unrelated to the host (e.g. the caller's deadline ran out).
+        """
+        endpoint.outstanding = max(0, endpoint.outstanding - 1)
+        if ok is None:
+            return
+        if ok:
+            endpoint.consecutive_failures = 0
+            endpoint.ejected_until = 0.0
+            if latency is not None:
+                endpoint.ewma_latency = (
+                    latency
+                    if endpoint.ewma_latency is None
+                    else _EWMA_ALPHA * latency
+                    + (1 - _EWMA_ALPHA) * endpoint.ewma_latency
+                )
+            return
+
+        endpoint.total_failures += 1
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self.max_failures:
+            self._eject(endpoint)
+
+    def has_available(self) -> bool:
+        """True if at least one endpoint is currently admitted."""
+        now = time.monotonic()
+        return any(e.is_available(now) for e in self.endpoints)
+
+    def outstanding(self) -> int:
+        return sum(e.outstanding for e in self.endpoints)
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Per-endpoint routing state, for status tools and debugging."""
+        now = time.monotonic()
+        return [
+            {
+                "url": e.url,
+                "available": e.is_available(now),
+                "outstanding": e.outstanding,
+                "ewma_latency": e.ewma_latency,
+                "consecutive_failures": e.consecutive_failures,
+                "readmit_in": max(0.0, e.ejected_until - now),
+                "total_requests": e.total_requests,
+                "total_failures": e.total_failures,
+            }
+            for e in self.endpoints
+        ]
+
+    async def check_health(
+        self, api_key: Optional[str] = None, timeout: float = 5.0
+    ) -> Dict[str, bool]:
+        """Probe every endpoint once; eject the dead, re-admit the recovered."""
+        path = _HEALTH_PATHS.get(self.provider)
+        if path is None:
+            return {e.url: True for e in self.endpoints}
+
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        results: Dict[str, bool] = {}
+        async with httpx.AsyncClient() as client:
+            for endpoint in self.endpoints:
+                try:
+                    response = await client.get(
+                        f"{endpoint.url}{path}", headers=headers, timeout=timeout
+                    )
+                    healthy = response.status_code < 500
+                except httpx.HTTPError:
+                    healthy = False
+
+                results[endpoint.url] = healthy
+                if healthy:
+                    endpoint.consecutive_failures = 0
+                    endpoint.ejected_until = 0.0
+                elif endpoint.is_available():
+                    self._eject(endpoint)
+        return results
+
+    def start_health_checks(self, api_key: Optional[str] = None) -> None:
+        """Run check_health every ``health_interval`` seconds on the current loop.
+
+        A no-op when the interval is 0 (the default) or a checker is
+        already running; passive ejection on request failures still works.
+        """
+        if self.health_interval <= 0:
+            return
+        if self._health_task and not self._health_task.done():
+            return
+        self._health_task = asyncio.get_running_loop().create_task(
+            self._health_loop(api_key)
+        )
+
+    async def _health_loop(self, api_key: Optional[str]) -> None:
+        while True:
+            try:
+                await self.check_health(api_key=api_key)
+            except Exception as e:  # pragma: no cover - defensive
+                logger.error("Health check for %s pool failed: %s", self.provider, e)
+            await asyncio.sleep(self.health_interval)
+
+    def _cost(self, endpoint: Endpoint) -> tuple:
+        if self.strategy == "latency_weighted" and endpoint.ewma_latency is not None:
+            return (
+                (endpoint.outstanding + 1) * endpoint.ewma_latency,
+                endpoint.total_requests,
+            )
+        # Unmeasured endpoints under latency_weighted sort with cost 0 so they
+        # get explored; ties fall back to total_requests for round-robin.
+        if self.strategy == "latency_weighted":
+            return (0.0, endpoint.total_requests)
+        return (endpoint.outstanding, endpoint.total_requests)
+
+    def _eject(self, endpoint: Endpoint) -> None:
+        endpoint.ejected_until = time.monotonic() + self.eject_seconds
+        logger.warning(
+            "Ejecting %s endpoint %s for %.0fs after %d consecutive failures",
+            self.provider,
+            endpoint.url,
+            self.eject_seconds,
+            endpoint.consecutive_failures,
+        )
+
+
+# Pools are process-wide and keyed by provider so every AIService instance
+# (the server's, each SEGCouncilFlow's, the bridge's) shares outstanding
+# counts and ejection state for the same hosts.
+_POOLS: Dict[str, EndpointPool] = {}
+
+
+def get_pool(provider: str, default_url: Optional[str]) -> Optional[EndpointPool]:
+    """Return the shared pool for a provider, creating it from env on first use."""
+    pool = _POOLS.get(provider)
+    if pool is None:
+        if not default_url and not os.getenv(f"{provider.upper()}_BASE_URLS"):
+            return None
+        pool = EndpointPool.from_env(provider, default_url)
+        _POOLS[provider] = pool
+    return pool
+
+
+def all_pool_status() -> Dict[str, List[Dict[str, Any]]]:
+    """Routing state of every pool created so far, keyed by provider."""
+    return {provider: pool.status() for provider, pool in _POOLS.items()}
+
+
+def reset_pools() -> None:
+    """Forget all shared pools (tests and config reloads)."""
+    _POOLS.clear()
@@ -0,0 +1,137 @@
+"""Generation profiles: output length, context and latency class per call type.
+
+A profile bounds how much a call may generate (``max_tokens``, sent as
+Ollama ``num_predict``, OpenAI ``max_tokens`` or Gemini
+``maxOutputTokens``), the Ollama context window (``num_ctx``), the sampling
+``temperature``, and a per-attempt ``timeout`` ceiling. ``max_tokens`` also
+serves as the expected output length for AIService's learned timeouts, so a
+"surface" analysis gets a short timeout as well as a short answer.
+
+Profile names are dotted. A lookup falls back one level at a time
+(``council.aesthetic`` -> ``council``), so callers can ask for the most
+specific name and tuning only has to cover the cases that differ.
+
+Every profile is tuned in one place, ``SEG_GENERATION_PROFILES``. It takes
+inline JSON or a path to a JSON file, and its fields override the defaults
+below::
+
+    SEG_GENERATION_PROFILES='{"deep": {"max_tokens": 3000, "timeout": 600}}'
+
+Profiles are resolved on every generation, so the parsed overrides and the
+resolved profiles are cached. The cache key is the variable's value plus,
+for a file, its mtime and size; editing either takes effect on the next
+lookup.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """Generation limits for one class of call; None leaves the default."""
+
+    name: str
+    max_tokens: Optional[int] = None
+    num_ctx: Optional[int] = None
+    temperature: Optional[float] = None
+    timeout: Optional[float] = None
+
+
+DEFAULT_PROFILES: Dict[str, GenerationProfile] = {
+    # analyze_through_seg_lens depths
+    "surface": GenerationProfile("surface", max_tokens=400, timeout=60),
+    "moderate": GenerationProfile("moderate", max_tokens=1000, timeout=180),
+    "deep": GenerationProfile("deep", max_tokens=2500, num_ctx=8192, timeout=420),
+    # Per-part notes and note folding in chunked (map-reduce) analysis
+    "lens.chunk": GenerationProfile("lens.chunk", max_tokens=500, timeout=180),
+    # run_council_session, by mode, plus cycle-executor turns
+    "council": GenerationProfile("council", max_tokens=2000, num_ctx=8192, timeout=420),
+    "council.strategic": GenerationProfile("council.strategic", temperature=0.5),
+    "council.aesthetic": GenerationProfile("council.aesthetic", temperature=0.9),
+    "council.turn": GenerationProfile("council.turn", max_tokens=450, timeout=180),
+}
+
+_FIELDS = {f.name for f in fields(GenerationProfile)} - {"name"}
+
+
+# SEG_GENERATION_PROFILES, and (mtime_ns, size) when it names a file.
+_OverridesKey = Tuple[str, Optional[Tuple[int, int]]]
+
+
+def _overrides_key() -> _OverridesKey:
+    raw = os.getenv("SEG_GENERATION_PROFILES", "").strip()
+    if not raw or raw.startswith("{"):
+        return raw, None
+    try:
+        st = Path(raw).stat()
+    except OSError:
+        return raw, None
+    return raw, (st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=8)
+def _load_overrides(key: _OverridesKey) -> Dict[str, Dict]:
+    """Parsed overrides; shared between callers, so never mutate them."""
+    raw = key[0]
+    if not raw:
+        return {}
+    try:
+        if not raw.startswith("{"):
+            raw = Path(raw).read_text(encoding="utf-8")
+        overrides = json.loads(raw)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error("Ignoring SEG_GENERATION_PROFILES: %s", e)
+        return {}
+    return overrides if isinstance(overrides, dict) else {}
+
+
+def _own(name: str, key: _OverridesKey) -> Optional[GenerationProfile]:
+    """The profile defined for exactly ``name``, defaults plus overrides."""
+    override = _load_overrides(key).get(name)
+    profile = DEFAULT_PROFILES.get(name)
+    if override is None:
+        return profile
+    unknown = set(override) - _FIELDS
+    if unknown:
+        logger.warning("Unknown fields for profile %s: %s", name, sorted(unknown))
+    values = {k: v for k, v in override.items() if k in _FIELDS}
+    return replace(profile or GenerationProfile(name), **values)
+
+
+def get_profile(name: Optional[str]) -> Optional[GenerationProfile]:
+    """Resolve ``name``, inheriting unset fields from its dotted parents.
+
+    Returns None for an unknown name with no known parent, meaning the
+    provider and model defaults apply.
+    """
+    if not name:
+        return None
+    return _resolve(name, _overrides_key())
+
+
+@lru_cache(maxsize=256)
+def _resolve(name: str, key: _OverridesKey) -> Optional[GenerationProfile]:
+    parts = name.split(".")
+    resolved: Optional[GenerationProfile] = None
+    for depth in range(1, len(parts) + 1):
+        level = _own(".".join(parts[:depth]), key)
+        if level is None:
+            continue
+        if resolved is None:
+            resolved = level
+        else:
+            updates = {
+                f: getattr(level, f) for f in _FIELDS if getattr(level, f) is not None
+            }
+            resolved = replace(resolved, **updates)
+    if resolved is not None:
+        resolved = replace(resolved, name=name)
+    return resolved
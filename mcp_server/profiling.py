@@ -0,0 +1,230 @@
+"""On-demand CPU and memory profiling of a running server.
+
+stdout carries MCP traffic, so the server cannot simply be restarted
+under a profiler. These helpers back the ``start_profile``,
+``stop_profile`` and ``memory_snapshot`` tools. Output files go to
+data/profiles/ and the tools return a short top-N summary.
+
+Two CPU modes:
+
+- ``cpu`` runs cProfile on the event-loop thread. It is exact and has
+  real overhead, so use it for short captures; the .prof file opens in
+  pstats or snakeviz.
+- ``sampling`` runs a background thread that records the event-loop
+  thread's stack every ``interval_ms`` through ``sys._current_frames``.
+  Its overhead is low enough for production. It writes folded stacks for
+  flamegraph tools.
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cpu", "sampling")
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+
+
+def frame_label(frame) -> str:
+    """``file.py:function:line`` for a stack frame."""
+    code = frame.f_code
+    return f"{Path(code.co_filename).name}:{code.co_name}:{frame.f_lineno}"
+
+
+class _StackSampler:
+    """Samples one thread's stack on a timer from a daemon thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="seg-stack-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+
+class Profiler:
+    """One CPU capture at a time, plus tracemalloc snapshots."""
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self.mode: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_StackSampler] = None
+        self._last_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def start(self, mode: str = "cpu", interval_ms: float = 10) -> Dict[str, Any]:
+        """Begin a capture on the calling (event-loop) thread."""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {PROFILE_MODES}")
+        if self.mode is not None:
+            raise RuntimeError(f"A {self.mode} profile is already running")
+        if mode == "cpu":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = _StackSampler(
+                threading.get_ident(), max(0.001, interval_ms / 1000)
+            )
+            self._sampler.start()
+        self.mode = mode
+        self.started_at = time.monotonic()
+        logger.info("Started %s profile", mode)
+        return {"status": "started", "mode": mode}
+
+    def stop(self, top_n: int = 25, sort: str = "cumulative") -> Dict[str, Any]:
+        """End the capture, write it under output_dir, return the top entries."""
+        if self.mode is None:
+            raise RuntimeError("No profile is running")
+        mode, duration = self.mode, time.monotonic() - self.started_at
+        self.mode = self.started_at = None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        result: Dict[str, Any] = {"mode": mode, "duration_seconds": round(duration, 3)}
+        if mode == "cpu":
+            profile, self._profile = self._profile, None
+            profile.disable()
+            path = self.output_dir / f"cpu_{_timestamp()}.prof"
+            profile.dump_stats(path)
+            result["top"] = self._pstats_summary(profile, top_n, sort)
+        else:
+            sampler, self._sampler = self._sampler, None
+            sampler.stop()
+            path = self.output_dir / f"samples_{_timestamp()}.folded"
+            path.write_text(
+                "".join(
+                    f"{stack} {count}\n" for stack, count in sampler.stacks.items()
+                ),
+                encoding="utf-8",
+            )
+            result["samples"] = sampler.samples
+            result["top"] = self._sample_summary(sampler, top_n)
+        result["file"] = str(path)
+        logger.info("Wrote %s profile to %s", mode, path)
+        return result
+
+    def memory_snapshot(
+        self, top_n: int = 25, stop: bool = False, frames: int = 10
+    ) -> Dict[str, Any]:
+        """Snapshot allocations; start tracing first if it is off.
+
+        Allocations are only attributed from the moment tracing starts,
+        so the first call mostly reports its own baseline. Later calls
+        also report growth since the previous snapshot.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._last_snapshot = None
+            return {
+                "status": "tracing started",
+                "note": "Call memory_snapshot again to capture allocations",
+            }
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"memory_{_timestamp()}.tracemalloc"
+        snapshot.dump(str(path))
+        current, peak = tracemalloc.get_traced_memory()
+        result: Dict[str, Any] = {
+            "file": str(path),
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "top": [
+                {
+                    "location": str(stat.traceback[0]),
+                    "bytes": stat.size,
+                    "count": stat.count,
+                }
+                for stat in snapshot.statistics("lineno")[:top_n]
+            ],
+        }
+        if self._last_snapshot is not None:
+            result["growth"] = [
+                {
+                    "location": str(stat.traceback[0]),
+                    "bytes_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in snapshot.compare_to(self._last_snapshot, "lineno")[:top_n]
+            ]
+        self._last_snapshot = snapshot
+        if stop:
+            tracemalloc.stop()
+            self._last_snapshot = None
+            result["status"] = "tracing stopped"
+        return result
+
+    @staticmethod
+    def _pstats_summary(
+        profile: cProfile.Profile, top_n: int, sort: str
+    ) -> List[Dict[str, Any]]:
+        stats = pstats.Stats(profile, stream=io.StringIO()).sort_stats(sort)
+        rows = []
+        for func in stats.fcn_list[:top_n]:
+            calls, _, tottime, cumtime, _ = stats.stats[func]
+            filename, line, name = func
+            rows.append(
+                {
+                    "function": f"{Path(filename).name}:{line}({name})",
+                    "calls": calls,
+                    "tottime": round(tottime, 6),
+                    "cumtime": round(cumtime, 6),
+                }
+            )
+        return rows
+
+    @staticmethod
+    def _sample_summary(sampler: _StackSampler, top_n: int) -> List[Dict[str, Any]]:
+        # Self time: the leaf frame of each sampled stack. Inclusive time:
+        # every distinct frame on the stack.
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, count in sampler.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+        total = sampler.samples or 1
+        return [
+            {
+                "frame": frame,
+                "self_pct": round(100 * own[frame] / total, 1),
+                "inclusive_pct": round(100 * inclusive[frame] / total, 1),
+            }
+            for frame, _ in own.most_common(top_n)
+        ]
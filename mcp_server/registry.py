@@ -1,7 +1,78 @@
-from typing import Any, Dict, List, Optional
+import logging
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Tuple,
+)
 
 from .persistence import SEGPersistenceManager
 from .replicants import REPLICANT_DEFINITIONS
+from .snapshot import LazyRecords
+
+logger = logging.getLogger(__name__)
+
+
+class _MergedDefinitions(Mapping):
+    """Read-only view of static definitions with custom ones layered on top.
+
+    Lookups go to the two underlying mappings, so building a snapshot never
+    copies (or, for snapshot-backed custom records, decodes) definitions.
+    """
+
+    def __init__(
+        self,
+        static: Mapping[str, Any],
+        custom: Mapping[str, Any],
+        order: Tuple[str, ...],
+    ):
+        self._static = static
+        self._custom = custom
+        self._order = order
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._custom:
+            return self._custom[name]
+        return self._static[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._custom or name in self._static
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """Immutable view of the registry at one version.
+
+    Published whole by ReplicantRegistry on every mutation. Holders can keep
+    and share it across concurrent calls; later changes produce a new
+    snapshot instead of altering this one.
+    """
+
+    version: int
+    definitions: Mapping[str, Any]
+    custom: Mapping[str, Any]
+    names: FrozenSet[str]
+    order: Tuple[str, ...]
+
+
+# Called with the new snapshot and the changed custom names, keyed "added",
+# "updated" and "removed".
+RegistryListener = Callable[[RegistrySnapshot, Dict[str, List[str]]], None]
 
 
 class ReplicantRegistry:
@@ -10,32 +81,71 @@ class ReplicantRegistry:
     def __init__(self, persistence_manager: SEGPersistenceManager):
         self.persistence = persistence_manager
         self.static_replicants = REPLICANT_DEFINITIONS
-        self.custom_replicants = self.persistence.load_custom_replicants()
+        # Mutations build the next custom mapping from this private one and
+        # publish a new snapshot; readers only ever see published snapshots.
+        self._lock = threading.Lock()
+        self._custom_source = self.persistence.load_custom_replicants()
+        self._snapshot = self._build(self._custom_source, 0)
+        self._listeners: List[RegistryListener] = []
 
-    def get_all_definitions(self) -> Dict[str, Any]:
-        """Get all replicant definitions (static + custom)."""
-        all_defs = self.static_replicants.copy()
-        all_defs.update(self.custom_replicants)
-        return all_defs
+    def _build(self, custom: Mapping[str, Any], version: int) -> RegistrySnapshot:
+        """Freeze ``custom``, which the caller must not mutate afterwards."""
+        order = tuple(self.static_replicants) + tuple(
+            name for name in custom if name not in self.static_replicants
+        )
+        custom_view = MappingProxyType(custom)
+        return RegistrySnapshot(
+            version=version,
+            definitions=_MergedDefinitions(self.static_replicants, custom_view, order),
+            custom=custom_view,
+            names=frozenset(order),
+            order=order,
+        )
+
+    @property
+    def snapshot(self) -> RegistrySnapshot:
+        """The current snapshot; a single reference read, safe without locks."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    @property
+    def custom_replicants(self) -> Mapping[str, Any]:
+        """Read-only custom definitions; mutate through add/delete."""
+        return self._snapshot.custom
+
+    def get_all_definitions(self) -> Mapping[str, Any]:
+        """Get all replicant definitions (static + custom), read-only."""
+        return self._snapshot.definitions
 
     def get_names(self) -> List[str]:
         """Get list of all replicant names."""
-        names = list(self.static_replicants.keys())
-        names.extend(list(self.custom_replicants.keys()))
-        return names
+        return list(self._snapshot.order)
+
+    def has_replicant(self, name: str) -> bool:
+        return name in self._snapshot.names
 
     def get_definition(self, name: str) -> Optional[Dict[str, Any]]:
         """Get definition for a specific replicant."""
         if name in self.static_replicants:
             return self.static_replicants[name]
-        return self.custom_replicants.get(name)
+        return self._snapshot.custom.get(name)
 
     def add_custom_replicant(self, replicant: Dict[str, Any]):
         """Add and persist a custom replicant."""
         name = replicant.get("archetype_name")
         if name:
-            self.custom_replicants[name] = replicant
-            self.persistence.save_custom_replicant(replicant)
+            # Queue the save under the lock too, so a concurrent reload()
+            # never reads the disk state from before it.
+            with self._lock:
+                existed = name in self._snapshot.custom
+                custom = self._mutable_custom()
+                custom[name] = replicant
+                self._publish(custom)
+                self.persistence.save_custom_replicant(replicant)
+            self._notify({"updated" if existed else "added": [name]})
 
     def delete_custom_replicant(self, name: str) -> bool:
         """Remove a custom replicant from memory and disk.
@@ -46,7 +156,72 @@ class ReplicantRegistry:
         """
         if name in self.static_replicants:
             return False
-        if name not in self.custom_replicants:
-            return False
-        del self.custom_replicants[name]
-        return self.persistence.delete_custom_replicant(name)
+        with self._lock:
+            if name not in self._snapshot.custom:
+                return False
+            custom = self._mutable_custom()
+            del custom[name]
+            self._publish(custom)
+            removed = self.persistence.delete_custom_replicant(name)
+        self._notify({"removed": [name]})
+        return removed
+
+    def add_listener(self, listener: RegistryListener) -> None:
+        """Call ``listener`` after every change to the custom replicants.
+
+        Listeners run on the thread that made the change (a tool call, or
+        the registry watcher's thread) and should only invalidate state.
+        """
+        self._listeners.append(listener)
+
+    def reload(self) -> Dict[str, List[str]]:
+        """Re-read custom replicants from disk and publish what changed.
+
+        Picks up writes by other processes (another server, the bridge,
+        ``bootstrap.py install``). Saves this process has buffered but not
+        yet written are layered over the file, so they are not lost, and
+        this process's own flushes produce an empty diff. Returns the diff;
+        the version is bumped only when it is non-empty.
+        """
+        with self._lock:
+            current = self._snapshot.custom
+            loaded = self.persistence.load_custom_replicants()
+            diff = {
+                "added": [name for name in loaded if name not in current],
+                "updated": [
+                    name
+                    for name in loaded
+                    if name in current and loaded[name] != current[name]
+                ],
+                "removed": [name for name in current if name not in loaded],
+            }
+            diff = {kind: names for kind, names in diff.items() if names}
+            if diff:
+                self._publish(loaded)
+        if diff:
+            logger.info(
+                "Registry reloaded to version %s: %s", self._snapshot.version, diff
+            )
+            self._notify(diff)
+        return diff
+
+    def _mutable_custom(self) -> MutableMapping[str, Any]:
+        """A private copy of the current custom records to build the next one."""
+        current = self._custom_source
+        if isinstance(current, LazyRecords):
+            # Forking keeps untouched records undecoded; dict() would decode all.
+            return current.fork()
+        return dict(current)
+
+    def _notify(self, diff: Dict[str, List[str]]) -> None:
+        snapshot = self._snapshot
+        for listener in list(self._listeners):
+            try:
+                listener(snapshot, diff)
+            except Exception as e:  # one bad listener must not block the rest
+                logger.error("Registry listener failed: %s", e)
+
+    def _publish(self, custom: MutableMapping[str, Any]) -> None:
+        self._custom_source = custom
+        # A single attribute assignment, so readers switch atomically.
+        self._snapshot = self._build(custom, self._snapshot.version + 1)
@@ -0,0 +1,130 @@
+"""Hot reload of the custom replicant registry.
+
+``ReplicantRegistry`` reads ``data/custom_replicants.json`` once. Other
+processes write that file too: a second server, the bridge, or
+``seg_molecular_self/bootstrap.py install``. Without reloading, this
+process would only see their replicants after a restart, and a restart
+includes the CrewAI import.
+
+``RegistryWatcher`` is a daemon thread that polls the file's identity
+every ``interval``. The identity is its inode, mtime and size. Writers
+replace the file atomically with a rename, so a changed inode always
+means a new file. When the identity changes, the watcher waits until it
+has held still for ``debounce`` before calling ``registry.reload()``, so
+a burst of writes costs one reload. The reload publishes a new registry
+snapshot and notifies the registry's listeners. Polling a single stat
+needs no extra dependency and behaves the same on every platform.
+
+Configuration: ``SEG_REGISTRY_WATCH=0`` disables it. Tune it with
+``SEG_REGISTRY_WATCH_INTERVAL_MS`` (default 1000) and
+``SEG_REGISTRY_WATCH_DEBOUNCE_MS`` (default 250).
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .metrics import metrics
+from .registry import ReplicantRegistry
+
+logger = logging.getLogger(__name__)
+
+_Signature = Optional[Tuple[int, int, int]]
+
+
+def _signature(path: Path) -> _Signature:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class RegistryWatcher:
+    """Reloads a registry when its custom replicant file changes on disk."""
+
+    def __init__(
+        self,
+        registry: ReplicantRegistry,
+        interval: Optional[float] = None,
+        debounce: Optional[float] = None,
+    ):
+        self.registry = registry
+        self.path = registry.persistence.custom_replicants_file
+        self.enabled = os.getenv("SEG_REGISTRY_WATCH", "1").lower() not in (
+            "0",
+            "false",
+            "no",
+            "off",
+        )
+        self.interval = (
+            interval
+            if interval is not None
+            else float(os.getenv("SEG_REGISTRY_WATCH_INTERVAL_MS", "1000")) / 1000
+        )
+        self.debounce = (
+            debounce
+            if debounce is not None
+            else float(os.getenv("SEG_REGISTRY_WATCH_DEBOUNCE_MS", "250")) / 1000
+        )
+        self.reloads = 0
+        self.last_diff: Dict[str, Any] = {}
+        self._seen: _Signature = _signature(self.path)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._seen = _signature(self.path)
+        self._thread = threading.Thread(
+            target=self._run, name="seg-registry-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + self.debounce + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:  # keep watching; the next poll may succeed
+                logger.error("Registry watch failed: %s", e)
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """Reload if the file changed and then settled; returns the diff."""
+        current = _signature(self.path)
+        if current == self._seen:
+            return None
+        # Wait out a burst of writes: reload only once the file stops moving.
+        while True:
+            if self._stop.wait(self.debounce):
+                return None
+            settled = _signature(self.path)
+            if settled == current:
+                break
+            current = settled
+        self._seen = current
+        diff = self.registry.reload()
+        if diff:
+            self.reloads += 1
+            self.last_diff = diff
+            metrics.inc("registry.reloads")
+        return diff
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "watching": bool(self._thread and self._thread.is_alive()),
+            "path": str(self.path),
+            "version": self.registry.version,
+            "reloads": self.reloads,
+            "last_diff": self.last_diff or None,
+        }
@@ -4,10 +4,20 @@ SEG Core: Persona Generation and Council Orchestration
 Implements the core logic for Simulated Experiential Grounding framework.
 """
 
+import asyncio
+import csv
+import io
+import json
+import os
 import random
-from typing import Any, Dict, List, Optional
-
-from .ai_service import AIService
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .ai_service import AIResponse, AIService
+from .documents import pack, read_document, split_document
+from .latency import estimate_tokens
+from .metrics import metrics
 from .persistence import SEGPersistenceManager
 from .registry import ReplicantRegistry
 from .replicants import REPLICANT_DEFINITIONS
@@ -34,6 +44,25 @@ _MOLECULAR_SELF_KEY_ORDER = (
     "emotion_vector_primary",
 )
 
+# How run_session executes councils. "single" asks the model for the whole
+# council in one generation; "cycles" runs one turn per participant per
+# cycle with a bounded rolling context (see _execute_cycles).
+COUNCIL_EXECUTION_MODES = ("single", "cycles")
+
+# Prefix of the closing line each cycle turn uses to restate its stance.
+# It feeds the rolling context and is removed from the rendered turn.
+_POSITION_PREFIX = "POSITION:"
+
+_COUNCIL_PROMPT_BUCKETS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+class CouncilSessionError(Exception):
+    """A council generation failed; the session is left resumable."""
+
+
+class LensAnalysisError(Exception):
+    """A lens analysis could not be produced; the message says why."""
+
 
 def _build_base_seg_trunk(registry: ReplicantRegistry) -> str:
     """Compose the Base SEG trunk preamble from the live registry.
@@ -83,14 +112,107 @@ def _build_base_seg_trunk(registry: ReplicantRegistry) -> str:
     return "\n".join(lines)
 
 
+# Fields accepted in a generate_persona spec, and the ones that are required.
+PERSONA_SPEC_FIELDS = (
+    "name",
+    "profession",
+    "defining_experience",
+    "age",
+    "location",
+    "domain_expertise",
+    "philosophical_stance",
+    "style_preferences",
+    "molecular_self",
+)
+_REQUIRED_SPEC_FIELDS = ("name", "profession", "defining_experience")
+
+
+def _clip(text: str, limit: int) -> str:
+    """``text`` cut to ``limit`` characters at a word boundary."""
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[: max(0, limit - 1)].rsplit(" ", 1)[0] + "…"
+
+
+def _split_position(output: str) -> Tuple[str, str]:
+    """Split a cycle turn into (spoken content, one-line position).
+
+    Without a POSITION line, the first sentence of the turn stands in.
+    """
+    lines = output.strip().splitlines()
+    for index in range(len(lines) - 1, -1, -1):
+        line = lines[index].strip().strip("*_ ")
+        if line.upper().startswith(_POSITION_PREFIX):
+            content = "\n".join(lines[:index] + lines[index + 1 :]).strip()
+            return content, line[len(_POSITION_PREFIX) :].strip()
+    content = output.strip()
+    first = content.replace("\n", " ").split(". ")[0]
+    return content, _clip(first, 240)
+
+
+def parse_persona_specs(data: str, fmt: str = "jsonl") -> List[Dict[str, Any]]:
+    """Parse persona specs from JSONL (one object per line) or CSV with a header.
+
+    Empty CSV cells are treated as absent; a ``molecular_self`` cell may hold
+    a JSON object.
+    """
+    if fmt == "jsonl":
+        return [json.loads(line) for line in data.splitlines() if line.strip()]
+    if fmt != "csv":
+        raise ValueError(f"Unsupported spec format: {fmt}")
+    specs = []
+    for row in csv.DictReader(io.StringIO(data)):
+        spec: Dict[str, Any] = {k.strip(): v for k, v in row.items() if k and v}
+        if "molecular_self" in spec:
+            spec["molecular_self"] = json.loads(spec["molecular_self"])
+        specs.append(spec)
+    return specs
+
+
+def collect_persona_specs(
+    specs: Optional[List[Dict[str, Any]]] = None,
+    data: Optional[str] = None,
+    fmt: str = "jsonl",
+) -> List[Dict[str, Any]]:
+    """Specs given inline plus any parsed from JSONL/CSV text."""
+    collected = list(specs or [])
+    if data:
+        collected.extend(parse_persona_specs(data, fmt))
+    if not collected:
+        raise ValueError("Provide persona specs inline or as JSONL/CSV data")
+    return collected
+
+
+def _validate_persona_spec(spec: Any) -> Dict[str, Any]:
+    if not isinstance(spec, dict):
+        raise ValueError("spec must be an object")
+    unknown = set(spec) - set(PERSONA_SPEC_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown fields: {sorted(unknown)}")
+    missing = [f for f in _REQUIRED_SPEC_FIELDS if not spec.get(f)]
+    if missing:
+        raise ValueError(f"missing required fields: {missing}")
+    spec = dict(spec)
+    if spec.get("age") is not None:
+        spec["age"] = int(spec["age"])
+    return spec
+
+
 class SEGPersonaGenerator:
     """Generates SEG personas using the 6-component architecture."""
 
     def __init__(self, ai_service: Optional[AIService] = None, data_dir: str = "data"):
         self.persistence = SEGPersistenceManager(data_dir=data_dir)
         self.registry = ReplicantRegistry(self.persistence)
+        # Lazy mapping: names come from the on-disk index at startup, full
+        # records are decoded on access into a bounded LRU.
         self.generated_personas = self.persistence.load_generated_personas()
         self.ai_service = ai_service or AIService()
+        # Lens analysis of text longer than this is split into chunks of
+        # this size, read in parallel up to lens_concurrency at a time.
+        self.lens_chunk_tokens = int(os.getenv("SEG_LENS_CHUNK_TOKENS", "3000"))
+        self.lens_concurrency = int(os.getenv("SEG_LENS_CONCURRENCY", "4"))
 
     async def generate_persona(
         self,
@@ -105,6 +227,92 @@ class SEGPersonaGenerator:
         molecular_self: Optional[Dict[str, str]] = None,
     ) -> Dict[str, Any]:
         """Generate a complete SEG persona using the 6-component architecture."""
+        persona = self._build_persona(
+            name=name,
+            profession=profession,
+            defining_experience=defining_experience,
+            age=age,
+            location=location,
+            domain_expertise=domain_expertise,
+            philosophical_stance=philosophical_stance,
+            style_preferences=style_preferences,
+            molecular_self=molecular_self,
+        )
+
+        # Store and persist the generated persona
+        self.generated_personas[name] = persona
+        self.persistence.save_generated_persona(persona)
+
+        return persona
+
+    async def generate_personas_bulk(
+        self,
+        specs: Iterable[Dict[str, Any]],
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Generate many personas and persist them in one write.
+
+        Calling generate_persona in a loop rewrites generated_personas.json
+        once per persona. Here every spec is built in memory, per-item
+        results go to ``on_result`` as they happen, and all successful
+        personas are committed together at the end. Invalid specs are
+        reported and skipped; they do not abort the batch.
+        """
+        started = time.perf_counter()
+        staged: Dict[str, Dict[str, Any]] = {}
+        results: List[Dict[str, Any]] = []
+        for index, spec in enumerate(specs):
+            name = spec.get("name") if isinstance(spec, dict) else None
+            try:
+                spec = _validate_persona_spec(spec)
+                if spec["name"] in staged:
+                    raise ValueError("duplicate name in batch")
+                staged[spec["name"]] = self._build_persona(**spec)
+                result = {"index": index, "name": name, "status": "ok"}
+            except (TypeError, ValueError) as e:
+                result = {
+                    "index": index,
+                    "name": name,
+                    "status": "error",
+                    "error": str(e),
+                }
+            results.append(result)
+            if on_result:
+                on_result(result)
+            # Building is synchronous; yield so streamed results can flush.
+            await asyncio.sleep(0)
+
+        if staged:
+            # In memory first: a synchronous write then finds them there and
+            # hands them over to the snapshot cache.
+            for persona_name, persona in staged.items():
+                self.generated_personas[persona_name] = persona
+            self.persistence.save_generated_personas(staged)
+
+        elapsed = time.perf_counter() - started
+        metrics.inc("personas.bulk.created", len(staged))
+        metrics.inc("personas.bulk.failed", len(results) - len(staged))
+        return {
+            "created": len(staged),
+            "failed": len(results) - len(staged),
+            "seconds": round(elapsed, 3),
+            "personas_per_second": round(len(results) / elapsed, 1) if elapsed else None,
+            "results": results,
+        }
+
+    def _build_persona(
+        self,
+        name: str,
+        profession: str,
+        defining_experience: str,
+        age: Optional[int] = None,
+        location: Optional[str] = None,
+        domain_expertise: Optional[str] = None,
+        philosophical_stance: Optional[str] = None,
+        style_preferences: Optional[str] = None,
+        molecular_self: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Assemble a persona record without storing it."""
 
         # Auto-generate missing components if not provided
         if age is None:
@@ -154,11 +362,6 @@ class SEGPersonaGenerator:
             "creation_timestamp": "2025-01-09",
             "version": "1.2",
         }
-
-        # Store and persist the generated persona
-        self.generated_personas[name] = persona
-        self.persistence.save_generated_persona(persona)
-
         return persona
 
     def _generate_location(self, profession: str) -> str:
@@ -349,12 +552,97 @@ class SEGPersonaGenerator:
 
     async def analyze_through_lens(
         self,
-        text: str,
+        text: Optional[str],
         persona_or_replicant: str,
         analysis_focus: Optional[str] = None,
         depth: str = "moderate",
+        source: Optional[str] = None,
+        chunked: Optional[bool] = None,
+        progress: Optional[Callable[[float, str], None]] = None,
+        raise_errors: bool = False,
     ) -> str:
-        """Analyze text through a specific persona's experiential lens."""
+        """Analyze text through a specific persona's experiential lens.
+
+        The text is given inline or, for long documents, as ``source`` (a
+        path or file:// URI, see documents.py). Text longer than
+        ``SEG_LENS_CHUNK_TOKENS`` is analyzed map-reduce style: each part is
+        read through the persona in parallel, and the persona then responds
+        to the whole from its notes. ``chunked`` forces that on or off.
+
+        A failure is returned as its message, or raised as
+        LensAnalysisError with ``raise_errors``.
+        """
+        try:
+            return await self._analyze(
+                text,
+                persona_or_replicant,
+                analysis_focus,
+                depth,
+                source,
+                chunked,
+                progress,
+            )
+        except LensAnalysisError as e:
+            if raise_errors:
+                raise
+            return str(e)
+
+    async def _analyze(
+        self,
+        text: Optional[str],
+        persona_or_replicant: str,
+        analysis_focus: Optional[str],
+        depth: str,
+        source: Optional[str],
+        chunked: Optional[bool],
+        progress: Optional[Callable[[float, str], None]],
+    ) -> str:
+        system_prompt = self._lens_system_prompt(persona_or_replicant, depth)
+        if system_prompt is None:
+            raise LensAnalysisError(
+                f"Unknown persona or replicant: {persona_or_replicant}"
+            )
+
+        if source:
+            try:
+                text = await asyncio.to_thread(read_document, source)
+            except (OSError, ValueError) as e:
+                raise LensAnalysisError(f"Could not read source document: {e}") from e
+        if not text:
+            raise LensAnalysisError(
+                "Nothing to analyze: provide text or a source document"
+            )
+
+        if chunked is None:
+            chunked = estimate_tokens(text) > self.lens_chunk_tokens
+        if chunked:
+            return await self._analyze_chunked(
+                text, system_prompt, analysis_focus, depth, progress
+            )
+
+        user_content = f"""Source Text:
+{text}
+
+Analysis Focus: {analysis_focus or 'General perspective'}
+Depth: {depth}
+"""
+
+        response = await self.ai_service.generate_response(
+            messages=[{"role": "user", "content": user_content}],
+            system_prompt=system_prompt,
+            tool="analyze_through_seg_lens",
+            profile=depth,
+        )
+
+        if response.error:
+            raise LensAnalysisError(f"Error during analysis: {response.error}")
+
+        return response.content
+
+    def _lens_system_prompt(
+        self, persona_or_replicant: str, depth: str
+    ) -> Optional[str]:
+        """The lens system prompt; None for an unknown persona or replicant."""
 
         # Check if it's a known replicant or custom replicant
         molecular_self = None
@@ -372,7 +660,7 @@ class SEGPersonaGenerator:
             perspective = persona["directive"]
             molecular_self = persona.get("molecular_self")
         else:
-            return f"Unknown persona or replicant: {persona_or_replicant}"
+            return None
 
         if molecular_self:
             lens_description += "\n\nSection 0 (Molecular Self):\n"
@@ -412,25 +700,118 @@ Perspective: {perspective}
         # Trunk first, persona below. Empty trunk_preamble degrades cleanly
         # to v1.1 behavior (persona block alone), so the absence of the
         # Base Assistant in the registry doesn't break anything.
-        system_prompt = (
-            f"{trunk_preamble}{persona_block}" if trunk_preamble else persona_block
-        )
+        return f"{trunk_preamble}{persona_block}" if trunk_preamble else persona_block
 
-        user_content = f"""Source Text:
-{text}
-
-Analysis Focus: {analysis_focus or 'General perspective'}
+    async def _analyze_chunked(
+        self,
+        text: str,
+        system_prompt: str,
+        analysis_focus: Optional[str],
+        depth: str,
+        progress: Optional[Callable[[float, str], None]] = None,
+    ) -> str:
+        """Map-reduce lens analysis of a document too long for one call.
+
+        Raises LensAnalysisError if no part, or the final response, could
+        be generated.
+
+        Map: every chunk is read through the persona, at most
+        ``SEG_LENS_CONCURRENCY`` at a time. Notes that together would
+        still overflow a chunk are folded in groups until they fit. Reduce:
+        the persona responds to the whole document from its notes, at the
+        requested depth.
+        """
+        chunks = split_document(text, self.lens_chunk_tokens)
+        metrics.inc("lens.chunked")
+        metrics.inc("lens.chunks", len(chunks))
+        semaphore = asyncio.Semaphore(self.lens_concurrency)
+        done = 0
+        focus = analysis_focus or "General perspective"
+        templates = SEG_PROMPTS["lens_map_reduce"]
+
+        async def read_part(
+            instruction: str, body: str, counted: bool = False
+        ) -> AIResponse:
+            nonlocal done
+            async with semaphore:
+                response = await self.ai_service.generate_response(
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": f"{instruction}\n\n{body}\n\n"
+                            f"Analysis Focus: {focus}",
+                        }
+                    ],
+                    system_prompt=system_prompt,
+                    tool="analyze_through_seg_lens",
+                    profile="lens.chunk",
+                )
+            if counted:
+                done += 1
+                if progress:
+                    progress(
+                        0.05 + 0.8 * done / len(chunks),
+                        f"Read {done}/{len(chunks)} parts",
+                    )
+            return response
+
+        parts = await asyncio.gather(
+            *(
+                read_part(
+                    templates["chunk"],
+                    f"Source Text (part {i} of {len(chunks)}):\n{chunk}",
+                    counted=True,
+                )
+                for i, chunk in enumerate(chunks, 1)
+            )
+        )
+        notes = [
+            f"[Part {i}]\n{part.content}"
+            for i, part in enumerate(parts, 1)
+            if not part.error
+        ]
+        if not notes:
+            raise LensAnalysisError(f"Error during analysis: {parts[0].error}")
+        failed = len(parts) - len(notes)
+
+        # Fold the notes until they fit one call alongside the prompt. Each
+        # pass packs neighbours into fewer groups; it stops when packing can
+        # no longer merge anything.
+        while (
+            len(notes) > 1
+            and estimate_tokens("\n\n".join(notes)) > self.lens_chunk_tokens
+        ):
+            groups = pack(notes, self.lens_chunk_tokens)
+            if len(groups) == len(notes):
+                break  # every note is already a group of one
+            folded = await asyncio.gather(
+                *(read_part(templates["combine"], group) for group in groups)
+            )
+            notes = [
+                part.content if not part.error else group
+                for part, group in zip(folded, groups)
+            ]
+
+        if failed:
+            notes.append(f"({failed} of {len(parts)} parts could not be read.)")
+        joined = "\n\n".join(notes)
+        user_content = f"""Your notes on the source text, read part by part:
+{joined}
+
+Respond to the source text as a whole.
+Analysis Focus: {focus}
 Depth: {depth}
 """
-
+        if progress:
+            progress(0.9, "Composing response")
         response = await self.ai_service.generate_response(
             messages=[{"role": "user", "content": user_content}],
             system_prompt=system_prompt,
+            tool="analyze_through_seg_lens",
+            profile=depth,
         )
-
         if response.error:
-            return f"Error during analysis: {response.error}"
-
+            raise LensAnalysisError(f"Error during analysis: {response.error}")
         return response.content
 
     async def create_custom_replicant(
@@ -502,10 +883,27 @@ class SEGCouncilOrchestrator:
         self,
         ai_service: Optional[AIService] = None,
         registry: Optional[ReplicantRegistry] = None,
+        persistence: Optional[SEGPersistenceManager] = None,
     ):
         self.active_sessions = {}
         self.ai_service = ai_service or AIService()
         self.registry = registry
+        # Checkpoints go wherever the registry persists, unless overridden.
+        # Without either, sessions stay in memory as before.
+        self.persistence = persistence or (registry.persistence if registry else None)
+        self.execution = os.getenv("SEG_COUNCIL_EXECUTION", "single")
+        # Token budget for the rolling context (positions + last exchange)
+        # each cycle turn sees, so prompts stay flat as cycles accumulate.
+        self.context_tokens = int(os.getenv("SEG_COUNCIL_CONTEXT_TOKENS", "1200"))
+        # Load shedding: "auto" answers with the deterministic render when
+        # the backend is saturated or every endpoint is ejected, "always"
+        # forces it, "off" always queues for the model.
+        self.degrade = os.getenv("SEG_COUNCIL_DEGRADE", "off").lower()
+        # In-flight model requests per admitted endpoint that count as
+        # saturated.
+        self.degrade_outstanding = int(
+            os.getenv("SEG_COUNCIL_DEGRADE_OUTSTANDING", "4")
+        )
 
     async def run_session(
         self,
@@ -514,15 +912,25 @@ class SEGCouncilOrchestrator:
         mode: str = "dialogic",
         constraints: Optional[str] = None,
         cycles: int = 2,
+        execution: Optional[str] = None,
+        on_start: Optional[Callable[[str], None]] = None,
     ) -> str:
-        """Run a multi-persona council reasoning session."""
+        """Run a multi-persona council reasoning session.
+
+        ``execution`` (default ``SEG_COUNCIL_EXECUTION``) is "single" for
+        one generation that emulates the cycles, or "cycles" to run them
+        as real sequential turns. ``on_start`` is called with the session
+        ID once the session is checkpointed, so a caller interrupted later
+        can hand it to ``resume_session``.
+        """
+        execution = execution or self.execution
+        if execution not in COUNCIL_EXECUTION_MODES:
+            return f"Unknown execution mode: {execution}"
 
         # Validate replicants
         valid_replicants = []
         all_names = (
-            self.registry.get_names()
-            if self.registry
-            else list(REPLICANT_DEFINITIONS.keys())
+            self.registry.snapshot.names if self.registry else REPLICANT_DEFINITIONS
         )
         for rep in replicants:
             if rep in all_names:
@@ -533,28 +941,304 @@ class SEGCouncilOrchestrator:
         if len(valid_replicants) < 2:
             return "Council sessions require at least 2 replicants"
 
-        # Generate session structure
-        session_id = f"council_{len(self.active_sessions) + 1}"
+        # Random rather than sequential IDs: checkpoints outlive the process,
+        # and a restarted server must not reuse an ID already on disk.
+        session_id = f"council_{os.urandom(4).hex()}"
 
         session = {
             "id": session_id,
+            "kind": "orchestrator",
             "premise": premise,
             "participants": valid_replicants,
             "mode": mode,
             "constraints": constraints,
             "cycles": cycles,
+            "execution": execution,
             "status": "running",
+            "turns": [],
+            "created_at": datetime.now(timezone.utc).isoformat(),
         }
 
         self.active_sessions[session_id] = session
+        self._checkpoint(session)
+        if on_start:
+            on_start(session_id)
+
+        reason = self._degrade_reason()
+        if reason:
+            return self._degraded(session, reason)
+
+        return await self._execute_session(session)
+
+    def _degrade_reason(self) -> Optional[str]:
+        """Why this session should skip the model right now, if it should."""
+        if self.degrade == "always":
+            return "forced"
+        if self.degrade != "auto":
+            return None
+        health = self.ai_service.chain_health("run_council_session")
+        if not health["pooled"]:
+            return None
+        if not health["available"]:
+            return "circuit_open"
+        admitted = health["admitted"]
+        if admitted and health["outstanding"] >= self.degrade_outstanding * admitted:
+            return "saturated"
+        return None
+
+    def _degraded(self, session: Dict[str, Any], reason: str) -> str:
+        """Answer with the deterministic registry render, flagged as such."""
+        metrics.inc("council.degraded", labels={"reason": reason})
+        notice = (
+            f"> **Degraded response ({reason}).** The model backend is "
+            f"unavailable or overloaded, so this council was rendered from "
+            f"registry data without a model call. Run it again when load "
+            f"drops for a generated session.\n\n"
+        )
+        session["status"] = "complete"
+        session["degraded"] = reason
+        session["output"] = notice + self._generate_council_output(session)
+        self._checkpoint(session)
+        return session["output"]
+
+    async def resume_session(self, session_id: str) -> str:
+        """Continue a checkpointed session from its last completed turn.
+
+        Completed sessions return their stored output without any new
+        generation; interrupted or failed ones re-run only the turns that
+        never finished.
+        """
+        session = self.active_sessions.get(session_id)
+        if session is None and self.persistence:
+            session = self.persistence.load_council_checkpoint(session_id)
+        if not session or session.get("kind") != "orchestrator":
+            return f"Unknown council session: {session_id}"
 
-        # Generate council session output via AI
-        output = await self._generate_council_output_ai(session)
+        self.active_sessions[session_id] = session
+        if session["status"] == "complete":
+            return session["output"]
+
+        session["status"] = "running"
+        session.pop("error", None)
+        self._checkpoint(session)
+        return await self._execute_session(session)
+
+    async def _execute_session(self, session: Dict[str, Any]) -> str:
+        """Run every turn of a session not already recorded in ``turns``.
+
+        Each completed turn is checkpointed before the next starts, so a
+        failure or restart costs at most the turn in flight.
+        """
+        if session.get("execution") == "cycles":
+            return await self._execute_cycles(session)
+
+        completed = {turn["step"] for turn in session["turns"]}
+
+        if "council" not in completed:
+            # Generate council session output via AI
+            try:
+                output = await self._generate_council_output_ai(session)
+            except CouncilSessionError as e:
+                return self._fail(session, e)
+            session["turns"].append({"step": "council", "content": output})
+            self._checkpoint(session)
 
         session["status"] = "complete"
-        session["output"] = output
+        session["output"] = session["turns"][-1]["content"]
+        self._checkpoint(session)
+
+        return session["output"]
+
+    async def _execute_cycles(self, session: Dict[str, Any]) -> str:
+        """Run each cycle as one turn per participant, then a synthesis.
+
+        Feeding every turn the whole transcript grows prompts quadratically
+        with cycles. Each turn here sees only the rolling context: every
+        participant's latest one-line position plus the most recent
+        exchange, both clipped to ``context_tokens``. The context is rebuilt
+        from the checkpointed turns, so resuming needs no extra state.
+        """
+        completed = {turn["step"] for turn in session["turns"]}
+        for cycle in range(1, session["cycles"] + 1):
+            for rep in session["participants"]:
+                step = f"cycle{cycle}:{rep}"
+                if step in completed:
+                    continue
+                try:
+                    output = await self._generate_cycle_turn(session, cycle, rep)
+                except CouncilSessionError as e:
+                    return self._fail(session, e)
+                content, position = _split_position(output)
+                session["turns"].append(
+                    {
+                        "step": step,
+                        "cycle": cycle,
+                        "speaker": rep,
+                        "content": content,
+                        "position": position,
+                    }
+                )
+                self._checkpoint(session)
 
-        return output
+        if "synthesis" not in completed:
+            try:
+                output = await self._generate_cycle_synthesis(session)
+            except CouncilSessionError as e:
+                return self._fail(session, e)
+            session["turns"].append({"step": "synthesis", "content": output})
+            self._checkpoint(session)
+
+        session["status"] = "complete"
+        session["output"] = self._render_cycles(session)
+        self._checkpoint(session)
+        return session["output"]
+
+    def _fail(self, session: Dict[str, Any], error: CouncilSessionError) -> str:
+        session["status"] = "failed"
+        session["error"] = f"Error during council session: {error}"
+        self._checkpoint(session)
+        return (
+            f"{session['error']}\n\nSession {session['id']} was checkpointed; "
+            f"call resume_council_session to retry the remaining turns."
+        )
+
+    def _rolling_context(self, session: Dict[str, Any]) -> str:
+        """Positions so far plus the last exchange, within the token budget.
+
+        Half the budget goes to positions (split evenly per participant),
+        the rest to the newest turns of the last exchange; older turns are
+        truncated first.
+        """
+        spoken = [turn for turn in session["turns"] if "speaker" in turn]
+        if not spoken:
+            return ""
+        positions: Dict[str, str] = {}
+        for turn in spoken:
+            positions[turn["speaker"]] = turn["position"]
+
+        budget = self.context_tokens * 4  # characters, ~4 per token
+        per_position = max(80, budget // 2 // len(session["participants"]))
+        position_lines = [
+            f"- {name}: {_clip(text, per_position)}" for name, text in positions.items()
+        ]
+        remaining = budget - sum(len(line) for line in position_lines)
+
+        exchange: List[str] = []
+        for turn in reversed(spoken[-len(session["participants"]) :]):
+            if remaining <= 80:
+                break
+            line = f"{turn['speaker']}: {_clip(turn['content'], remaining)}"
+            exchange.append(line)
+            remaining -= len(line)
+        exchange.reverse()
+
+        return (
+            "POSITIONS SO FAR:\n"
+            + "\n".join(position_lines)
+            + "\n\nLAST EXCHANGE:\n"
+            + "\n\n".join(exchange)
+        )
+
+    def _checkpoint(self, session: Dict[str, Any]) -> None:
+        if self.persistence:
+            self.persistence.save_council_checkpoint(session)
+
+    def _definitions(self) -> Mapping[str, Any]:
+        return (
+            self.registry.get_all_definitions()
+            if self.registry
+            else REPLICANT_DEFINITIONS
+        )
+
+    @staticmethod
+    def _participant_context(rep: str, rep_data: Dict[str, Any]) -> str:
+        mol = rep_data.get("molecular_self", {})
+        context = (
+            f"NAME: {rep}\n"
+            f"ROLE: {rep_data.get('role')}\n"
+            f"CORE_FUNCTION: {rep_data.get('core_function')}\n"
+            f"PERSPECTIVE: {rep_data.get('perspective')}"
+        )
+        if mol:
+            mol_str = "\n".join([f"  {k.upper()}: {v}" for k, v in mol.items()])
+            context += f"\nMOLECULAR SELF (Section 0):\n{mol_str}"
+        return context
+
+    async def _council_generate(
+        self, system_prompt: str, content: str, profile: str
+    ) -> str:
+        """One council generation; raises CouncilSessionError on failure."""
+        metrics.observe(
+            "council.prompt_tokens",
+            estimate_tokens(system_prompt + content),
+            buckets=_COUNCIL_PROMPT_BUCKETS,
+        )
+        response = await self.ai_service.generate_response(
+            messages=[{"role": "user", "content": content}],
+            system_prompt=system_prompt,
+            tool="run_council_session",
+            profile=profile,
+        )
+        if response.error:
+            raise CouncilSessionError(response.error)
+        return response.content
+
+    async def _generate_cycle_turn(
+        self, session: Dict[str, Any], cycle: int, rep: str
+    ) -> str:
+        """One participant's turn in one cycle, given the rolling context."""
+        trunk_preamble = _build_base_seg_trunk(self.registry) if self.registry else ""
+        context = self._participant_context(rep, self._definitions()[rep])
+        others = ", ".join(p for p in session["participants"] if p != rep)
+        turn_block = f"""You are {rep}, one voice in a council with {others}.
+
+{context}
+
+PREMISE: {session["premise"]}
+CONSTRAINTS: {session.get("constraints") or "None"}
+
+This is cycle {cycle} of {session["cycles"]}. Speak only as {rep}, in your own
+register, to the premise and to what the others have said. Move your
+position forward rather than repeating it. Stay under 250 words.
+
+End with one line starting "{_POSITION_PREFIX}" that states your current
+stance in a single sentence. That line is bookkeeping for the council and
+is not shown as part of your turn.
+"""
+        system_prompt = f"{trunk_preamble}{turn_block}"
+        rolling = self._rolling_context(session)
+        content = rolling or f"Open the council on: {session['premise']}"
+        return await self._council_generate(system_prompt, content, "council.turn")
+
+    async def _generate_cycle_synthesis(self, session: Dict[str, Any]) -> str:
+        """Shape the final positions and exchange into the mode's output."""
+        protocol = SEG_PROMPTS["council_session"].get(
+            session["mode"], SEG_PROMPTS["council_session"]["dialogic"]
+        )
+        trunk_preamble = _build_base_seg_trunk(self.registry) if self.registry else ""
+        synthesis_block = f"""The council below has met for {session["cycles"]} cycles. Render its
+outcome from each participant's final position and the closing exchange.
+
+PREMISE: {session["premise"]}
+MODE: {session["mode"]}
+CONSTRAINTS: {session.get("constraints") or "None"}
+PARTICIPANTS: {", ".join(session["participants"])}
+
+{protocol}
+"""
+        return await self._council_generate(
+            f"{trunk_preamble}{synthesis_block}",
+            self._rolling_context(session),
+            f"council.{session['mode']}",
+        )
+
+    def _render_cycles(self, session: Dict[str, Any]) -> str:
+        lines = [session["turns"][-1]["content"], "", "---", "", "### Transcript", ""]
+        for turn in session["turns"]:
+            if "speaker" in turn:
+                heading = f"**Cycle {turn['cycle']}: {turn['speaker']}**"
+                lines.append(f"{heading}\n\n{turn['content']}\n")
+        return "\n".join(lines)
 
     async def _generate_council_output_ai(self, session: Dict[str, Any]) -> str:
         """Generate AI-driven council session output."""
@@ -565,27 +1249,10 @@ class SEGCouncilOrchestrator:
         cycles = session["cycles"]
 
         # Build participant context
-        participant_context = []
-        all_defs = (
-            self.registry.get_all_definitions()
-            if self.registry
-            else REPLICANT_DEFINITIONS
-        )
-        for rep in participants:
-            rep_data = all_defs[rep]
-            mol = rep_data.get("molecular_self", {})
-            mol_str = "\n".join([f"  {k.upper()}: {v}" for k, v in mol.items()])
-
-            context = (
-                f"NAME: {rep}\n"
-                f"ROLE: {rep_data.get('role')}\n"
-                f"CORE_FUNCTION: {rep_data.get('core_function')}\n"
-                f"PERSPECTIVE: {rep_data.get('perspective')}"
-            )
-            if mol:
-                context += f"\nMOLECULAR SELF (Section 0):\n{mol_str}"
-
-            participant_context.append(context)
+        all_defs = self._definitions()
+        participant_context = [
+            self._participant_context(rep, all_defs[rep]) for rep in participants
+        ]
 
         # Mode selects the output-shape template. The previous code path
         # always selected "advanced" regardless of mode; mode is now what
@@ -639,10 +1306,12 @@ PARTICIPANTS:
                 {"role": "user", "content": f"Begin council session for: {premise}"}
             ],
             system_prompt=system_prompt,
+            tool="run_council_session",
+            profile=f"council.{mode}",
         )
 
         if response.error:
-            return f"Error during council session: {response.error}"
+            raise CouncilSessionError(response.error)
 
         return response.content
 
@@ -657,11 +1326,7 @@ PARTICIPANTS:
 
         # Build participant list with brief descriptions
         participant_descriptions = []
-        all_defs = (
-            self.registry.get_all_definitions()
-            if self.registry
-            else REPLICANT_DEFINITIONS
-        )
+        all_defs = self._definitions()
         for rep in participants:
             rep_data = all_defs[rep]
             participant_descriptions.append(
@@ -690,7 +1355,7 @@ The council convenes to explore: "{premise}"
 
         # Generate initial responses for each participant
         for rep in participants:
-            rep_data = REPLICANT_DEFINITIONS[rep]
+            rep_data = all_defs[rep]
             output += f"**{rep}** responds:\n"
             output += (
                 f"*[Drawing from "
@@ -13,10 +13,12 @@ import asyncio
 import builtins
 import json
 import logging
+import os
 import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+import anyio
 import mcp.types as types
 from mcp.server import Server
 
@@ -34,14 +36,45 @@ def _stderr_print(*args, **kwargs):
 builtins.print = _stderr_print
 
 from mcp.server.stdio import stdio_server
-from pydantic import BaseModel, Field, field_validator
 
 original_stdout = sys.stdout
 
 from .ai_service import AIService
 from .council import CouncilManager
-from .seg_core import SEGCouncilOrchestrator, SEGPersonaGenerator
+from .jobs import JobQueue, register_seg_jobs
+from .metrics import metrics, process_stats
+from .pool import all_pool_status
+from .profiling import PROFILE_MODES, Profiler
+from .registry_watcher import RegistryWatcher
+from .seg_core import (
+    COUNCIL_EXECUTION_MODES,
+    SEGCouncilOrchestrator,
+    SEGPersonaGenerator,
+    collect_persona_specs,
+)
 from .templates import SEG_TEMPLATES
+from .tool_args import (
+    JOB_ARGS,
+    AnalyzeLensArgs,
+    CreateReplicantArgs,
+    DeleteReplicantArgs,
+    GeneratePersonaArgs,
+    GeneratePersonasBulkArgs,
+    GetJobArgs,
+    GetReplicantDetailsArgs,
+    GetSegCouncilStatusArgs,
+    MemorySnapshotArgs,
+    ModelResidencyArgs,
+    ResumeCouncilSessionArgs,
+    RunCouncilSessionArgs,
+    StartProfileArgs,
+    StartSegCouncilArgs,
+    StopProfileArgs,
+    SubmitJobArgs,
+    validate_job_arguments,
+)
+from .warmup import ModelWarmer
+from .watchdog import LoopWatchdog
 
 # Restore stdout in case crewai or other libs monkeypatched it
 sys.stdout = original_stdout
@@ -51,132 +84,6 @@ logging.basicConfig(level=logging.ERROR, stream=sys.stderr)
 logger = logging.getLogger(__name__)
 
 
-# Pydantic Models for Tool Validation
-class GeneratePersonaArgs(BaseModel):
-    """Arguments for the generate_persona tool."""
-
-    name: str = Field(..., description="Persona name")
-    age: Optional[int] = Field(None, description="Age in years")
-    profession: str = Field(..., description="Primary profession or role")
-    location: Optional[str] = Field(None, description="Geographic/cultural context")
-    defining_experience: str = Field(
-        ..., description="Core emotional/formative experience"
-    )
-    domain_expertise: Optional[str] = Field(
-        None, description="Area of specialized knowledge"
-    )
-    philosophical_stance: Optional[str] = Field(
-        None, description="Core worldview or belief system"
-    )
-    style_preferences: Optional[str] = Field(
-        None, description="Communication style and linguistic preferences"
-    )
-    molecular_self: Optional[Dict[str, str]] = Field(
-        None, description="Section 0: Molecular Self generative substrate"
-    )
-
-
-class RunCouncilSessionArgs(BaseModel):
-    """Arguments for the run_council_session tool."""
-
-    premise: str = Field(..., description="Core question or scenario to explore")
-    replicants: List[str] = Field(
-        ..., description="List of replicants to include (2-10 personas)"
-    )
-    mode: str = Field("dialogic", description="Output format for the council session")
-    constraints: Optional[str] = Field(
-        None, description="Optional constraints or rules"
-    )
-    cycles: int = Field(2, description="Number of reasoning cycles (1-5)")
-
-    @field_validator("mode")
-    @classmethod
-    def validate_mode(cls, v):
-        """Validate the council session mode."""
-        allowed = ["dialogic", "braided_report", "strategic", "aesthetic"]
-        if v not in allowed:
-            raise ValueError(f"Mode must be one of {allowed}")
-        return v
-
-    @field_validator("replicants")
-    @classmethod
-    def validate_replicants(cls, v):
-        """Validate the number of replicants."""
-        if len(v) < 2 or len(v) > 10:
-            raise ValueError("Replicant count must be between 2 and 10")
-        return v
-
-
-class AnalyzeLensArgs(BaseModel):
-    """Arguments for the analyze_through_seg_lens tool."""
-
-    text: str = Field(..., description="Text or concept to analyze")
-    persona_or_replicant: str = Field(..., description="Persona name or replicant type")
-    analysis_focus: Optional[str] = Field(
-        None, description="Specific aspect to focus on"
-    )
-    depth: str = Field("moderate", description="Depth of experiential filtering")
-
-    @field_validator("depth")
-    @classmethod
-    def validate_depth(cls, v):
-        """Validate the analysis depth."""
-        allowed = ["surface", "moderate", "deep"]
-        if v not in allowed:
-            raise ValueError(f"Depth must be one of {allowed}")
-        return v
-
-
-class CreateReplicantArgs(BaseModel):
-    """Arguments for the create_custom_replicant tool."""
-
-    archetype_name: str = Field(..., description="Name of the new archetype")
-    core_function: str = Field(..., description="Primary cognitive/creative function")
-    anchor_identity: Optional[str] = Field(
-        None, description="Base identity and context"
-    )
-    sensory_web: Optional[Dict[str, str]] = Field(None)
-    emotional_core: Optional[str] = Field(None)
-    philosophy: Optional[str] = Field(None)
-    linguistic_style: Optional[str] = Field(None)
-    directive: str = Field(..., description="How to use this replicant")
-    molecular_self: Optional[Dict[str, str]] = Field(
-        None,
-        description=(
-            "Section 0: Molecular Self generative substrate. Seven optional keys: "
-            "recursive_anchor, gradient_pump, backbone, reflection, exploration, "
-            "switch_trigger, emotion_vector_primary."
-        ),
-    )
-
-
-class GetReplicantDetailsArgs(BaseModel):
-    """Arguments for the get_replicant_details tool."""
-
-    replicant_name: str = Field(..., description="Name of the replicant to examine")
-
-
-class DeleteReplicantArgs(BaseModel):
-    """Arguments for the delete_custom_replicant tool."""
-
-    replicant_name: str = Field(
-        ..., description="Name of the custom replicant to permanently remove"
-    )
-
-
-class StartSegCouncilArgs(BaseModel):
-    """Arguments for the start_seg_council tool."""
-
-    premise: str = Field(..., description="Core question or scenario to explore")
-    agent_ids: List[str] = Field(..., description="List of replicants to include")
-
-
-class GetSegCouncilStatusArgs(BaseModel):
-    """Arguments for the get_seg_council_status tool."""
-
-    session_id: str = Field(..., description="ID of the council session")
-
-
 # Initialize the SEG MCP Server
 app = Server("seg-mcp-server", version="1.1.0")
 
@@ -188,7 +95,15 @@ persona_generator = SEGPersonaGenerator(ai_service=ai_service)
 council_orchestrator = SEGCouncilOrchestrator(
     ai_service=ai_service, registry=persona_generator.registry
 )
-council_manager = CouncilManager()
+council_manager = CouncilManager(
+    persistence=persona_generator.persistence, registry=persona_generator.registry
+)
+job_queue = JobQueue(persona_generator.persistence, owner="mcp")
+profiler = Profiler(persona_generator.persistence.data_dir / "profiles")
+loop_watchdog = LoopWatchdog()
+model_warmer = ModelWarmer(ai_service)
+registry_watcher = RegistryWatcher(persona_generator.registry)
+register_seg_jobs(job_queue, persona_generator, council_orchestrator)
 
 # Server root directory for resources
 SERVER_ROOT = Path(__file__).parent
@@ -247,7 +162,9 @@ async def read_resource(uri: str) -> str:
         )
 
     elif uri == "seg://replicants/detailed":
-        return json.dumps(persona_generator.registry.get_all_definitions(), indent=2)
+        return json.dumps(
+            dict(persona_generator.registry.get_all_definitions()), indent=2
+        )
 
     elif uri == "seg://framework/components":
         return """# SEG Framework: 6-Component Persona Architecture
@@ -360,6 +277,33 @@ async def list_tools() -> List[types.Tool]:
                 ],
             },
         ),
+        types.Tool(
+            name="generate_personas_bulk",
+            description=(
+                "Generate many SEG personas in one call and persist them in a single "
+                "write. Accepts specs inline or as JSONL/CSV text; reports per-item "
+                "results (as progress notifications when requested) and throughput."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "specs": {
+                        "type": "array",
+                        "items": {"type": "object"},
+                        "description": "Persona specs with generate_persona's fields",
+                    },
+                    "data": {
+                        "type": "string",
+                        "description": "Specs as JSONL lines or CSV with a header row",
+                    },
+                    "format": {
+                        "type": "string",
+                        "enum": ["jsonl", "csv"],
+                        "description": "Format of data (default jsonl)",
+                    },
+                },
+            },
+        ),
         types.Tool(
             name="run_council_session",
             description="Orchestrate a multi-persona reasoning session using selected replicants to explore complex premises.",
@@ -393,6 +337,17 @@ async def list_tools() -> List[types.Tool]:
                         "type": "integer",
                         "description": "Number of reasoning cycles (1-5)",
                         "default": 2,
+                        "minimum": 1,
+                        "maximum": 5,
+                    },
+                    "execution": {
+                        "type": "string",
+                        "enum": list(COUNCIL_EXECUTION_MODES),
+                        "description": (
+                            "single: one generation emulates the cycles; "
+                            "cycles: a real turn per participant per cycle "
+                            "with a bounded rolling summary"
+                        ),
                     },
                 },
                 "required": ["premise", "replicants"],
@@ -407,13 +362,24 @@ async def list_tools() -> List[types.Tool]:
         ),
         types.Tool(
             name="analyze_through_seg_lens",
-            description="Analyze text or concepts through a specific SEG persona's experiential lens.",
+            description=(
+                "Analyze text or concepts through a specific SEG persona's experiential lens. "
+                "Long documents can be passed by path and are analyzed in parallel chunks."
+            ),
             inputSchema={
                 "type": "object",
                 "properties": {
                     "text": {
                         "type": "string",
-                        "description": "Text or concept to analyze",
+                        "description": "Text or concept to analyze (or use source)",
+                    },
+                    "source": {
+                        "type": "string",
+                        "description": "Path or file:// URI of a document to analyze instead of text",
+                    },
+                    "chunked": {
+                        "type": "boolean",
+                        "description": "Analyze in parallel chunks and merge; defaults to on for long text",
                     },
                     "persona_or_replicant": {
                         "type": "string",
@@ -429,7 +395,7 @@ async def list_tools() -> List[types.Tool]:
                         "description": "Depth of experiential filtering",
                     },
                 },
-                "required": ["text", "persona_or_replicant"],
+                "required": ["persona_or_replicant"],
                 "examples": [
                     {
                         "text": "The development of AGI",
@@ -560,6 +526,157 @@ async def list_tools() -> List[types.Tool]:
                 "required": ["session_id"],
             },
         ),
+        types.Tool(
+            name="resume_council_session",
+            description=(
+                "Continue a council session (run_council_session or start_seg_council) "
+                "from its last checkpointed turn after a failure or server restart. "
+                "Completed sessions return their stored output without regenerating."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "session_id": {
+                        "type": "string",
+                        "description": "Council session ID reported by the original call",
+                    }
+                },
+                "required": ["session_id"],
+            },
+        ),
+        types.Tool(
+            name="submit_job",
+            description=(
+                "Queue a long-running tool call (run_council_session, "
+                "resume_council_session, analyze_through_seg_lens, generate_persona, "
+                "generate_personas_bulk) "
+                "for background execution and return a job ID immediately."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "kind": {
+                        "type": "string",
+                        "enum": list(JOB_ARGS),
+                        "description": "Tool to run in the background",
+                    },
+                    "arguments": {
+                        "type": "object",
+                        "description": "Arguments exactly as the tool itself takes them",
+                    },
+                },
+                "required": ["kind", "arguments"],
+            },
+        ),
+        types.Tool(
+            name="get_job_status",
+            description="Report the status and progress of a background job.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "ID returned by submit_job",
+                    }
+                },
+                "required": ["job_id"],
+            },
+        ),
+        types.Tool(
+            name="get_job_result",
+            description="Fetch the output of a finished background job.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "ID returned by submit_job",
+                    }
+                },
+                "required": ["job_id"],
+            },
+        ),
+        types.Tool(
+            name="get_server_metrics",
+            description=(
+                "Report server metrics: AI request counts and latency histograms, "
+                "hedged-request outcomes, endpoint pool health, process RSS, and "
+                "event-loop lag with the stacks of calls that blocked the loop."
+            ),
+            inputSchema={"type": "object", "properties": {}},
+        ),
+        types.Tool(
+            name="get_model_residency",
+            description=(
+                "Report which configured models each Ollama endpoint holds in "
+                "memory (via /api/ps) and the last warm-up's load times. "
+                "With warm=true, load them first with a zero-token request."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "warm": {
+                        "type": "boolean",
+                        "description": "Load the configured models first",
+                        "default": False,
+                    },
+                },
+            },
+        ),
+        types.Tool(
+            name="start_profile",
+            description=(
+                "Admin: start a CPU profile of the running server. 'cpu' uses "
+                "cProfile (exact, higher overhead); 'sampling' records the event-loop "
+                "stack periodically (low overhead). Stop with stop_profile."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "mode": {"type": "string", "enum": list(PROFILE_MODES)},
+                    "interval_ms": {
+                        "type": "number",
+                        "description": "Sampling interval (sampling mode only)",
+                    },
+                },
+            },
+        ),
+        types.Tool(
+            name="stop_profile",
+            description=(
+                "Admin: stop the running profile, write it under data/profiles/ and "
+                "return the top-N hot functions or frames."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "top_n": {"type": "integer", "minimum": 1},
+                    "sort": {
+                        "type": "string",
+                        "enum": ["cumulative", "tottime", "calls"],
+                        "description": "cProfile sort order",
+                    },
+                },
+            },
+        ),
+        types.Tool(
+            name="memory_snapshot",
+            description=(
+                "Admin: tracemalloc snapshot of the running server. The first call "
+                "starts tracing; later calls write a snapshot under data/profiles/ and "
+                "return the top allocation sites and growth since the last snapshot."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "top_n": {"type": "integer", "minimum": 1},
+                    "stop": {
+                        "type": "boolean",
+                        "description": "Stop tracing after this snapshot",
+                    },
+                },
+            },
+        ),
     ]
 
 
@@ -572,6 +689,33 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextCont
         result = await persona_generator.generate_persona(**args.dict())
         return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
 
+    elif name == "generate_personas_bulk":
+        args = GeneratePersonasBulkArgs(**arguments)
+        specs = collect_persona_specs(args.specs, args.data, args.format)
+
+        # Per-item results stream as MCP progress notifications when the
+        # client asked for progress; the final summary carries them all.
+        ctx = app.request_context
+        token = ctx.meta.progressToken if ctx.meta else None
+        notifications = []
+
+        def on_result(result: Dict[str, Any]) -> None:
+            if token is not None:
+                notifications.append(
+                    asyncio.ensure_future(
+                        ctx.session.send_progress_notification(
+                            token,
+                            result["index"] + 1,
+                            total=len(specs),
+                            message=f"{result['name']}: {result['status']}",
+                        )
+                    )
+                )
+
+        summary = await persona_generator.generate_personas_bulk(specs, on_result)
+        await asyncio.gather(*notifications)
+        return [types.TextContent(type="text", text=json.dumps(summary, indent=2))]
+
     elif name == "run_council_session":
         args = RunCouncilSessionArgs(**arguments)
         result = await council_orchestrator.run_session(**args.dict())
@@ -656,6 +800,78 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextCont
         status = council_manager.get_status(args.session_id)
         return [types.TextContent(type="text", text=json.dumps(status, indent=2))]
 
+    elif name == "resume_council_session":
+        args = ResumeCouncilSessionArgs(**arguments)
+        checkpoint = persona_generator.persistence.load_council_checkpoint(
+            args.session_id
+        )
+        if checkpoint and checkpoint.get("kind") == "flow":
+            status = await council_manager.resume_session(args.session_id)
+            return [types.TextContent(type="text", text=json.dumps(status, indent=2))]
+        result = await council_orchestrator.resume_session(args.session_id)
+        return [types.TextContent(type="text", text=result)]
+
+    elif name == "submit_job":
+        args = SubmitJobArgs(**arguments)
+        job_arguments = validate_job_arguments(args.kind, args.arguments)
+        job_id = await job_queue.submit(args.kind, job_arguments)
+        return [types.TextContent(type="text", text=json.dumps({"job_id": job_id}))]
+
+    elif name == "get_job_status":
+        args = GetJobArgs(**arguments)
+        status = job_queue.status(args.job_id) or {"error": "Job not found"}
+        return [types.TextContent(type="text", text=json.dumps(status, indent=2))]
+
+    elif name == "get_job_result":
+        args = GetJobArgs(**arguments)
+        job = job_queue.get(args.job_id)
+        if job is None:
+            return [types.TextContent(type="text", text=f"Job not found: {args.job_id}")]
+        if job["status"] == "failed":
+            return [types.TextContent(type="text", text=f"Job failed: {job['error']}")]
+        if job["status"] != "complete":
+            return [
+                types.TextContent(
+                    type="text",
+                    text=f"Job {args.job_id} is {job['status']} ({job['message']})",
+                )
+            ]
+        result = job["result"]
+        text = result if isinstance(result, str) else json.dumps(result, indent=2)
+        return [types.TextContent(type="text", text=text)]
+
+    elif name == "get_server_metrics":
+        report = {
+            **metrics.snapshot(),
+            "pools": all_pool_status(),
+            "process": process_stats(),
+            "event_loop": loop_watchdog.status(),
+            "registry": registry_watcher.status(),
+        }
+        return [types.TextContent(type="text", text=json.dumps(report, indent=2))]
+
+    elif name == "get_model_residency":
+        args = ModelResidencyArgs(**arguments)
+        if args.warm:
+            await model_warmer.warm()
+        result = await model_warmer.residency()
+        return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "start_profile":
+        args = StartProfileArgs(**arguments)
+        result = profiler.start(mode=args.mode, interval_ms=args.interval_ms)
+        return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "stop_profile":
+        args = StopProfileArgs(**arguments)
+        result = profiler.stop(top_n=args.top_n, sort=args.sort)
+        return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "memory_snapshot":
+        args = MemorySnapshotArgs(**arguments)
+        result = profiler.memory_snapshot(top_n=args.top_n, stop=args.stop)
+        return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+
     else:
         raise ValueError(f"Unknown tool: {name}")
 
@@ -862,13 +1078,59 @@ Apply {analysis_type} experiential analysis to the target content."""
         raise ValueError(f"Unknown prompt: {name}")
 
 
+def _reserve_protocol_stdout():
+    """Keep the real stdout for MCP frames and point fd 1 at stderr.
+
+    The print() redirect above does not cover libraries that write to
+    sys.stdout directly; CrewAI's Rich event panels do, and a single stray
+    line breaks the client's JSON-RPC parsing.
+    """
+    sys.stdout.flush()
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    return anyio.wrap_file(protocol)
+
+
 async def main():
     """Run the SEG MCP server."""
     logger.info("Starting SEG MCP Server v1.1.0")
     logger.info("Simulated Experiential Grounding framework ready")
 
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+    # Active endpoint health checks; a no-op unless
+    # {PROVIDER}_POOL_HEALTH_INTERVAL is set.
+    if ai_service.pool:
+        ai_service.pool.start_health_checks(api_key=ai_service.api_key)
+
+    # Workers drain submit_job work and pick up jobs interrupted by a restart.
+    await job_queue.start()
+
+    # Reports synchronous work that stalls the loop serving stdio traffic.
+    loop_watchdog.start()
+
+    # Preload the model in the background so the first tool call does not
+    # pay its load time; a no-op unless SEG_MODEL_WARMUP is set.
+    model_warmer.start()
+
+    # Picks up replicants written by the bridge, another server or
+    # bootstrap.py install without a restart.
+    registry_watcher.start()
+
+    try:
+        async with stdio_server(stdout=_reserve_protocol_stdout()) as (
+            read_stream,
+            write_stream,
+        ):
+            await app.run(
+                read_stream, write_stream, app.create_initialization_options()
+            )
+    finally:
+        registry_watcher.stop()
+        await model_warmer.stop()
+        await loop_watchdog.stop()
+        # Interrupted jobs stay "running" on disk and are re-queued on restart.
+        await job_queue.shutdown()
+        # Registry saves are written behind; make them durable on exit.
+        persona_generator.persistence.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,301 @@
+"""Shared storage for council session state.
+
+``CouncilManager`` keeps running flows in memory, which ties a session to
+the process that started it. Every checkpoint is therefore also written to
+a ``SessionStore`` so that any process sharing the store can answer a
+status request, and a restarted worker can resume the session.
+
+``FileSessionStore`` reuses the per-session JSON checkpoints under
+data/councils/ and is the default for the single-process MCP server.
+``SQLiteSessionStore`` is the one to use when the bridge runs under
+``uvicorn --workers N`` on one host: SQLite in WAL mode gives atomic
+record replacement and concurrent readers without a separate service.
+Other backends (e.g. Redis behind a load balancer) only need the three
+abstract methods.
+"""
+
+import base64
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .persistence import SEGPersistenceManager
+
+logger = logging.getLogger(__name__)
+
+# Identifies the process that is executing a session, so a sibling worker
+# does not resume (and duplicate) a flow that is still running elsewhere.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def owner_is_alive(owner: Optional[str]) -> bool:
+    """True if ``owner`` names a live process on this host."""
+    if not owner or ":" not in owner:
+        return False
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def normalize_time(value: Optional[str]) -> Optional[str]:
+    """ISO timestamp in UTC so it compares as a string with created_at."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+def encode_cursor(record: Dict[str, Any]) -> str:
+    key = f"{record.get('created_at', '')}|{record['id']}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, session_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return created_at, session_id
+
+
+def _premise(record: Dict[str, Any]) -> str:
+    # Orchestrator records keep the premise at top level, flows in state.
+    return record.get("premise") or record.get("state", {}).get("premise", "")
+
+
+class SessionStore(ABC):
+    """Keyed store of session records (``{"id", "kind", "status", ...}``)."""
+
+    @abstractmethod
+    def save(self, record: Dict[str, Any]) -> None:
+        """Insert or replace the record with ``record["id"]``."""
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """The stored record, or None if the session is unknown."""
+
+    @abstractmethod
+    def list_ids(self) -> List[str]:
+        """IDs of every stored session."""
+
+    def load_many(self, session_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Records for the given IDs; unknown IDs are absent from the result."""
+        records = {}
+        for session_id in session_ids:
+            record = self.load(session_id)
+            if record is not None:
+                records[session_id] = record
+        return records
+
+    def query(
+        self,
+        kind: Optional[str] = None,
+        status: Optional[str] = None,
+        premise: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Newest-first page of matching records plus the next page's cursor.
+
+        ``premise`` is a case-insensitive substring; ``since``/``until``
+        bound ``created_at``. This default scans every record and suits the
+        small file store; database-backed stores should filter natively.
+        """
+        since, until = normalize_time(since), normalize_time(until)
+        after = decode_cursor(cursor) if cursor else None
+        needle = premise.lower() if premise else None
+        matches = []
+        for record in self.load_many(self.list_ids()).values():
+            created_at = record.get("created_at", "")
+            if kind and record.get("kind") != kind:
+                continue
+            if status and record.get("status") != status:
+                continue
+            if needle and needle not in _premise(record).lower():
+                continue
+            if (since and created_at < since) or (until and created_at > until):
+                continue
+            if after and (created_at, record["id"]) >= after:
+                continue
+            matches.append(record)
+        matches.sort(key=lambda r: (r.get("created_at", ""), r["id"]), reverse=True)
+        page = matches[:limit]
+        next_cursor = encode_cursor(page[-1]) if len(matches) > limit else None
+        return page, next_cursor
+
+
+class FileSessionStore(SessionStore):
+    """Session records as data/councils/{id}.json via the persistence layer."""
+
+    def __init__(self, persistence: SEGPersistenceManager):
+        self.persistence = persistence
+
+    def save(self, record: Dict[str, Any]) -> None:
+        self.persistence.save_council_checkpoint(record)
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self.persistence.load_council_checkpoint(session_id)
+
+    def list_ids(self) -> List[str]:
+        return self.persistence.list_council_checkpoints()
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session records in one SQLite table, safe across worker processes."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per thread; sqlite3 connections are not shareable.
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT,
+                    status TEXT,
+                    premise TEXT NOT NULL DEFAULT '',
+                    created_at TEXT NOT NULL DEFAULT '',
+                    updated_at TEXT NOT NULL,
+                    data TEXT NOT NULL
+                )
+                """)
+            # Databases created before listing support lack these columns.
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            for column in ("premise", "created_at"):
+                if column not in columns:
+                    conn.execute(
+                        f"ALTER TABLE sessions ADD COLUMN {column}"
+                        " TEXT NOT NULL DEFAULT ''"
+                    )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS sessions_created"
+                " ON sessions (created_at, id)"
+            )
+
+    def save(self, record: Dict[str, Any]) -> None:
+        if not record.get("id"):
+            logger.error("Session record missing id")
+            return
+        record["updated_at"] = datetime.now(timezone.utc).isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions"
+                " (id, kind, status, premise, created_at, updated_at, data)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record["id"],
+                    record.get("kind"),
+                    record.get("status"),
+                    _premise(record),
+                    record.get("created_at", ""),
+                    record["updated_at"],
+                    json.dumps(record),
+                ),
+            )
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = (
+            self._connect()
+            .execute("SELECT data FROM sessions WHERE id = ?", (session_id,))
+            .fetchone()
+        )
+        return json.loads(row[0]) if row else None
+
+    def list_ids(self) -> List[str]:
+        rows = self._connect().execute("SELECT id FROM sessions ORDER BY id")
+        return [row[0] for row in rows]
+
+    def load_many(self, session_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        session_ids = list(session_ids)
+        if not session_ids:
+            return {}
+        placeholders = ",".join("?" * len(session_ids))
+        rows = self._connect().execute(
+            f"SELECT id, data FROM sessions WHERE id IN ({placeholders})", session_ids
+        )
+        return {row[0]: json.loads(row[1]) for row in rows}
+
+    def query(
+        self,
+        kind: Optional[str] = None,
+        status: Optional[str] = None,
+        premise: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        clauses, params = [], []
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if premise:
+            clauses.append("instr(lower(premise), lower(?)) > 0")
+            params.append(premise)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(normalize_time(since))
+        if until:
+            clauses.append("created_at <= ?")
+            params.append(normalize_time(until))
+        if cursor:
+            created_at, session_id = decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params.extend([created_at, created_at, session_id])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            f"SELECT data FROM sessions {where}"
+            " ORDER BY created_at DESC, id DESC LIMIT ?",
+            [*params, limit + 1],
+        )
+        records = [json.loads(row[0]) for row in rows]
+        page = records[:limit]
+        next_cursor = encode_cursor(page[-1]) if len(records) > limit else None
+        return page, next_cursor
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            # WAL lets status reads proceed while another worker checkpoints.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+def create_session_store(persistence: SEGPersistenceManager) -> SessionStore:
+    """Build the store selected by ``SEG_SESSION_STORE`` (sqlite or file)."""
+    backend = os.getenv("SEG_SESSION_STORE", "sqlite").lower()
+    if backend == "file":
+        return FileSessionStore(persistence)
+    if backend != "sqlite":
+        raise ValueError(f"Unknown SEG_SESSION_STORE: {backend}")
+    path = os.getenv("SEG_SESSION_DB") or str(
+        persistence.data_dir / "council_sessions.db"
+    )
+    return SQLiteSessionStore(path)
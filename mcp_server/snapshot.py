@@ -0,0 +1,307 @@
+"""Compact, memory-mapped snapshots of the JSON registry files.
+
+``data/custom_replicants.json`` and ``data/generated_personas.json`` are
+pretty-printed JSON objects that every process parses in full at startup.
+A snapshot stores the same records as length-prefixed blobs followed by an
+offset index, so a process can mmap the file, read only the index (names
+and offsets), and decode a record the first time it is accessed.
+
+Layout (little-endian)::
+
+    header   magic "SEGSNAP1" | codec (b"m" msgpack / b"j" json) | 3 pad
+             | count u32 | index_offset u64 | source_size u64
+             | source_mtime_ns i64
+    records  (length u32 | payload) * count
+    index    length u32 | encoded [[name, offset, length], ...]
+
+The header records the size and mtime of the JSON file it was built from;
+a snapshot whose source has since changed is stale and is rebuilt. JSON
+stays the source of truth and the interchange/export format. msgpack is
+used when installed, otherwise the payloads are compact JSON.
+"""
+
+import copy
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Tuple,
+)
+
+try:
+    import msgpack
+except ImportError:  # optional; fall back to compact JSON payloads
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"SEGSNAP1"
+_HEADER = struct.Struct("<8sc3xIQQq")
+_LENGTH = struct.Struct("<I")
+
+
+def _encode(codec: bytes, value: Any) -> bytes:
+    if codec == b"m":
+        return msgpack.packb(value, use_bin_type=True)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _decode(codec: bytes, payload: bytes) -> Any:
+    if codec == b"m":
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload)
+
+
+def snapshot_path(source: Path) -> Path:
+    """Where the snapshot of ``source`` lives (``foo.json`` -> ``foo.snap``)."""
+    return source.with_suffix(".snap")
+
+
+def write_snapshot(
+    path: Path, records: Mapping[str, Any], source_stat: os.stat_result
+) -> None:
+    """Write ``records`` atomically, tagged with the source file's stat.
+
+    Stat the source *before* reading it, so a write that lands in between
+    leaves the snapshot stale rather than wrongly fresh.
+    """
+    codec = b"m" if msgpack is not None else b"j"
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"\0" * _HEADER.size)
+            index = []
+            offset = _HEADER.size
+            for name, record in records.items():
+                payload = _encode(codec, record)
+                f.write(_LENGTH.pack(len(payload)))
+                f.write(payload)
+                index.append([name, offset + _LENGTH.size, len(payload)])
+                offset += _LENGTH.size + len(payload)
+            encoded_index = _encode(codec, index)
+            f.write(_LENGTH.pack(len(encoded_index)))
+            f.write(encoded_index)
+            f.seek(0)
+            f.write(
+                _HEADER.pack(
+                    _MAGIC,
+                    codec,
+                    len(index),
+                    offset,
+                    source_stat.st_size,
+                    source_stat.st_mtime_ns,
+                )
+            )
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class SnapshotReader(Mapping):
+    """Read-only mapping over a snapshot; records decode on first access.
+
+    Decoded records are kept in an LRU of ``cache_size`` entries (unbounded
+    if None), so memory follows the working set rather than the file.
+    Lookups return a copy, so a caller editing a record cannot alter the
+    cache.
+    """
+
+    def __init__(self, path: Path, cache_size: Optional[int] = None):
+        self.path = path
+        self.cache_size = cache_size
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, codec, count, index_offset, size, mtime_ns = _HEADER.unpack_from(
+            self._mm, 0
+        )
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a registry snapshot")
+        if codec == b"m" and msgpack is None:
+            self.close()
+            raise ValueError(f"{path} needs msgpack, which is not installed")
+        self.codec = codec
+        self.source_size = size
+        self.source_mtime_ns = mtime_ns
+        (length,) = _LENGTH.unpack_from(self._mm, index_offset)
+        start = index_offset + _LENGTH.size
+        index = _decode(codec, self._mm[start : start + length])
+        self._index: Dict[str, Tuple[int, int]] = {
+            name: (offset, size) for name, offset, size in index
+        }
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_fresh(self, source: Path) -> bool:
+        """True if ``source`` is unchanged since this snapshot was written."""
+        try:
+            stat = source.stat()
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == (
+            self.source_size,
+            self.source_mtime_ns,
+        )
+
+    def __getitem__(self, name: str) -> Any:
+        with self._lock:
+            record = self._cache.get(name)
+            if record is not None:
+                self._cache.move_to_end(name)
+        if record is None:
+            offset, length = self._index[name]
+            record = _decode(self.codec, self._mm[offset : offset + length])
+            with self._lock:
+                self._cache[name] = record
+                if self.cache_size is not None:
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        return copy.deepcopy(record)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+class LazyRecords(MutableMapping):
+    """Dict-like view over a snapshot with in-memory writes layered on top.
+
+    Registry code mutates its record dicts (add/delete replicant); those
+    changes live in the overlay while untouched records stay undecoded in
+    the snapshot. Once they are written, ``rebase`` moves them back out of
+    the overlay, so the overlay holds only changes not yet on disk.
+    """
+
+    def __init__(self, base: Mapping[str, Any]):
+        self._base = base
+        self._overlay: Dict[str, Any] = {}
+        self._deleted: set = set()
+        # Serializes writers with rebase(); readers never block.
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._overlay:
+            return self._overlay[name]
+        if name in self._deleted:
+            raise KeyError(name)
+        return self._base[name]
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        with self._lock:
+            self._overlay[name] = value
+            self._deleted.discard(name)
+
+    def __delitem__(self, name: str) -> None:
+        with self._lock:
+            if name not in self:
+                raise KeyError(name)
+            self._overlay.pop(name, None)
+            if name in self._base:
+                self._deleted.add(name)
+
+    def __contains__(self, name: object) -> bool:
+        if name in self._overlay:
+            return True
+        return name not in self._deleted and name in self._base
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self._base:
+            if name not in self._deleted and name not in self._overlay:
+                yield name
+        yield from self._overlay
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def rebase(self, base: Mapping[str, Any], written: Mapping[str, Any]) -> None:
+        """Switch to ``base``, a newer snapshot that includes ``written``.
+
+        Overlay entries that are exactly the records written are dropped;
+        from then on they decode from ``base`` into its bounded cache. An
+        entry changed again since the write stays in the overlay.
+        """
+        with self._lock:
+            # New containers, assigned base first: a concurrent reader sees
+            # every record in either the old or the new layout.
+            overlay = {
+                name: record
+                for name, record in self._overlay.items()
+                if written.get(name) is not record
+            }
+            deleted = {name for name in self._deleted if name in base}
+            self._base = base
+            self._overlay = overlay
+            self._deleted = deleted
+
+    def fork(self) -> "LazyRecords":
+        """An independent copy sharing the snapshot; nothing is decoded."""
+        forked = LazyRecords(self._base)
+        forked._overlay = dict(self._overlay)
+        forked._deleted = set(self._deleted)
+        return forked
+
+
+def open_snapshot(
+    source: Path,
+    load_source: Optional[Callable[[], Mapping[str, Any]]] = None,
+    cache_size: Optional[int] = None,
+) -> Optional[SnapshotReader]:
+    """Open a fresh snapshot of ``source``, rebuilding it if stale or missing.
+
+    ``load_source`` returns the parsed JSON when a rebuild is needed and
+    raises if it cannot be parsed. Returns None if ``source`` does not
+    exist or no snapshot can be made; an unreadable source is never
+    snapshotted, so it cannot pass for an empty one on later starts.
+    """
+    try:
+        source_stat = source.stat()
+    except OSError:
+        return None
+    path = snapshot_path(source)
+    if path.exists():
+        try:
+            reader = SnapshotReader(path, cache_size)
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning("Ignoring unreadable snapshot %s: %s", path, e)
+        else:
+            if reader.is_fresh(source):
+                return reader
+            reader.close()
+    try:
+        records = load_source() if load_source else json.loads(source.read_bytes())
+    except (OSError, ValueError) as e:
+        logger.error("Not snapshotting unreadable %s: %s", source, e)
+        return None
+    try:
+        write_snapshot(path, records, source_stat)
+        return SnapshotReader(path, cache_size)
+    except (OSError, ValueError) as e:
+        logger.error("Error writing snapshot %s: %s", path, e)
+        return None
@@ -0,0 +1,178 @@
+"""Stub LLM server for load tests and local development.
+
+Speaks enough of the Ollama API (``/api/chat``, ``/api/tags``, ``/api/ps``)
+and of the OpenAI-compatible API (``/v1/chat/completions``, ``/v1/models``)
+for AIService, and answers after a configurable delay. This lets load and
+soak runs measure the SEG server itself instead of a GPU.
+
+Latency is ``base + per_token * tokens (+/- jitter)``, with the token
+count estimated from the response length; ``error_rate`` injects 500s.
+
+    python -m mcp_server.stub_llm --port 11500 --latency 0.2 --per-token 0.002
+"""
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_REPLY = (
+    "From where I stand, the premise turns on what we are willing to count as "
+    "evidence. Let me ground that in something I have felt rather than argued. "
+)
+
+
+class StubLLMServer:
+    """Threaded HTTP server returning canned completions after a delay."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.05,
+        per_token: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        reply_tokens: int = 120,
+    ):
+        self.latency = latency
+        self.per_token = per_token
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.reply = (_REPLY * (reply_tokens // 30 + 1))[: reply_tokens * 4]
+        self.requests = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve from a daemon thread; returns the base URL."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="stub-llm", daemon=True
+        )
+        self._thread.start()
+        return self.url
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def delay(self) -> float:
+        seconds = self.latency + self.per_token * (len(self.reply) / 4)
+        if self.jitter:
+            seconds += random.uniform(-self.jitter, self.jitter)
+        return max(0.0, seconds)
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):  # keep stdout/stderr quiet
+                logger.debug(format, *args)
+
+            def _send(self, status: int, body: Dict[str, Any]) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if self.path in ("/api/tags", "/api/ps"):
+                    model = {"name": "stub", "model": "stub", "size": 0}
+                    self._send(200, {"models": [model]})
+                elif self.path.endswith("/models"):
+                    self._send(200, {"data": [{"id": "stub", "object": "model"}]})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests += 1
+                if self.path not in ("/api/chat", "/v1/chat/completions"):
+                    self._send(404, {"error": "not found"})
+                    return
+                if self.path == "/api/chat" and not body.get("messages"):
+                    # Ollama's load-only request (model warm-up).
+                    self._send(
+                        200,
+                        {
+                            "model": body.get("model"),
+                            "done": True,
+                            "done_reason": "load",
+                            "load_duration": 0,
+                        },
+                    )
+                    return
+                time.sleep(stub.delay())
+                if stub.error_rate and random.random() < stub.error_rate:
+                    self._send(500, {"error": "injected failure"})
+                    return
+                message = {"role": "assistant", "content": stub.reply}
+                if self.path == "/api/chat":
+                    self._send(
+                        200,
+                        {
+                            "model": body.get("model", "stub"),
+                            "message": message,
+                            "done": True,
+                            "eval_count": len(stub.reply) // 4,
+                        },
+                    )
+                else:
+                    self._send(
+                        200,
+                        {
+                            "model": body.get("model", "stub"),
+                            "choices": [{"index": 0, "message": message}],
+                        },
+                    )
+
+        return Handler
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Stub Ollama/OpenAI LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=0.05, help="base seconds")
+    parser.add_argument("--per-token", type=float, default=0.0, help="seconds/token")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--reply-tokens", type=int, default=120)
+    args = parser.parse_args(argv)
+
+    server = StubLLMServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        per_token=args.per_token,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        reply_tokens=args.reply_tokens,
+    )
+    print(f"Stub LLM listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -378,6 +378,26 @@ This template implements the full 6-component SEG architecture for creating soph
             "the persona is making — make them, do not announce them."
         ),
     },
+    "lens_map_reduce": {
+        # Long sources are read in parts (see analyze_through_lens). The
+        # part readings are working notes, not the response; only the
+        # reduce step speaks to the reader, still in the persona's voice,
+        # so the result reads as one engagement with the whole document.
+        "chunk": (
+            "This is one part of a longer source text; the other parts "
+            "are being read separately. Read this part as the persona. "
+            "Note, in the persona's voice and briefly, what it holds for "
+            "them: what they notice, what catches, what they would carry "
+            "forward to the rest. These are notes toward a response, not "
+            "the response itself. Do not summarize the part neutrally."
+        ),
+        "combine": (
+            "Below are the persona's notes on consecutive parts of a "
+            "longer source text. Fold them into one set of notes in the "
+            "persona's voice: keep what the persona would carry forward, "
+            "drop repetition, keep the order of the source."
+        ),
+    },
 }
 
 # Specialized Templates for Historical Personas
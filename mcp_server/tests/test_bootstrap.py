@@ -0,0 +1,69 @@
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+_BOOTSTRAP = Path(__file__).resolve().parents[2] / "seg_molecular_self" / "bootstrap.py"
+
+
+@pytest.fixture
+def bootstrap(tmp_path, monkeypatch):
+    spec = importlib.util.spec_from_file_location("seg_bootstrap", _BOOTSTRAP)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(
+        module, "_LIVE_REGISTRY", tmp_path / "data" / "custom_replicants.json"
+    )
+    monkeypatch.setattr(module, "_BOOTSTRAP_FILE", tmp_path / "bundle.json")
+    monkeypatch.setattr(module, "_MANIFEST_FILE", tmp_path / "bundle.manifest.json")
+    return module
+
+
+def _replicant(name, directive="Observe."):
+    return {
+        "archetype_name": name,
+        "core_function": "testing",
+        "directive": directive,
+        "version": "1.2",
+        "molecular_self": {},
+    }
+
+
+def test_install_writes_only_the_delta(bootstrap, capsys):
+    bootstrap._write_json(
+        bootstrap._BOOTSTRAP_FILE,
+        {"A": _replicant("A"), "B": _replicant("B"), "C": _replicant("C", "New.")},
+    )
+    bootstrap._LIVE_REGISTRY.parent.mkdir()
+    bootstrap._LIVE_REGISTRY.write_text(
+        json.dumps({"A": _replicant("A"), "C": _replicant("C"), "Z": _replicant("Z")})
+    )
+
+    assert bootstrap.main(["install", "--dry-run"]) == 0
+    report = capsys.readouterr().out
+    assert "Added (1): B" in report
+    assert "Changed — skipped (1): C" in report
+    assert "Unchanged (1): A" in report
+    assert "B" not in json.loads(bootstrap._LIVE_REGISTRY.read_text())
+
+    assert bootstrap.main(["install", "--force"]) == 0
+    live = json.loads(bootstrap._LIVE_REGISTRY.read_text())
+    assert set(live) == {"A", "B", "C", "Z"}
+    assert live["C"]["directive"] == "New."
+
+    mtime = bootstrap._LIVE_REGISTRY.stat().st_mtime_ns
+    assert bootstrap.main(["install", "--force"]) == 0
+    assert "nothing written" in capsys.readouterr().out
+    assert bootstrap._LIVE_REGISTRY.stat().st_mtime_ns == mtime
+
+
+def test_install_rejects_bundle_that_differs_from_manifest(bootstrap):
+    bundle = {"A": _replicant("A")}
+    bootstrap._write_json(bootstrap._BOOTSTRAP_FILE, bundle)
+    bootstrap._write_json(bootstrap._MANIFEST_FILE, bootstrap._manifest(bundle))
+    assert bootstrap.main(["install", "--dry-run"]) == 0
+
+    bundle["A"]["directive"] = "Edited by hand."
+    bootstrap._write_json(bootstrap._BOOTSTRAP_FILE, bundle)
+    assert bootstrap.main(["install"]) == 2
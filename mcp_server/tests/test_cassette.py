@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from mcp_server.ai_service import AIService
+from mcp_server.stub_llm import StubLLMServer
+
+MESSAGES = [{"role": "user", "content": "What is grounding?"}]
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay_offline(tmp_path, monkeypatch):
+    cassette_path = tmp_path / "ai.jsonl"
+    monkeypatch.setenv("AI_PROVIDER", "ollama")
+    monkeypatch.setenv("AI_CASSETTE_PATH", str(cassette_path))
+    monkeypatch.setenv("AI_CASSETTE_MODE", "record")
+    stub = StubLLMServer(latency=0.2)
+    monkeypatch.setenv("OLLAMA_BASE_URL", stub.start())
+    try:
+        recorded = await AIService().generate_response(MESSAGES, profile="surface")
+    finally:
+        stub.stop()
+    assert not recorded.error and recorded.usage["completion_tokens"] > 0
+    assert len(cassette_path.read_text().splitlines()) == 1
+
+    # Replay needs no model; with a latency scale it sleeps a share of the
+    # recorded latency.
+    monkeypatch.setenv("AI_CASSETTE_MODE", "replay")
+    monkeypatch.setenv("AI_CASSETTE_LATENCY_SCALE", "0.5")
+    service = AIService()
+    started = time.monotonic()
+    replayed = await service.generate_response(MESSAGES, profile="surface")
+    elapsed = time.monotonic() - started
+
+    assert replayed.content == recorded.content
+    assert replayed.latency == pytest.approx(recorded.latency)
+    assert replayed.usage == recorded.usage
+    assert recorded.latency * 0.5 <= elapsed < recorded.latency
+
+    # The profile's limits are part of the key; an unrecorded request fails
+    # instead of reaching a model.
+    missed = await service.generate_response(MESSAGES, profile="deep")
+    assert missed.error.startswith("No cassette recording")
+
+    # So are the provider and model: another backend never gets this answer.
+    monkeypatch.setenv("OLLAMA_MODEL", "another-model")
+    other = await AIService().generate_response(MESSAGES, profile="surface")
+    assert other.error.startswith("No cassette recording")
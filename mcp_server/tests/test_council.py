@@ -1,6 +1,8 @@
 import pytest
 import asyncio
-from mcp_server.council import SEGCouncilFlow, CouncilState
+from mcp_server.council import SEGCouncilFlow, CouncilState, CouncilManager
+from mcp_server.persistence import SEGPersistenceManager
+from mcp_server.session_store import FileSessionStore, SQLiteSessionStore
 
 @pytest.mark.asyncio
 async def test_council_flow_initialization():
@@ -27,3 +29,99 @@ def test_council_state_schema():
     assert state.premise == "Hello"
     assert state.agent_ids == ["A", "B"]
     assert state.responses == []
+
+def test_resumed_flow_skips_completed_steps():
+    checkpoints = []
+    flow = SEGCouncilFlow(checkpoint=lambda state: checkpoints.append(state.current_step))
+    flow.state.completed_steps = ["seeding", "grounding", "divergence", "friction"]
+    flow.seeding()
+    flow.grounding()
+    flow.divergence()
+    flow.friction()
+    flow.synthesis_step()
+    assert checkpoints == ["synthesis"]
+    assert flow.state.is_complete
+
+def test_status_is_served_from_shared_store(tmp_path):
+    db = str(tmp_path / "sessions.db")
+    worker_a = CouncilManager(store=SQLiteSessionStore(db))
+    worker_b = CouncilManager(store=SQLiteSessionStore(db))
+
+    flow = worker_a._build_flow()
+    flow.state.session_id = "session_shared"
+    flow.state.premise = "Shared premise"
+    flow.state.completed_steps = ["seeding"]
+    worker_a._checkpoint(flow.state)
+
+    status = worker_b.get_status("session_shared")
+    assert status["premise"] == "Shared premise"
+    assert status["is_complete"] is False
+    assert "error" in worker_b.get_status("session_missing")
+
+@pytest.mark.parametrize("backend", ["sqlite", "file"])
+def test_session_listing_filters_and_paginates(tmp_path, backend):
+    if backend == "sqlite":
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    else:
+        store = FileSessionStore(SEGPersistenceManager(data_dir=str(tmp_path)))
+    manager = CouncilManager(store=store)
+    for i in range(5):
+        state = CouncilState(
+            session_id=f"session_{i}",
+            premise=f"Premise {i} about {'minds' if i % 2 else 'matter'}",
+            created_at=f"2026-01-0{i + 1}T00:00:00+00:00",
+            is_complete=i < 2,
+        )
+        manager._checkpoint(state)
+
+    page = manager.list_sessions(limit=2)
+    assert [s["session_id"] for s in page["sessions"]] == ["session_4", "session_3"]
+    rest = manager.list_sessions(limit=10, cursor=page["next_cursor"])
+    assert [s["session_id"] for s in rest["sessions"]] == [
+        "session_2", "session_1", "session_0"
+    ]
+    assert rest["next_cursor"] is None
+
+    minds = manager.list_sessions(premise="MINDS", status="running")
+    assert [s["session_id"] for s in minds["sessions"]] == ["session_3"]
+    window = manager.list_sessions(since="2026-01-02", until="2026-01-03T12:00:00")
+    assert len(window["sessions"]) == 2
+
+    bulk = manager.get_statuses(["session_1", "session_9"])
+    assert [s["session_id"] for s in bulk["sessions"]] == ["session_1"]
+    assert bulk["missing"] == ["session_9"]
+
+def test_agents_are_pooled_across_flows_and_invalidated(tmp_path):
+    from mcp_server.council import agent_pool
+    from mcp_server.registry import ReplicantRegistry
+
+    registry = ReplicantRegistry(SEGPersistenceManager(data_dir=str(tmp_path)))
+    manager = CouncilManager(
+        store=SQLiteSessionStore(str(tmp_path / "s.db")), registry=registry
+    )
+    custom = {
+        "archetype_name": "Pool Tester",
+        "directive": "Test pooling",
+        "anchor_identity": "A tester",
+        "emotional_core": "Calm",
+        "philosophy": "Reuse",
+    }
+    registry.add_custom_replicant(custom)
+
+    first = manager._build_flow()
+    first.state.agent_ids = ["Bayesian Sage", "Pool Tester", "Nobody"]
+    first.seeding()
+    assert set(first.agents) == {"Bayesian Sage", "Pool Tester"}
+    assert first.agents["Pool Tester"].verbose is False
+
+    second = manager._build_flow()
+    assert second._get_agent("Pool Tester") is first.agents["Pool Tester"]
+    with pytest.raises(ValueError):
+        second._get_agent("Nobody")
+
+    registry.add_custom_replicant({**custom, "directive": "Test invalidation"})
+    third = manager._build_flow()
+    rebuilt = third._get_agent("Pool Tester")
+    assert rebuilt is not first.agents["Pool Tester"]
+    assert rebuilt.goal == "Test invalidation"
+    assert third._get_agent("Bayesian Sage") is first.agents["Bayesian Sage"]
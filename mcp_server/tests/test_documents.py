@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from mcp_server.ai_service import AIResponse, AIService
+from mcp_server.documents import (
+    configured_document_roots,
+    read_document,
+    resolve_source,
+    split_document,
+)
+from mcp_server.seg_core import SEGPersonaGenerator
+
+
+def test_split_follows_structure_and_reads_by_uri(tmp_path, monkeypatch):
+    sections = [
+        f"# Section {i}\n\n" + "\n\n".join(f"Paragraph {i}.{j} " * 20 for j in range(3))
+        for i in range(4)
+    ]
+    text = "\n\n".join(sections)
+    chunks = split_document(text, max_tokens=200)
+
+    assert all(len(chunk) // 4 <= 200 for chunk in chunks)
+    assert chunks[0].startswith("# Section 0")
+    assert sum(chunk.startswith("# Section") for chunk in chunks) == 4
+    assert split_document("word " * 1000, max_tokens=100)
+    assert split_document("   ", max_tokens=100) == []
+
+    path = tmp_path / "doc.md"
+    path.write_text(text, encoding="utf-8")
+    monkeypatch.setenv("SEG_DOCUMENT_ROOTS", str(tmp_path))
+    assert read_document(path.as_uri()) == text
+    assert resolve_source(str(path)) == path.resolve()
+    monkeypatch.setenv("SEG_DOCUMENT_ROOTS", str(tmp_path / "elsewhere"))
+    with pytest.raises(ValueError):
+        read_document(str(path))
+    with pytest.raises(ValueError):
+        resolve_source("https://example.com/doc.md")
+
+
+def test_sources_outside_the_roots_are_refused(tmp_path, monkeypatch):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("private")
+    root = tmp_path / "docs"
+    root.mkdir()
+    (root / "link.txt").symlink_to(secret)
+
+    # Unset roots fall back to data/documents/, not the whole filesystem.
+    monkeypatch.delenv("SEG_DOCUMENT_ROOTS", raising=False)
+    assert configured_document_roots() == []
+    with pytest.raises(ValueError):
+        read_document(str(secret))
+
+    monkeypatch.setenv("SEG_DOCUMENT_ROOTS", str(root))
+    for source in (root / "link.txt", root / ".." / "secret.txt"):
+        with pytest.raises(ValueError):
+            read_document(str(source))
+
+
+class PartsAIService(AIService):
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+        self.profiles = []
+
+    async def generate_response(self, messages, system_prompt=None, **kwargs):
+        self.profiles.append(kwargs.get("profile"))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        content = messages[0]["content"]
+        if content.startswith("Your notes"):
+            return AIResponse(content=f"WHOLE:{content.count('[Part')}")
+        return AIResponse(content="note")
+
+
+@pytest.mark.asyncio
+async def test_long_source_is_analyzed_map_reduce(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEG_LENS_CHUNK_TOKENS", "100")
+    monkeypatch.setenv("SEG_LENS_CONCURRENCY", "2")
+    monkeypatch.setenv("SEG_DOCUMENT_ROOTS", str(tmp_path))
+    ai = PartsAIService()
+    generator = SEGPersonaGenerator(ai_service=ai, data_dir=str(tmp_path))
+    path = tmp_path / "long.txt"
+    path.write_text("\n\n".join("A sentence of the source. " * 10 for _ in range(6)))
+
+    updates = []
+    result = await generator.analyze_through_lens(
+        None,
+        "Bayesian Sage",
+        source=str(path),
+        progress=lambda fraction, message: updates.append(fraction),
+    )
+
+    assert result == "WHOLE:6"
+    assert ai.peak == 2
+    assert ai.profiles == ["lens.chunk"] * 6 + ["moderate"]
+    assert updates == sorted(updates) and len(updates) == 7
+
+    missing = await generator.analyze_through_lens(
+        None, "Bayesian Sage", source=str(tmp_path / "missing.txt")
+    )
+    assert missing.startswith("Could not read source document")
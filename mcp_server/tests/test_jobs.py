@@ -0,0 +1,216 @@
+import asyncio
+
+import pytest
+
+from pydantic import ValidationError
+
+from mcp_server.jobs import JobQueue, register_seg_jobs
+from mcp_server.persistence import SEGPersistenceManager
+from mcp_server.seg_core import LensAnalysisError
+from mcp_server.tool_args import validate_job_arguments
+
+
+async def _wait_for(queue, job_id, status="complete"):
+    for _ in range(100):
+        if queue.status(job_id)["status"] == status:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{job_id} never reached {status}")
+
+
+@pytest.mark.asyncio
+async def test_submitted_job_runs_in_background(tmp_path):
+    queue = JobQueue(SEGPersistenceManager(data_dir=str(tmp_path)), owner="test")
+
+    async def echo(arguments, progress):
+        progress(0.5, "Halfway")
+        return {"echo": arguments["text"]}
+
+    queue.register("echo", echo)
+    job_id = await queue.submit("echo", {"text": "hello"})
+    await _wait_for(queue, job_id)
+
+    status = queue.status(job_id)
+    assert status["progress"] == 1.0
+    assert "result" not in status
+    assert queue.get(job_id)["result"] == {"echo": "hello"}
+
+    with pytest.raises(ValueError):
+        await queue.submit("missing", {})
+    await queue.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_unfinished_jobs_are_requeued_on_start(tmp_path):
+    persistence = SEGPersistenceManager(data_dir=str(tmp_path))
+    persistence.save_job(
+        {
+            "id": "job_interrupted",
+            "kind": "echo",
+            "arguments": {"text": "again"},
+            "owner": "test",
+            "status": "running",
+            "progress": 0.2,
+            "message": "Running",
+        }
+    )
+    persistence.save_job(
+        {
+            "id": "job_other",
+            "kind": "echo",
+            "arguments": {"text": "no"},
+            "owner": "elsewhere",
+            "status": "queued",
+            "progress": 0.0,
+            "message": "Queued",
+        }
+    )
+
+    queue = JobQueue(persistence, owner="test")
+
+    async def echo(arguments, progress):
+        return arguments["text"]
+
+    queue.register("echo", echo)
+    await queue.start()
+    await _wait_for(queue, "job_interrupted")
+
+    assert queue.get("job_interrupted")["result"] == "again"
+    assert queue.get("job_other")["status"] == "queued"
+    await queue.shutdown()
+
+
+def test_job_arguments_are_validated_against_the_tool_schema():
+    arguments = validate_job_arguments(
+        "analyze_through_seg_lens",
+        {"text": "A premise", "persona_or_replicant": "Bayesian Sage"},
+    )
+    assert arguments["depth"] == "moderate"
+
+    with pytest.raises(ValidationError):
+        validate_job_arguments(
+            "analyze_through_seg_lens", {"persona_or_replicant": "Bayesian Sage"}
+        )
+    with pytest.raises(ValidationError):
+        validate_job_arguments("run_council_session", {"premise": "p"})
+    for cycles in (0, 6, 1000):
+        with pytest.raises(ValidationError):
+            validate_job_arguments(
+                "run_council_session",
+                {"premise": "p", "replicants": ["A", "B"], "cycles": cycles},
+            )
+    with pytest.raises(ValueError, match="Job kind"):
+        validate_job_arguments("delete_custom_replicant", {})
+
+
+@pytest.mark.asyncio
+async def test_orphaned_job_is_claimed_by_one_of_two_queues(tmp_path):
+    SEGPersistenceManager(data_dir=str(tmp_path)).save_job(
+        {
+            "id": "job_orphan",
+            "kind": "echo",
+            "arguments": {"text": "once"},
+            "owner": "test",
+            "worker": "gone-host:1",
+            "status": "running",
+            "progress": 0.2,
+            "message": "Running",
+        }
+    )
+    runs = []
+
+    async def echo(arguments, progress):
+        runs.append(arguments["text"])
+        return arguments["text"]
+
+    queues = [
+        JobQueue(SEGPersistenceManager(data_dir=str(tmp_path)), owner="test")
+        for _ in range(2)
+    ]
+    for queue in queues:
+        queue.register("echo", echo)
+    await asyncio.gather(*(queue.start() for queue in queues))
+    await _wait_for(queues[0], "job_orphan")
+    await asyncio.sleep(0.05)  # give a duplicate claim time to run
+
+    assert runs == ["once"]
+    for queue in queues:
+        await queue.shutdown()
+
+
+class RecordingOrchestrator:
+    def __init__(self):
+        self.calls = []
+        self.active_sessions = {}
+
+    async def run_session(self, on_start=None, **arguments):
+        self.calls.append(("run", arguments["premise"]))
+        if arguments["premise"] == "unknown":
+            return "Unknown replicant: C"
+        session_id = f"council_{len(self.calls)}"
+        self.active_sessions[session_id] = {"status": "running"}
+        on_start(session_id)
+        if arguments["premise"] == "fail":
+            self.active_sessions[session_id]["status"] = "failed"
+            return "Error during council session: backend timed out"
+        self.active_sessions[session_id]["status"] = "complete"
+        return "Council transcript"
+
+    async def resume_session(self, session_id):
+        self.calls.append(("resume", session_id))
+        self.active_sessions[session_id] = {"status": "complete"}
+        return "Council transcript"
+
+
+@pytest.mark.asyncio
+async def test_rerun_council_job_resumes_its_session(tmp_path):
+    persistence = SEGPersistenceManager(data_dir=str(tmp_path))
+    persistence.save_job(
+        {
+            "id": "job_council",
+            "kind": "run_council_session",
+            "arguments": {"premise": "p", "replicants": ["A", "B"]},
+            "owner": "test",
+            "worker": "gone-host:1",
+            "status": "running",
+            "progress": 0.05,
+            "message": "Council session generating",
+            "state": {"session_id": "council_old"},
+        }
+    )
+    orchestrator = RecordingOrchestrator()
+    queue = JobQueue(persistence, owner="test")
+    register_seg_jobs(queue, None, orchestrator)
+
+    await queue.start()
+    await _wait_for(queue, "job_council")
+    job_id = await queue.submit(
+        "run_council_session", {"premise": "q", "replicants": ["A", "B"]}
+    )
+    await _wait_for(queue, job_id)
+
+    assert orchestrator.calls == [("resume", "council_old"), ("run", "q")]
+    assert queue.get(job_id)["state"] == {"session_id": "council_2"}
+    await queue.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_tool_results_fail_the_job(tmp_path):
+    class FailingLens:
+        async def analyze_through_lens(self, text, persona_or_replicant, **kwargs):
+            assert kwargs["raise_errors"]
+            raise LensAnalysisError("Error during analysis: backend timed out")
+
+    queue = JobQueue(SEGPersistenceManager(data_dir=str(tmp_path)), owner="test")
+    register_seg_jobs(queue, FailingLens(), RecordingOrchestrator())
+
+    for kind, arguments in (
+        ("run_council_session", {"premise": "fail", "replicants": ["A", "B"]}),
+        ("run_council_session", {"premise": "unknown", "replicants": ["A", "C"]}),
+        ("analyze_through_seg_lens", {"text": "t", "persona_or_replicant": "P"}),
+    ):
+        job_id = await queue.submit(kind, arguments)
+        await _wait_for(queue, job_id, status="failed")
+        assert queue.get(job_id)["error"]
+        assert "result" not in queue.get(job_id)
+    await queue.shutdown()
@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+import pytest
+
+from mcp_server.loadtest import Recorder, drive, parse_mix, percentile
+from mcp_server.stub_llm import StubLLMServer
+
+
+def test_stub_llm_answers_ollama_and_openai_routes():
+    stub = StubLLMServer(latency=0.05, reply_tokens=20)
+    url = stub.start()
+    messages = [{"role": "user", "content": "hi"}]
+    try:
+        chat = httpx.post(f"{url}/api/chat", json={"model": "m", "messages": messages})
+        openai = httpx.post(f"{url}/v1/chat/completions", json={"messages": messages})
+        tags = httpx.get(f"{url}/api/tags")
+    finally:
+        stub.stop()
+
+    assert chat.elapsed.total_seconds() >= 0.05
+    assert chat.json()["message"]["content"]
+    assert openai.json()["choices"][0]["message"]["content"]
+    assert tags.json()["models"][0]["name"] == "stub"
+    assert stub.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_drive_counts_completions_errors_and_drops():
+    async def call(op, n):
+        await asyncio.sleep(0.05)
+        if op == "bad":
+            raise RuntimeError("boom")
+
+    recorder = Recorder("fake")
+    await drive(
+        call,
+        parse_mix("ok=1,bad=1"),
+        rate=100,
+        duration=0.3,
+        max_inflight=2,
+        recorder=recorder,
+    )
+    report = recorder.report()
+
+    assert report["dropped"] > 0
+    assert report["completed"] + report["errors"] + report["dropped"] >= 25
+    assert set(report["operations"]) <= {"ok", "bad"}
+    assert percentile([1, 2, 3, 4], 0.5) == 2
+    assert percentile([], 0.99) is None
@@ -0,0 +1,179 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from mcp_server import ai_service as ai_service_module
+from mcp_server.ai_service import AIResponse, AIService, _HedgeBudget
+from mcp_server.latency import latency_stats
+from mcp_server.metrics import metrics
+from mcp_server.pool import EndpointPool, get_pool, reset_pools
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    reset_pools()
+    yield
+    reset_pools()
+
+
+def test_least_outstanding_spreads_concurrent_requests():
+    pool = EndpointPool("ollama", ["http://a", "http://b", "http://c"])
+    picked = [pool.acquire().url for _ in range(3)]
+    assert sorted(picked) == ["http://a", "http://b", "http://c"]
+
+
+def test_latency_weighted_prefers_fast_host():
+    pool = EndpointPool(
+        "ollama", ["http://slow", "http://fast"], strategy="latency_weighted"
+    )
+    slow, fast = pool.endpoints
+    pool.release(pool.acquire(), latency=1.0)
+    pool.release(pool.acquire(), latency=1.0)
+    slow.ewma_latency, fast.ewma_latency = 10.0, 1.0
+    assert pool.acquire().url == "http://fast"
+
+
+def test_failing_host_is_ejected_and_readmitted():
+    pool = EndpointPool("ollama", ["http://a", "http://b"], max_failures=2)
+    a = pool.endpoints[0]
+    for _ in range(2):
+        pool.release(a, ok=False)
+    assert not a.is_available()
+    assert all(pool.acquire().url == "http://b" for _ in range(3))
+
+    a.ejected_until = 0.0  # cooldown elapsed
+    pool.release(a, latency=0.5)
+    assert a.is_available() and a.consecutive_failures == 0
+
+
+def test_pool_is_shared_per_provider(monkeypatch):
+    monkeypatch.setenv("OLLAMA_BASE_URLS", "http://a:11434, http://b:11434")
+    first, second = AIService(provider="ollama"), AIService(provider="ollama")
+    assert first.pool is second.pool is get_pool("ollama", None)
+    assert [e.url for e in first.pool.endpoints] == ["http://a:11434", "http://b:11434"]
+
+
+@pytest.mark.asyncio
+async def test_transport_errors_count_against_endpoint(monkeypatch):
+    monkeypatch.setenv("OLLAMA_BASE_URLS", "http://down,http://up")
+    service = AIService(provider="ollama")
+
+    async def fake_ollama(messages, base_url=None, **kwargs):
+        if base_url == "http://down":
+            raise httpx.ConnectError("refused")
+        return AIResponse(content=f"from {base_url}")
+
+    monkeypatch.setattr(service, "_call_ollama", fake_ollama)
+    results = [
+        await service.generate_response([{"role": "user", "content": "hi"}])
+        for _ in range(4)
+    ]
+    down = service.pool.endpoints[0]
+    assert down.total_failures == 2
+    assert sum(r.content == "from http://up" for r in results) == 2
+
+
+@pytest.mark.asyncio
+async def test_error_responses_count_as_failed_requests(monkeypatch):
+    service = AIService(provider="ollama")
+
+    async def blocked(messages, **kwargs):
+        return AIResponse(content="", error="Response blocked by safety filter")
+
+    monkeypatch.setattr(service, "_call_ollama", blocked)
+    labels = {"provider": "ollama", "model": service.model}
+    errors = metrics.counter("ai.requests", {**labels, "outcome": "error"})
+    oks = metrics.counter("ai.requests", {**labels, "outcome": "ok"})
+
+    response = await service.generate_response([{"role": "user", "content": "hi"}])
+    assert response.error
+    assert metrics.counter("ai.requests", {**labels, "outcome": "error"}) > errors
+    assert metrics.counter("ai.requests", {**labels, "outcome": "ok"}) == oks
+
+
+@pytest.mark.asyncio
+async def test_fallback_chain_records_answering_provider(monkeypatch):
+    monkeypatch.setenv("AI_FALLBACK_CHAIN_ANALYZE_THROUGH_SEG_LENS", "ollama,lmstudio")
+    service = AIService(provider="ollama")
+
+    async def down(messages, **kwargs):
+        raise httpx.ConnectError("refused")
+
+    async def up(messages, **kwargs):
+        return AIResponse(content="ok")
+
+    monkeypatch.setattr(service, "_call_ollama", down)
+    fallback = service._chain_for("analyze_through_seg_lens")[1]
+    monkeypatch.setattr(fallback, "_call_openai_compatible", up)
+
+    response = await service.generate_response(
+        [{"role": "user", "content": "hi"}], tool="analyze_through_seg_lens"
+    )
+    assert response.content == "ok"
+    assert response.provider == "lmstudio"
+
+
+@pytest.mark.asyncio
+async def test_deadline_is_split_across_attempts(monkeypatch):
+    monkeypatch.setenv("AI_FALLBACK_CHAIN", "ollama,lmstudio")
+    service = AIService(provider="ollama")
+    budgets = []
+
+    async def hang(messages, timeout=None, **kwargs):
+        budgets.append(timeout)
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(service, "_call_ollama", hang)
+    monkeypatch.setattr(service._chain_for(None)[1], "_call_openai_compatible", hang)
+
+    started = time.monotonic()
+    response = await service.generate_response(
+        [{"role": "user", "content": "hi"}], deadline=0.4
+    )
+    assert time.monotonic() - started < 1.0
+    assert response.error.startswith("All providers failed")
+    assert budgets[0] == pytest.approx(0.2, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_to_second_pool_member(monkeypatch):
+    monkeypatch.setenv("OLLAMA_BASE_URLS", "http://slow,http://fast")
+    monkeypatch.setattr(ai_service_module, "_hedge_budget", _HedgeBudget(1.0, 1.0))
+    latency_stats.reset()
+    metrics.reset()
+    for _ in range(20):
+        latency_stats.record("ollama", "llama3", 0.05)
+    service = AIService(provider="ollama", model="llama3")
+
+    async def call(messages, base_url=None, **kwargs):
+        await asyncio.sleep(5 if base_url == "http://slow" else 0.01)
+        return AIResponse(content=base_url)
+
+    monkeypatch.setattr(service, "_call_ollama", call)
+    started = time.monotonic()
+    response = await service.generate_response(
+        [{"role": "user", "content": "hi"}], hedge=True
+    )
+    assert response.content == "http://fast"
+    assert time.monotonic() - started < 1.0
+    assert (
+        metrics.counter("ai.hedge.won", {"provider": "ollama", "model": "llama3"}) == 1
+    )
+    assert all(e.outstanding == 0 for e in service.pool.endpoints)
+
+
+def test_timeout_adapts_to_observed_latency(monkeypatch):
+    monkeypatch.setenv("OLLAMA_TIMEOUT_FLOOR", "1")
+    monkeypatch.setenv("OLLAMA_TIMEOUT_CEILING", "900")
+    latency_stats.reset()
+    service = AIService(provider="ollama", model="llama3")
+    assert service.timeout_for(100, 100) == 180.0  # static until sampled
+
+    for _ in range(10):  # ~0.01 s per generated token on this host
+        latency_stats.record("ollama", "llama3", 1.0, prompt_tokens=0, output_tokens=99)
+    short = service.timeout_for(prompt_tokens=50, expected_output_tokens=100)
+    long = service.timeout_for(prompt_tokens=50, expected_output_tokens=50_000)
+    assert 1.0 <= short < 5.0
+    assert long == 900.0
@@ -0,0 +1,63 @@
+import pytest
+
+from mcp_server.ai_service import (
+    AIResponse,
+    AIService,
+    _gemini_config,
+    _ollama_options,
+    _openai_options,
+)
+from mcp_server.profiles import _load_overrides, get_profile
+
+
+def test_profiles_inherit_from_parents_and_env_overrides(monkeypatch):
+    aesthetic = get_profile("council.aesthetic")
+    assert aesthetic.name == "council.aesthetic"
+    assert aesthetic.temperature == 0.9
+    assert aesthetic.max_tokens == get_profile("council").max_tokens
+    assert get_profile("unknown") is None
+
+    monkeypatch.setenv(
+        "SEG_GENERATION_PROFILES", '{"surface": {"max_tokens": 64, "timeout": 5}}'
+    )
+    surface = get_profile("surface")
+    assert (surface.max_tokens, surface.timeout) == (64, 5)
+
+    assert _ollama_options(surface) == {"options": {"num_predict": 64}}
+    assert _openai_options(surface) == {"temperature": 0.7, "max_tokens": 64}
+    assert _gemini_config(surface) == {"generationConfig": {"maxOutputTokens": 64}}
+    assert _ollama_options(None) == {}
+
+
+@pytest.mark.asyncio
+async def test_profile_reaches_provider_and_caps_timeout(monkeypatch):
+    monkeypatch.setenv("AI_PROVIDER", "ollama")
+    service = AIService()
+    seen = {}
+
+    async def fake_ollama(messages, base_url=None, timeout=None, profile=None):
+        seen.update(timeout=timeout, profile=profile)
+        return AIResponse(content="ok")
+
+    monkeypatch.setattr(service, "_call_ollama", fake_ollama)
+    response = await service.generate_response(
+        [{"role": "user", "content": "hi"}], profile="surface"
+    )
+
+    assert response.content == "ok"
+    assert seen["profile"].max_tokens == 400
+    assert seen["timeout"] <= get_profile("surface").timeout
+
+
+def test_profile_overrides_are_parsed_once_per_change(tmp_path, monkeypatch):
+    overrides = tmp_path / "profiles.json"
+    overrides.write_text('{"surface": {"max_tokens": 64}}')
+    monkeypatch.setenv("SEG_GENERATION_PROFILES", str(overrides))
+    _load_overrides.cache_clear()
+
+    for _ in range(3):
+        assert get_profile("surface").max_tokens == 64
+    assert _load_overrides.cache_info().misses == 1
+
+    overrides.write_text('{"surface": {"max_tokens": 128}}')
+    assert get_profile("surface").max_tokens == 128
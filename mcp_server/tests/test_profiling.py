@@ -0,0 +1,42 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from mcp_server.profiling import Profiler
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        json.dumps({"k": list(range(50))})
+
+
+@pytest.mark.parametrize("mode", ["cpu", "sampling"])
+def test_profile_writes_file_and_summary(tmp_path, mode):
+    profiler = Profiler(tmp_path / "profiles")
+    profiler.start(mode=mode, interval_ms=1)
+    with pytest.raises(RuntimeError):
+        profiler.start()
+    _busy(0.2)
+    result = profiler.stop(top_n=5)
+
+    assert result["mode"] == mode
+    assert Path(result["file"]).parent == tmp_path / "profiles"
+    assert Path(result["file"]).exists()
+    assert 0 < len(result["top"]) <= 5
+    with pytest.raises(RuntimeError):
+        profiler.stop()
+
+
+def test_memory_snapshot_reports_growth(tmp_path):
+    profiler = Profiler(tmp_path)
+    assert profiler.memory_snapshot()["status"] == "tracing started"
+    first = profiler.memory_snapshot(top_n=3)
+    hoard = [bytearray(1024) for _ in range(200)]
+    second = profiler.memory_snapshot(top_n=3, stop=True)
+
+    assert "growth" not in first and "growth" in second
+    assert second["status"] == "tracing stopped"
+    assert hoard
@@ -0,0 +1,32 @@
+from mcp_server.persistence import SEGPersistenceManager
+from mcp_server.registry import ReplicantRegistry
+from mcp_server.registry_watcher import RegistryWatcher
+
+
+def test_watcher_applies_other_process_writes(tmp_path):
+    registry = ReplicantRegistry(SEGPersistenceManager(data_dir=str(tmp_path)))
+    watcher = RegistryWatcher(registry, interval=0.01, debounce=0.01)
+    seen = []
+    registry.add_listener(lambda snapshot, diff: seen.append((snapshot.version, diff)))
+
+    # Our own saves, once flushed, are not reported back as changes.
+    registry.add_custom_replicant({"archetype_name": "Local", "directive": "l"})
+    registry.persistence.flush()
+    assert watcher.poll() == {}
+    assert seen == [(1, {"added": ["Local"]})]
+
+    # Another process (here a second manager on the same directory) edits
+    # the file; a pending local save survives the reload.
+    other = SEGPersistenceManager(data_dir=str(tmp_path))
+    other.update_custom_replicants(
+        {"Remote": {"archetype_name": "Remote"}, "Local": {"archetype_name": "Local"}}
+    )
+    other.flush()
+    registry.add_custom_replicant({"archetype_name": "Pending", "directive": "p"})
+    diff = watcher.poll()
+
+    assert diff == {"added": ["Remote"], "updated": ["Local"]}
+    assert registry.has_replicant("Remote") and registry.has_replicant("Pending")
+    assert registry.version == 3 and seen[-1] == (3, diff)
+    assert watcher.poll() is None
+    assert watcher.status()["reloads"] == 1
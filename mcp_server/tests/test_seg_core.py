@@ -1,7 +1,11 @@
 import pytest
 import asyncio
-from mcp_server.seg_core import SEGPersonaGenerator, SEGCouncilOrchestrator
+import time
+from mcp_server.seg_core import SEGPersonaGenerator, SEGCouncilOrchestrator, parse_persona_specs
 from mcp_server.ai_service import AIService, AIResponse
+from mcp_server.persistence import SEGPersistenceManager
+from mcp_server.metrics import metrics
+from mcp_server.pool import reset_pools
 
 class MockAIService(AIService):
     async def generate_response(self, messages, system_prompt=None, **kwargs):
@@ -46,3 +50,145 @@ async def test_run_council_session(council_orchestrator):
         mode="dialogic"
     )
     assert "Mocked response" in result
+
+class FlakyAIService(AIService):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.fail = True
+
+    async def generate_response(self, messages, system_prompt=None, **kwargs):
+        self.calls += 1
+        if self.fail:
+            return AIResponse(content="", error="backend timed out")
+        return AIResponse(content="Council transcript")
+
+@pytest.mark.asyncio
+async def test_council_session_resumes_from_checkpoint(tmp_path):
+    ai = FlakyAIService()
+    persistence = SEGPersistenceManager(data_dir=str(tmp_path))
+    orchestrator = SEGCouncilOrchestrator(ai_service=ai, persistence=persistence)
+
+    result = await orchestrator.run_session(
+        premise="Is AI sentient?",
+        replicants=["Bayesian Sage", "Automatist Oracle"],
+    )
+    assert "resume_council_session" in result
+    (session_id,) = persistence.list_council_checkpoints()
+    assert persistence.load_council_checkpoint(session_id)["status"] == "failed"
+
+    # A fresh orchestrator (e.g. after a restart) picks up from disk.
+    ai.fail = False
+    restarted = SEGCouncilOrchestrator(ai_service=ai, persistence=persistence)
+    assert await restarted.resume_session(session_id) == "Council transcript"
+    assert await restarted.resume_session(session_id) == "Council transcript"
+    assert ai.calls == 2
+
+
+class ChattyAIService(AIService):
+    """Long turns with a POSITION line; fails once on a chosen call."""
+
+    def __init__(self, fail_on=None):
+        super().__init__()
+        self.prompt_sizes = []
+        self.fail_on = fail_on
+
+    async def generate_response(self, messages, system_prompt=None, **kwargs):
+        self.prompt_sizes.append(len(messages[0]["content"]))
+        if len(self.prompt_sizes) == self.fail_on:
+            return AIResponse(content="", error="backend timed out")
+        turn = len(self.prompt_sizes)
+        return AIResponse(content="word " * 400 + f"\nPOSITION: stance {turn}")
+
+
+@pytest.mark.asyncio
+async def test_cycle_execution_keeps_context_bounded_and_resumes(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEG_COUNCIL_CONTEXT_TOKENS", "300")
+    ai = ChattyAIService(fail_on=6)
+    persistence = SEGPersistenceManager(data_dir=str(tmp_path))
+    orchestrator = SEGCouncilOrchestrator(ai_service=ai, persistence=persistence)
+    replicants = ["Bayesian Sage", "Automatist Oracle", "Comedic Trickster"]
+
+    result = await orchestrator.run_session(
+        premise="Is AI sentient?", replicants=replicants, cycles=4, execution="cycles"
+    )
+    assert "resume_council_session" in result
+    (session_id,) = persistence.list_council_checkpoints()
+    assert len(persistence.load_council_checkpoint(session_id)["turns"]) == 5
+
+    ai.fail_on = None
+    output = await SEGCouncilOrchestrator(
+        ai_service=ai, persistence=persistence
+    ).resume_session(session_id)
+    session = persistence.load_council_checkpoint(session_id)
+
+    # 4 cycles x 3 participants + synthesis, plus the one failed attempt.
+    assert len(session["turns"]) == 13 and len(ai.prompt_sizes) == 14
+    assert session["turns"][-2]["position"] == "stance 13"
+    assert all("POSITION:" not in t["content"] for t in session["turns"][:-1])
+    assert "Cycle 4: Comedic Trickster" in output
+    # Rolling context stays within budget (~4 chars/token) however many
+    # cycles have run.
+    assert max(ai.prompt_sizes) <= 300 * 4 + 200
+
+
+@pytest.mark.asyncio
+async def test_run_session_degrades_when_every_endpoint_is_ejected(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setenv("AI_PROVIDER", "ollama")
+    monkeypatch.setenv("SEG_COUNCIL_DEGRADE", "auto")
+    reset_pools()
+    try:
+        ai = ChattyAIService()
+        generator = SEGPersonaGenerator(ai_service=ai, data_dir=str(tmp_path))
+        generator.registry.add_custom_replicant(
+            {"archetype_name": "Custom Voice", "role": "a cartographer of doubt"}
+        )
+        orchestrator = SEGCouncilOrchestrator(ai_service=ai, registry=generator.registry)
+        for endpoint in ai.pool.endpoints:
+            endpoint.ejected_until = time.monotonic() + 60
+        before = metrics.counter("council.degraded", {"reason": "circuit_open"})
+
+        output = await orchestrator.run_session(
+            premise="Is AI sentient?", replicants=["Bayesian Sage", "Custom Voice"]
+        )
+    finally:
+        reset_pools()
+
+    assert output.startswith("> **Degraded response (circuit_open).**")
+    assert "a cartographer of doubt" in output
+    assert ai.prompt_sizes == []
+    assert metrics.counter("council.degraded", {"reason": "circuit_open"}) == before + 1
+    (session,) = orchestrator.active_sessions.values()
+    assert session["degraded"] == "circuit_open"
+
+
+@pytest.mark.asyncio
+async def test_generate_personas_bulk_commits_once(tmp_path, monkeypatch):
+    generator = SEGPersonaGenerator(ai_service=MockAIService(), data_dir=str(tmp_path))
+    writes = []
+    save = generator.persistence._save_file
+    monkeypatch.setattr(
+        generator.persistence,
+        "_save_file",
+        lambda path, data: writes.append(path) or save(path, data),
+    )
+
+    specs = parse_persona_specs(
+        "name,profession,defining_experience,age\n"
+        "Ada,Engineer,A bridge collapse,41\n"
+        "Bo,Baker,,\n"
+        "Cy,Cartographer,A storm at sea,\n",
+        "csv",
+    )
+    streamed = []
+    summary = await generator.generate_personas_bulk(specs, streamed.append)
+
+    assert summary["created"] == 2 and summary["failed"] == 1
+    assert [r["status"] for r in streamed] == ["ok", "error", "ok"]
+    generator.persistence.flush()
+    assert writes == [generator.persistence.generated_personas_file]
+    assert generator.generated_personas["Ada"]["anchor_identity"]["age"] == 41
+    reloaded = generator.persistence.load_generated_personas()
+    assert set(reloaded) == {"Ada", "Cy"}
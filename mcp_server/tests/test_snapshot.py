@@ -0,0 +1,168 @@
+import json
+
+import pytest
+
+from mcp_server.ai_service import AIService
+from mcp_server.persistence import SEGPersistenceManager
+from mcp_server.registry import ReplicantRegistry
+from mcp_server.seg_core import SEGPersonaGenerator
+from mcp_server.snapshot import SnapshotReader, open_snapshot, snapshot_path
+
+
+def test_snapshot_decodes_lazily_and_tracks_source(tmp_path):
+    source = tmp_path / "records.json"
+    records = {f"P{i}": {"name": f"P{i}", "note": "–→ unicode"} for i in range(50)}
+    source.write_text(json.dumps(records))
+
+    reader = open_snapshot(source)
+    assert list(reader) == list(records)
+    assert reader._cache == {}
+    assert reader["P7"] == records["P7"]
+    assert list(reader._cache) == ["P7"]
+    assert reader.is_fresh(source)
+    reader.close()
+
+    source.write_text(json.dumps({"Q": {"name": "Q"}}))
+    assert not SnapshotReader(snapshot_path(source)).is_fresh(source)
+    assert list(open_snapshot(source)) == ["Q"]
+
+
+def test_registry_over_snapshot_supports_mutation(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEG_REGISTRY_SNAPSHOTS", "1")
+    persistence = SEGPersistenceManager(data_dir=str(tmp_path))
+    persistence.save_custom_replicant({"archetype_name": "Alpha", "directive": "a"})
+    persistence.flush()
+    assert snapshot_path(persistence.custom_replicants_file).exists()
+
+    registry = ReplicantRegistry(persistence)
+    assert registry.get_definition("Alpha")["directive"] == "a"
+    registry.add_custom_replicant({"archetype_name": "Beta", "directive": "b"})
+    assert registry.delete_custom_replicant("Alpha")
+    assert "Alpha" not in registry.get_names()
+    assert registry.get_all_definitions()["Beta"]["directive"] == "b"
+
+    persistence.flush()
+    reloaded = ReplicantRegistry(SEGPersistenceManager(data_dir=str(tmp_path)))
+    assert set(reloaded.custom_replicants) == {"Beta"}
+
+
+def test_generated_personas_load_lazily_into_bounded_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEG_PERSONA_CACHE_SIZE", "2")
+    source = tmp_path / "generated_personas.json"
+    source.write_text(json.dumps({f"P{i}": {"name": f"P{i}"} for i in range(10)}))
+
+    personas = SEGPersistenceManager(data_dir=str(tmp_path)).load_generated_personas()
+    assert len(personas) == 10 and "P3" in personas
+    for name in ("P1", "P2", "P3"):
+        assert personas[name]["name"] == name
+    assert list(personas._base._cache) == ["P2", "P3"]
+
+    personas["New"] = {"name": "New"}
+    assert personas["New"]["name"] == "New"
+    assert len(personas) == 11
+
+
+def test_write_behind_coalesces_and_reads_pending(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEG_WRITE_BEHIND_INTERVAL_MS", "60000")
+    persistence = SEGPersistenceManager(data_dir=str(tmp_path))
+    writes = []
+    save = persistence._save_file
+    monkeypatch.setattr(
+        persistence,
+        "_save_file",
+        lambda path, data: writes.append(path) or save(path, data),
+    )
+
+    for i in range(20):
+        persistence.save_custom_replicant({"archetype_name": f"R{i}", "n": i})
+    assert persistence.delete_custom_replicant("R0")
+    assert not persistence.custom_replicants_file.exists()
+    assert set(persistence.load_custom_replicants()) == {f"R{i}" for i in range(1, 20)}
+
+    persistence.close()
+    assert writes == [persistence.custom_replicants_file]
+    on_disk = json.loads(persistence.custom_replicants_file.read_text())
+    assert len(on_disk) == 19 and on_disk["R7"]["n"] == 7
+
+
+def test_registry_publishes_immutable_snapshots(tmp_path):
+    registry = ReplicantRegistry(SEGPersistenceManager(data_dir=str(tmp_path)))
+    before = registry.snapshot
+    assert registry.get_all_definitions() is before.definitions
+
+    registry.add_custom_replicant({"archetype_name": "Gamma", "directive": "g"})
+    after = registry.snapshot
+    assert after.version == before.version + 1
+    assert "Gamma" in after.names and "Gamma" not in before.names
+    assert "Gamma" not in before.definitions
+    assert after.definitions["Gamma"]["directive"] == "g"
+    assert list(after.definitions) == registry.get_names()
+    with pytest.raises(TypeError):
+        after.custom["Delta"] = {}
+
+    assert registry.delete_custom_replicant("Gamma")
+    assert "Gamma" in after.names and not registry.has_replicant("Gamma")
+
+
+def test_failed_flush_keeps_changes_buffered(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEG_WRITE_BEHIND_INTERVAL_MS", "60000")
+    persistence = SEGPersistenceManager(data_dir=str(tmp_path))
+    save = persistence._save_file
+
+    def disk_full(path, data):
+        raise OSError(28, "No space left on device")
+
+    persistence.save_custom_replicant({"archetype_name": "Alpha", "n": 1})
+    persistence.save_custom_replicant({"archetype_name": "Beta", "n": 1})
+    monkeypatch.setattr(persistence, "_save_file", disk_full)
+    with pytest.raises(OSError):
+        persistence.flush()
+
+    persistence.save_custom_replicant({"archetype_name": "Beta", "n": 2})
+    assert persistence.load_custom_replicants()["Alpha"]["n"] == 1
+    with pytest.raises(OSError):
+        persistence.close()
+
+    monkeypatch.setattr(persistence, "_save_file", save)
+    persistence.close()
+    on_disk = json.loads(persistence.custom_replicants_file.read_text())
+    assert on_disk["Alpha"]["n"] == 1 and on_disk["Beta"]["n"] == 2
+
+
+@pytest.mark.asyncio
+async def test_written_personas_leave_the_overlay(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEG_PERSONA_CACHE_SIZE", "4")
+    monkeypatch.setenv("SEG_WRITE_BEHIND_INTERVAL_MS", "60000")
+    generator = SEGPersonaGenerator(ai_service=AIService(), data_dir=str(tmp_path))
+    personas = generator.generated_personas
+
+    for i in range(10):
+        await generator.generate_persona(f"P{i}", "Engineer", "A storm at sea")
+    assert len(personas._overlay) == 10
+
+    generator.persistence.flush()
+    assert personas._overlay == {}
+    assert [personas[f"P{i}"]["name"] for i in range(10)] == [
+        f"P{i}" for i in range(10)
+    ]
+    assert len(personas._base._cache) == 4
+
+    # A record changed after it was queued stays until its own write.
+    personas["P0"] = {**personas["P0"], "note": "edited"}
+    generator.persistence.flush()
+    assert list(personas._overlay) == ["P0"]
+
+
+def test_reader_returns_copies_and_skips_corrupt_sources(tmp_path):
+    source = tmp_path / "records.json"
+    source.write_text(json.dumps({"P": {"name": "P", "tags": ["a"]}}))
+    reader = open_snapshot(source)
+    reader["P"]["tags"].append("b")
+    assert reader["P"] == {"name": "P", "tags": ["a"]}
+    reader.close()
+
+    corrupt = tmp_path / "generated_personas.json"
+    corrupt.write_text('{"P": {"name": ')
+    personas = SEGPersistenceManager(data_dir=str(tmp_path)).load_generated_personas()
+    assert dict(personas) == {}
+    assert not snapshot_path(corrupt).exists()
@@ -0,0 +1,35 @@
+import pytest
+
+from mcp_server.ai_service import AIService
+from mcp_server.stub_llm import StubLLMServer
+from mcp_server.warmup import ModelWarmer
+
+
+@pytest.mark.asyncio
+async def test_warm_and_report_residency_against_stub(monkeypatch):
+    monkeypatch.setenv("AI_PROVIDER", "ollama")
+    stub = StubLLMServer(latency=1.0)
+    url = stub.start()
+    try:
+        warmer = ModelWarmer(AIService(), urls=[url], models=["stub", "other"])
+        warmed = await warmer.warm()
+        residency = await warmer.residency()
+    finally:
+        stub.stop()
+
+    # Load-only requests do not generate, so they skip the stub's latency.
+    assert [r["load_seconds"] for r in warmed["results"]] == [0, 0]
+    assert all(r["seconds"] < 1.0 for r in warmed["results"])
+    assert stub.requests == 2
+    (endpoint,) = residency["endpoints"]
+    assert endpoint["resident"] == {"stub": True, "other": False}
+    assert residency["last_warmup"] is warmed
+
+
+@pytest.mark.asyncio
+async def test_warmer_is_a_no_op_for_hosted_providers(monkeypatch):
+    monkeypatch.setenv("SEG_MODEL_WARMUP", "1")
+    warmer = ModelWarmer(AIService(provider="gemini"))
+    warmer.start()
+    assert warmer._task is None
+    assert "skipped" in await warmer.warm()
@@ -0,0 +1,30 @@
+import asyncio
+import time
+
+import pytest
+
+from mcp_server.metrics import metrics
+from mcp_server.watchdog import LoopWatchdog
+
+
+def _blocking_registry_write(seconds):
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_watchdog_blames_the_blocking_call():
+    watchdog = LoopWatchdog(threshold=0.05, interval=0.02)
+    watchdog.start()
+    await asyncio.sleep(0.1)
+    _blocking_registry_write(0.3)
+    await asyncio.sleep(0.1)
+    await watchdog.stop()
+
+    status = watchdog.status()
+    offender = status["offenders"][0]
+    assert "_blocking_registry_write" in offender["site"]
+    assert offender["stalled_seconds"] >= 0.2
+    assert status["max_lag_seconds"] >= 0.2
+    assert "test_watchdog.py" in status["recent"][0]["stack"][-1]
+    assert metrics.counter("event_loop.stalls", {"site": offender["site"]}) >= 1
+    assert not watchdog.running
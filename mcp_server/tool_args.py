@@ -0,0 +1,247 @@
+"""Pydantic models validating MCP tool arguments.
+
+Shared by the MCP server and the bridge, so a job queued through either
+entry point passes the same checks before it reaches a handler.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from .seg_core import COUNCIL_EXECUTION_MODES
+
+
+class GeneratePersonaArgs(BaseModel):
+    """Arguments for the generate_persona tool."""
+
+    name: str = Field(..., description="Persona name")
+    age: Optional[int] = Field(None, description="Age in years")
+    profession: str = Field(..., description="Primary profession or role")
+    location: Optional[str] = Field(None, description="Geographic/cultural context")
+    defining_experience: str = Field(
+        ..., description="Core emotional/formative experience"
+    )
+    domain_expertise: Optional[str] = Field(
+        None, description="Area of specialized knowledge"
+    )
+    philosophical_stance: Optional[str] = Field(
+        None, description="Core worldview or belief system"
+    )
+    style_preferences: Optional[str] = Field(
+        None, description="Communication style and linguistic preferences"
+    )
+    molecular_self: Optional[Dict[str, str]] = Field(
+        None, description="Section 0: Molecular Self generative substrate"
+    )
+
+
+class RunCouncilSessionArgs(BaseModel):
+    """Arguments for the run_council_session tool."""
+
+    premise: str = Field(..., description="Core question or scenario to explore")
+    replicants: List[str] = Field(
+        ..., description="List of replicants to include (2-10 personas)"
+    )
+    mode: str = Field("dialogic", description="Output format for the council session")
+    constraints: Optional[str] = Field(
+        None, description="Optional constraints or rules"
+    )
+    cycles: int = Field(2, ge=1, le=5, description="Number of reasoning cycles (1-5)")
+    execution: Optional[str] = Field(
+        None,
+        description="single (one generation) or cycles (a turn per participant "
+        "per cycle); defaults to SEG_COUNCIL_EXECUTION",
+    )
+
+    @field_validator("execution")
+    @classmethod
+    def validate_execution(cls, v):
+        """Validate the council execution mode."""
+        if v is not None and v not in COUNCIL_EXECUTION_MODES:
+            raise ValueError(
+                f"Execution must be one of {list(COUNCIL_EXECUTION_MODES)}"
+            )
+        return v
+
+    @field_validator("mode")
+    @classmethod
+    def validate_mode(cls, v):
+        """Validate the council session mode."""
+        allowed = ["dialogic", "braided_report", "strategic", "aesthetic"]
+        if v not in allowed:
+            raise ValueError(f"Mode must be one of {allowed}")
+        return v
+
+    @field_validator("replicants")
+    @classmethod
+    def validate_replicants(cls, v):
+        """Validate the number of replicants."""
+        if len(v) < 2 or len(v) > 10:
+            raise ValueError("Replicant count must be between 2 and 10")
+        return v
+
+
+class AnalyzeLensArgs(BaseModel):
+    """Arguments for the analyze_through_seg_lens tool."""
+
+    text: Optional[str] = Field(None, description="Text or concept to analyze")
+    persona_or_replicant: str = Field(..., description="Persona name or replicant type")
+    analysis_focus: Optional[str] = Field(
+        None, description="Specific aspect to focus on"
+    )
+    depth: str = Field("moderate", description="Depth of experiential filtering")
+    source: Optional[str] = Field(
+        None, description="Path or file:// URI of a document to analyze"
+    )
+    chunked: Optional[bool] = Field(
+        None, description="Force map-reduce analysis on or off (default: by length)"
+    )
+
+    @model_validator(mode="after")
+    def validate_input(self):
+        """Exactly one of text and source."""
+        if bool(self.text) == bool(self.source):
+            raise ValueError("Provide exactly one of text or source")
+        return self
+
+    @field_validator("depth")
+    @classmethod
+    def validate_depth(cls, v):
+        """Validate the analysis depth."""
+        allowed = ["surface", "moderate", "deep"]
+        if v not in allowed:
+            raise ValueError(f"Depth must be one of {allowed}")
+        return v
+
+
+class CreateReplicantArgs(BaseModel):
+    """Arguments for the create_custom_replicant tool."""
+
+    archetype_name: str = Field(..., description="Name of the new archetype")
+    core_function: str = Field(..., description="Primary cognitive/creative function")
+    anchor_identity: Optional[str] = Field(
+        None, description="Base identity and context"
+    )
+    sensory_web: Optional[Dict[str, str]] = Field(None)
+    emotional_core: Optional[str] = Field(None)
+    philosophy: Optional[str] = Field(None)
+    linguistic_style: Optional[str] = Field(None)
+    directive: str = Field(..., description="How to use this replicant")
+    molecular_self: Optional[Dict[str, str]] = Field(
+        None,
+        description=(
+            "Section 0: Molecular Self generative substrate. Seven optional keys: "
+            "recursive_anchor, gradient_pump, backbone, reflection, exploration, "
+            "switch_trigger, emotion_vector_primary."
+        ),
+    )
+
+
+class GetReplicantDetailsArgs(BaseModel):
+    """Arguments for the get_replicant_details tool."""
+
+    replicant_name: str = Field(..., description="Name of the replicant to examine")
+
+
+class DeleteReplicantArgs(BaseModel):
+    """Arguments for the delete_custom_replicant tool."""
+
+    replicant_name: str = Field(
+        ..., description="Name of the custom replicant to permanently remove"
+    )
+
+
+class StartSegCouncilArgs(BaseModel):
+    """Arguments for the start_seg_council tool."""
+
+    premise: str = Field(..., description="Core question or scenario to explore")
+    agent_ids: List[str] = Field(..., description="List of replicants to include")
+
+
+class GetSegCouncilStatusArgs(BaseModel):
+    """Arguments for the get_seg_council_status tool."""
+
+    session_id: str = Field(..., description="ID of the council session")
+
+
+class GeneratePersonasBulkArgs(BaseModel):
+    """Arguments for the generate_personas_bulk tool."""
+
+    specs: Optional[List[Dict[str, Any]]] = Field(
+        None, description="Persona specs, each shaped like generate_persona's arguments"
+    )
+    data: Optional[str] = Field(None, description="Persona specs as JSONL or CSV text")
+    format: str = Field("jsonl", description="Format of data: jsonl or csv")
+
+
+class ResumeCouncilSessionArgs(BaseModel):
+    """Arguments for the resume_council_session tool."""
+
+    session_id: str = Field(
+        ..., description="ID of a checkpointed council session to continue"
+    )
+
+
+class StartProfileArgs(BaseModel):
+    """Arguments for the start_profile tool."""
+
+    mode: str = Field("cpu", description="cpu (cProfile) or sampling")
+    interval_ms: float = Field(10, description="Sampling interval in milliseconds")
+
+
+class StopProfileArgs(BaseModel):
+    """Arguments for the stop_profile tool."""
+
+    top_n: int = Field(25, description="Number of entries to summarize")
+    sort: str = Field("cumulative", description="cProfile sort key")
+
+
+class MemorySnapshotArgs(BaseModel):
+    """Arguments for the memory_snapshot tool."""
+
+    top_n: int = Field(25, description="Number of allocation sites to summarize")
+    stop: bool = Field(False, description="Stop tracemalloc after this snapshot")
+
+
+class ModelResidencyArgs(BaseModel):
+    """Arguments for the get_model_residency tool."""
+
+    warm: bool = Field(False, description="Load the configured models first")
+
+
+class SubmitJobArgs(BaseModel):
+    """Arguments for the submit_job tool."""
+
+    kind: str = Field(..., description="Tool to run in the background")
+    arguments: Dict[str, Any] = Field(
+        default_factory=dict, description="Arguments for that tool"
+    )
+
+
+class GetJobArgs(BaseModel):
+    """Arguments for the get_job_status and get_job_result tools."""
+
+    job_id: str = Field(..., description="ID returned by submit_job")
+
+
+# Job kinds accepted by submit_job (MCP) and POST /jobs (bridge), validated
+# with the tool's own schema before queueing so bad arguments fail now rather
+# than in a worker.
+JOB_ARGS = {
+    "run_council_session": RunCouncilSessionArgs,
+    "resume_council_session": ResumeCouncilSessionArgs,
+    "analyze_through_seg_lens": AnalyzeLensArgs,
+    "generate_persona": GeneratePersonaArgs,
+    "generate_personas_bulk": GeneratePersonasBulkArgs,
+}
+
+
+def validate_job_arguments(kind: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Check ``arguments`` against the schema of job ``kind``.
+
+    Returns the normalized arguments to queue. Raises ValueError for an
+    unknown kind and pydantic.ValidationError for invalid arguments.
+    """
+    if kind not in JOB_ARGS:
+        raise ValueError(f"Job kind must be one of {list(JOB_ARGS)}")
+    return JOB_ARGS[kind](**arguments).dict()
@@ -0,0 +1,171 @@
+"""Model warm-up and residency for Ollama backends.
+
+The first generation after a restart, or after Ollama unloads an idle
+model, pays the model-load time that Ollama reports as ``load_duration``.
+With ``SEG_MODEL_WARMUP=1``, the server and the bridge send every pool
+endpoint a zero-token ``/api/chat`` request (an empty message list) per
+configured model at startup. That loads the model without generating. The
+request sets ``keep_alive``, and is repeated every
+``SEG_MODEL_REFRESH_SECONDS`` so the model stays loaded while the process
+runs.
+
+``residency()`` asks each endpoint's ``/api/ps`` which models are loaded
+and until when. The ``get_model_residency`` tool and the bridge's
+``GET /models/residency`` expose it.
+
+Hosted providers manage residency themselves; for them this is a no-op.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .ai_service import AIService
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWarmer:
+    """Preloads models on every endpoint and keeps them resident."""
+
+    def __init__(
+        self,
+        ai_service: Optional[AIService] = None,
+        urls: Optional[List[str]] = None,
+        models: Optional[List[str]] = None,
+    ):
+        self.ai_service = ai_service or AIService()
+        self.enabled = os.getenv("SEG_MODEL_WARMUP", "").lower() in (
+            "1",
+            "true",
+            "yes",
+            "on",
+        )
+        self.keep_alive = os.getenv("SEG_MODEL_KEEP_ALIVE", "30m")
+        self.refresh_seconds = float(os.getenv("SEG_MODEL_REFRESH_SECONDS", "240"))
+        self.timeout = float(os.getenv("SEG_MODEL_WARMUP_TIMEOUT", "300"))
+        configured = [m.strip() for m in os.getenv("SEG_WARMUP_MODELS", "").split(",")]
+        self.models = models or [m for m in configured if m] or [self.ai_service.model]
+        self._urls = urls
+        self.last_warmup: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def supported(self) -> bool:
+        return self.ai_service.provider == "ollama"
+
+    @property
+    def urls(self) -> List[str]:
+        if self._urls is not None:
+            return self._urls
+        pool = self.ai_service.pool
+        if pool:
+            return [endpoint.url for endpoint in pool.endpoints]
+        return [self.ai_service.base_url]
+
+    def start(self) -> None:
+        """Warm now and refresh periodically; call from a coroutine."""
+        if not self.enabled or not self.supported:
+            return
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.warm()
+            except Exception as e:  # keep refreshing; next tick may succeed
+                logger.error("Model warm-up failed: %s", e)
+            await asyncio.sleep(self.refresh_seconds)
+
+    async def warm(self) -> Dict[str, Any]:
+        """Load every model on every endpoint; report load times per pair."""
+        if not self.supported:
+            return {"skipped": f"{self.ai_service.provider} manages residency"}
+        async with httpx.AsyncClient() as client:
+            pairs = [(url, model) for url in self.urls for model in self.models]
+            results = await asyncio.gather(
+                *(self._warm_one(client, url, model) for url, model in pairs)
+            )
+        self.last_warmup = {"at": time.time(), "results": list(results)}
+        return self.last_warmup
+
+    async def _warm_one(
+        self, client: httpx.AsyncClient, url: str, model: str
+    ) -> Dict[str, Any]:
+        started = time.monotonic()
+        result: Dict[str, Any] = {"url": url, "model": model}
+        try:
+            response = await client.post(
+                f"{url}/api/chat",
+                json={"model": model, "messages": [], "keep_alive": self.keep_alive},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            result["error"] = str(e) or type(e).__name__
+            logger.warning("Could not warm %s on %s: %s", model, url, result["error"])
+            return result
+        # Ollama reports durations in nanoseconds; a model that was already
+        # loaded reports a near-zero load_duration.
+        load_seconds = (data.get("load_duration") or 0) / 1e9
+        result["load_seconds"] = round(load_seconds, 3)
+        result["seconds"] = round(time.monotonic() - started, 3)
+        metrics.observe("ai.model_load", load_seconds, labels={"model": model})
+        return result
+
+    async def residency(self) -> Dict[str, Any]:
+        """Which configured models each endpoint currently holds in memory."""
+        status: Dict[str, Any] = {
+            "provider": self.ai_service.provider,
+            "warmup_enabled": self.enabled,
+            "keep_alive": self.keep_alive,
+            "models": self.models,
+            "last_warmup": self.last_warmup or None,
+        }
+        if not self.supported:
+            return status
+        endpoints = []
+        async with httpx.AsyncClient() as client:
+            for url in self.urls:
+                entry: Dict[str, Any] = {"url": url}
+                try:
+                    response = await client.get(f"{url}/api/ps", timeout=5.0)
+                    response.raise_for_status()
+                    loaded = response.json().get("models", [])
+                except (httpx.HTTPError, ValueError) as e:
+                    entry["error"] = str(e) or type(e).__name__
+                    endpoints.append(entry)
+                    continue
+                names = {m.get("name") or m.get("model") for m in loaded}
+                entry["resident"] = {
+                    model: model in names or f"{model}:latest" in names
+                    for model in self.models
+                }
+                entry["loaded"] = [
+                    {
+                        "name": m.get("name") or m.get("model"),
+                        "expires_at": m.get("expires_at"),
+                        "size_vram": m.get("size_vram"),
+                    }
+                    for m in loaded
+                ]
+                endpoints.append(entry)
+        status["endpoints"] = endpoints
+        return status
@@ -0,0 +1,177 @@
+"""Event-loop lag watchdog.
+
+The MCP server and the bridge each serve every request from one asyncio
+loop, so synchronous work inside a coroutine (registry JSON dumps, CrewAI
+flow steps, a blocking HTTP client) stalls everything. The watchdog finds
+those stalls in two parts:
+
+- A heartbeat coroutine on the loop sleeps ``interval`` and records how
+  late it woke up in the ``event_loop.lag_seconds`` histogram.
+- A daemon thread watches the heartbeat. When it is overdue by more than
+  ``threshold``, the thread reads the loop thread's stack through
+  ``sys._current_frames``. That stack is the blocking code, caught in the
+  act. The stall is counted under ``event_loop.stalls{site=...}``, and the
+  most recent stacks are kept for ``status()``.
+
+The site is the innermost frame in this project's code, so a stall inside
+``json.dump`` is blamed on the SEG call that made it.
+
+Configuration: ``SEG_LOOP_WATCHDOG=0`` disables it, and
+``SEG_LOOP_LAG_THRESHOLD_MS`` (default 250) and
+``SEG_LOOP_WATCHDOG_INTERVAL_MS`` (default 100) tune it.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .metrics import metrics
+from .profiling import frame_label
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+_SELF = str(Path(__file__).resolve())
+
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _blocking_site(stack: List) -> str:
+    """Innermost project frame of ``stack`` (innermost first)."""
+    for frame in stack:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(_PROJECT_ROOT)
+            and filename != _SELF
+            and "site-packages" not in filename
+        ):
+            return frame_label(frame)
+    return frame_label(stack[0]) if stack else "unknown"
+
+
+class LoopWatchdog:
+    """Measures lag on the running loop and captures stacks of stalls."""
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        interval: Optional[float] = None,
+        keep: int = 20,
+    ):
+        self.enabled = os.getenv("SEG_LOOP_WATCHDOG", "1") != "0"
+        self.threshold = (
+            threshold
+            if threshold is not None
+            else float(os.getenv("SEG_LOOP_LAG_THRESHOLD_MS", "250")) / 1000
+        )
+        self.interval = (
+            interval
+            if interval is not None
+            else float(os.getenv("SEG_LOOP_WATCHDOG_INTERVAL_MS", "100")) / 1000
+        )
+        self.max_lag = 0.0
+        self.stall_seconds: Counter = Counter()
+        self.recent: deque = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._beat = time.monotonic()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start watching the running loop; call from a coroutine."""
+        if not self.enabled or self.running:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._watch, name="seg-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+        logger.info("Loop watchdog started (threshold %.0f ms)", self.threshold * 1000)
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            metrics.observe("event_loop.lag_seconds", lag, buckets=LAG_BUCKETS)
+            with self._lock:
+                self._beat = now
+                self.max_lag = max(self.max_lag, lag)
+                stall, self._pending = self._pending, None
+                if stall is not None:
+                    # The stack was captured mid-stall; only now is its
+                    # full length known.
+                    stall["lag_seconds"] = round(lag, 4)
+                    self.stall_seconds[stall["site"]] += lag
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval / 2):
+            with self._lock:
+                overdue = time.monotonic() - self._beat - self.interval
+                if overdue < self.threshold or self._pending is not None:
+                    continue
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = []
+            while frame is not None:
+                stack.append(frame)
+                frame = frame.f_back
+            if not stack:
+                continue
+            site = _blocking_site(stack)
+            stall = {
+                "site": site,
+                "at": time.time(),
+                "lag_seconds": round(overdue, 4),
+                "stack": [frame_label(f) for f in reversed(stack)],
+            }
+            del stack
+            with self._lock:
+                self._pending = stall
+                self.recent.append(stall)
+            metrics.inc("event_loop.stalls", labels={"site": site})
+            logger.warning("Event loop blocked > %.0f ms at %s", overdue * 1000, site)
+
+    def status(self, top_n: int = 10) -> Dict[str, Any]:
+        """Lag summary, worst offenders by total stalled time, recent stacks."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "running": self.running,
+                "threshold_ms": round(self.threshold * 1000),
+                "max_lag_seconds": round(self.max_lag, 4),
+                "offenders": [
+                    {"site": site, "stalled_seconds": round(seconds, 3)}
+                    for site, seconds in self.stall_seconds.most_common(top_n)
+                ],
+                "recent": list(self.recent),
+            }
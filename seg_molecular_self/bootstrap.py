@@ -2,17 +2,28 @@
 
 Two operations:
 
-    python bootstrap.py export
+    python bootstrap.py export [--dry-run]
         Read the current registry at data/custom_replicants.json and copy it
         into seg_molecular_self/bootstrap/replicants_v1_2.json. Run this when
         the live registry is in a known-good state and you want to capture
         it for redistribution.
 
-    python bootstrap.py install [--force]
+    python bootstrap.py install [--force] [--dry-run]
         Read seg_molecular_self/bootstrap/replicants_v1_2.json and merge it
         into data/custom_replicants.json. Without --force, existing replicants
-        are skipped (idempotent install on a partial registry). With --force,
-        existing replicants are overwritten.
+        whose content differs are skipped (idempotent install on a partial
+        registry). With --force, they are overwritten.
+
+Both compare per-replicant content hashes and report the diff (added,
+changed, unchanged; export also lists removed). Nothing is written when
+there is no delta, and --dry-run only prints the report. Export records
+the hashes in replicants_v1_2.manifest.json next to the bundle; install
+refuses a bundle that no longer matches its manifest.
+
+Install writes through the server's SEGPersistenceManager, i.e. under the
+same file lock and atomic rename the running server uses, and merges into
+whatever the registry holds at that moment. Bootstrapping a live
+deployment therefore cannot lose a concurrent create_custom_replicant.
 
 Why this exists:
 
@@ -32,7 +43,9 @@ only handles the JSON path.
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import os
 import sys
 from pathlib import Path
 from typing import Any
@@ -45,6 +58,11 @@ _PROJECT_ROOT = _SCRIPT_DIR.parent
 _LIVE_REGISTRY = _PROJECT_ROOT / "data" / "custom_replicants.json"
 _BOOTSTRAP_DIR = _SCRIPT_DIR / "bootstrap"
 _BOOTSTRAP_FILE = _BOOTSTRAP_DIR / "replicants_v1_2.json"
+_MANIFEST_FILE = _BOOTSTRAP_DIR / "replicants_v1_2.manifest.json"
+
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+from mcp_server.persistence import SEGPersistenceManager  # noqa: E402
 
 
 def _load_json(path: Path) -> dict[str, Any]:
@@ -56,11 +74,56 @@ def _load_json(path: Path) -> dict[str, Any]:
 def _write_json(path: Path, data: dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     # indent=2 + ensure_ascii=False keeps the file readable and preserves
-    # the em-dashes / unicode arrows in molecular_self blocks.
-    path.write_text(
+    # the em-dashes / unicode arrows in molecular_self blocks. Written via
+    # a temp file + rename so an interrupted export never truncates it.
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(
         json.dumps(data, indent=2, ensure_ascii=False) + "\n",
         encoding="utf-8",
     )
+    os.replace(tmp, path)
+
+
+def _content_hash(replicant: dict[str, Any]) -> str:
+    """sha256 of the canonical JSON form (key order and whitespace ignored)."""
+    canonical = json.dumps(
+        replicant, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _manifest(replicants: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "algorithm": "sha256",
+        "replicants": {
+            name: _content_hash(rep) for name, rep in sorted(replicants.items())
+        },
+    }
+
+
+def _diff(source: dict[str, Any], target: dict[str, Any]) -> dict[str, list[str]]:
+    """Classify replicants in ``source`` against ``target`` by content hash."""
+    diff: dict[str, list[str]] = {
+        "added": [],
+        "changed": [],
+        "unchanged": [],
+        "removed": sorted(set(target) - set(source)),
+    }
+    for name in sorted(source):
+        if name not in target:
+            diff["added"].append(name)
+        elif _content_hash(source[name]) != _content_hash(target[name]):
+            diff["changed"].append(name)
+        else:
+            diff["unchanged"].append(name)
+    return diff
+
+
+def _print_diff(diff: dict[str, list[str]], labels: dict[str, str]) -> None:
+    for key, label in labels.items():
+        names = diff[key]
+        if names:
+            print(f"  {label} ({len(names)}): {', '.join(names)}")
 
 
 def _validate_replicant(name: str, replicant: dict[str, Any]) -> list[str]:
@@ -101,7 +164,7 @@ def _validate_replicant(name: str, replicant: dict[str, Any]) -> list[str]:
     return issues
 
 
-def cmd_export() -> int:
+def cmd_export(dry_run: bool = False) -> int:
     if not _LIVE_REGISTRY.exists():
         print(f"ERROR: live registry not found at {_LIVE_REGISTRY}", file=sys.stderr)
         return 1
@@ -127,7 +190,31 @@ def cmd_export() -> int:
                 print(f"    - {issue}", file=sys.stderr)
         return 2
 
-    _write_json(_BOOTSTRAP_FILE, live)
+    diff = _diff(live, _load_json(_BOOTSTRAP_FILE))
+    manifest = _manifest(live)
+    delta = diff["added"] or diff["changed"] or diff["removed"]
+    stale_manifest = _load_json(_MANIFEST_FILE) != manifest
+
+    prefix = "[dry run] " if dry_run else ""
+    print(f"{prefix}Export {_LIVE_REGISTRY} -> {_BOOTSTRAP_FILE}")
+    _print_diff(
+        diff,
+        {
+            "added": "Added",
+            "changed": "Changed",
+            "removed": "Removed",
+            "unchanged": "Unchanged",
+        },
+    )
+    if not delta and not stale_manifest:
+        print("  Bundle already up to date; nothing written.")
+        return 0
+    if dry_run:
+        return 0
+
+    if delta:
+        _write_json(_BOOTSTRAP_FILE, live)
+    _write_json(_MANIFEST_FILE, manifest)
     print(f"Exported {len(live)} replicant(s) to {_BOOTSTRAP_FILE}")
     for name in sorted(live):
         version = live[name].get("version", "?")
@@ -135,7 +222,7 @@ def cmd_export() -> int:
     return 0
 
 
-def cmd_install(force: bool = False) -> int:
+def cmd_install(force: bool = False, dry_run: bool = False) -> int:
     if not _BOOTSTRAP_FILE.exists():
         print(
             f"ERROR: bootstrap file not found at {_BOOTSTRAP_FILE}\n"
@@ -146,36 +233,51 @@ def cmd_install(force: bool = False) -> int:
         return 1
 
     bootstrap = _load_json(_BOOTSTRAP_FILE)
-    live = _load_json(_LIVE_REGISTRY)
-
-    installed: list[str] = []
-    skipped: list[str] = []
-    overwritten: list[str] = []
 
-    for name, rep in bootstrap.items():
-        if name in live and not force:
-            skipped.append(name)
-            continue
-        if name in live and force:
-            overwritten.append(name)
-        else:
-            installed.append(name)
-        live[name] = rep
-
-    _write_json(_LIVE_REGISTRY, live)
-
-    print(f"Bootstrap installed to {_LIVE_REGISTRY}")
-    if installed:
-        print(f"  Installed ({len(installed)}): {', '.join(sorted(installed))}")
-    if overwritten:
-        print(f"  Overwritten ({len(overwritten)}): {', '.join(sorted(overwritten))}")
-    if skipped:
-        print(
-            f"  Skipped — already present ({len(skipped)}): "
-            f"{', '.join(sorted(skipped))}"
+    # A bundle edited after export (or half-copied) should not be installed
+    # silently; the manifest is the record of what export actually wrote.
+    manifest = _load_json(_MANIFEST_FILE)
+    if manifest:
+        recorded = manifest.get("replicants", {})
+        tampered = sorted(
+            name
+            for name in set(bootstrap) | set(recorded)
+            if name not in bootstrap
+            or recorded.get(name) != _content_hash(bootstrap[name])
         )
+        if tampered:
+            print(
+                f"ERROR: bootstrap file does not match {_MANIFEST_FILE.name}: "
+                f"{', '.join(tampered)}\n"
+                f"       Re-run `python bootstrap.py export` on the source registry.",
+                file=sys.stderr,
+            )
+            return 2
+
+    persistence = SEGPersistenceManager(data_dir=str(_LIVE_REGISTRY.parent))
+    live = persistence.load_custom_replicants()
+    diff = _diff(bootstrap, live)
+    to_write = diff["added"] + (diff["changed"] if force else [])
+
+    prefix = "[dry run] " if dry_run else ""
+    print(f"{prefix}Install {_BOOTSTRAP_FILE} -> {_LIVE_REGISTRY}")
+    changed_label = "Changed — overwritten" if force else "Changed — skipped"
+    _print_diff(
+        diff,
+        {"added": "Added", "changed": changed_label, "unchanged": "Unchanged"},
+    )
+    if diff["changed"] and not force:
         print("  (use --force to overwrite existing replicants)")
 
+    if not to_write:
+        print("  Registry already up to date; nothing written.")
+        return 0
+    if dry_run:
+        return 0
+
+    persistence.update_custom_replicants({name: bootstrap[name] for name in to_write})
+    persistence.flush()
+    print(f"Bootstrap installed {len(to_write)} replicant(s) to {_LIVE_REGISTRY}")
     return 0
 
 
@@ -185,10 +287,15 @@ def main(argv: list[str] | None = None) -> int:
     )
     sub = parser.add_subparsers(dest="command", required=True)
 
-    sub.add_parser(
+    export = sub.add_parser(
         "export",
         help="Capture the live registry into the bootstrap file.",
     )
+    export.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report the diff without writing the bundle or manifest.",
+    )
 
     install = sub.add_parser(
         "install",
@@ -199,13 +306,18 @@ def main(argv: list[str] | None = None) -> int:
         action="store_true",
         help="Overwrite replicants that already exist in the live registry.",
     )
+    install.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report the diff without touching the live registry.",
+    )
 
     args = parser.parse_args(argv)
 
     if args.command == "export":
-        return cmd_export()
+        return cmd_export(dry_run=args.dry_run)
     if args.command == "install":
-        return cmd_install(force=args.force)
+        return cmd_install(force=args.force, dry_run=args.dry_run)
 
     parser.error(f"unknown command: {args.command}")
     return 2